@@ -1,10 +1,6 @@
 # app.py
 import os, sys
 import streamlit as st
-import plotly.io as pio
-import importlib.util
-
-pio.templates.default = "plotly_white"
 
 # === Fix de importaciones si Streamlit no detecta src/ ===
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -14,17 +10,22 @@ if BASE_DIR not in sys.path:
 # === Importaciones del proyecto ===
 from src.data.google_loader import get_drive_data
 from src.ui.layout import configurar_pagina, seleccionar_almacen
-from src.logic.escaneo_logic import procesar_escaneo
+from src.logic.escaneo_logic import procesar_escaneo, marcar_reportes_actualizados
 from src.reports.eri_report import mostrar_reporte_eri
 from src.reports.eru_report import mostrar_reporte_eru
 from src.reports.general_report import mostrar_reporte_general
+from src.reports.resumen_report import mostrar_resumen_empresa
+from src.logic.instrumentacion import medir
+from src.ui.diagnostico import iniciar_rerun, mostrar_panel_diagnostico
 
 # === Configuración de página ===
 configurar_pagina()
+inicio_rerun = iniciar_rerun()
 
 # === Carga automática de datos desde Google Drive ===
 st.sidebar.header("📂 Datos desde Google Drive")
-data, file_name = get_drive_data()
+with medir("etapa.carga"):
+    data, file_name = get_drive_data()
 
 if data.empty:
     st.warning("⚠️ No hay datos disponibles. Verifica la carpeta en Drive o tus credenciales.")
@@ -33,26 +34,35 @@ if data.empty:
 st.success(f"✅ Datos cargados correctamente desde: {file_name}")
 
 # === Selección de almacén ===
-almacen_seleccionado, df_filtrado, stock_teorico_eri = seleccionar_almacen(data)
+with medir("etapa.seleccion_almacen"):
+    almacen_seleccionado, df_filtrado, stock_teorico_eri = seleccionar_almacen(data)
+
+# === Vista general de todos los almacenes ===
+with medir("etapa.resumen_empresa"):
+    mostrar_resumen_empresa(data)
 
 if df_filtrado.empty:
     st.warning("⚠️ No hay datos para el almacén seleccionado.")
     st.stop()
 
 # === Escaneo de códigos ===
-procesar_escaneo(stock_teorico_eri)
+with medir("etapa.escaneo"):
+    procesar_escaneo(stock_teorico_eri, df_filtrado)
+
+# Los reportes de este rerun quedan al día con los escaneos registrados
+marcar_reportes_actualizados(stock_teorico_eri)
 
 # === Reporte ERI ===
-mostrar_reporte_eri(stock_teorico_eri)
+with medir("etapa.reporte_eri"):
+    mostrar_reporte_eri(stock_teorico_eri)
 
 # === Reporte ERU ===
-mostrar_reporte_eru(stock_teorico_eri)
+with medir("etapa.reporte_eru"):
+    mostrar_reporte_eru(stock_teorico_eri)
 
 # === Visualización general (modal flotante) ===
-mostrar_reporte_general()
-
+with medir("etapa.reporte_general"):
+    mostrar_reporte_general()
 
-if importlib.util.find_spec("kaleido") is None:
-    st.error("❌ Kaleido no está instalado correctamente.")
-else:
-    st.success("✅ Kaleido está instalado y listo.")
\ No newline at end of file
+# === Diagnóstico de rendimiento (panel lateral) ===
+mostrar_panel_diagnostico(inicio_rerun)
@@ -0,0 +1,129 @@
+# auditoria.py
+"""
+Auditoría ERI/ERU por línea de comandos (sin navegador ni Streamlit).
+
+Ejemplos:
+    python auditoria.py inventario.xlsx --escaneos ALM1=colector1.txt --escaneos ALM2=colector2.csv
+    python auditoria.py snapshot.parquet --escaneos todos.txt --procesos 8 --salida resultado.json
+    python auditoria.py inventario.csv --escaneos todos.txt --formato jsonl --detalle salida/
+
+- `--escaneos ALMACEN=RUTA` asigna el volcado a un almacén; `--escaneos RUTA` lo aplica a todos.
+- Cada almacén se procesa en un proceso distinto (ProcessPoolExecutor).
+"""
+import os
+import sys
+import json
+import argparse
+from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+# === Fix de importaciones si no se ejecuta desde la raíz ===
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from src.data.parsers import leer_inventario
+from src.logic.almacenes import IndiceAlmacenes
+from src.logic.importacion import leer_volcado_escaner
+from src.logic.procesamiento import procesar_almacen
+
+
+def cargar_inventario(ruta):
+    """Lee un inventario Excel/CSV o un snapshot Parquet de la caché local."""
+    if ruta.lower().endswith(".parquet"):
+        df = pd.read_parquet(ruta, engine="pyarrow")
+    else:
+        with open(ruta, "rb") as archivo:
+            df, _ = leer_inventario(BytesIO(archivo.read()), os.path.basename(ruta))
+    df.columns = df.columns.astype(str).str.strip()
+    return df
+
+
+def nombre_almacen(almacen):
+    """Nombre comparable con los argumentos: el inventario puede traer almacenes numéricos (ej. 101)."""
+    return str(almacen).strip()
+
+
+def cargar_escaneos(especificaciones, almacenes):
+    """
+    Arma la lista de códigos por almacén a partir de los `--escaneos` indicados.
+    - 'ALMACEN=RUTA' asigna el volcado a ese almacén; 'RUTA' sola se aplica a todos.
+    """
+    codigos = {almacen: [] for almacen in almacenes}
+    por_nombre = {nombre_almacen(almacen): almacen for almacen in almacenes}
+    for especificacion in especificaciones:
+        almacen, separador, ruta = especificacion.rpartition("=")
+        if separador and not os.path.exists(especificacion):
+            if nombre_almacen(almacen) not in por_nombre:
+                raise SystemExit(f"Almacén desconocido en --escaneos: {almacen}")
+            destinos = [por_nombre[nombre_almacen(almacen)]]
+        else:
+            ruta, destinos = especificacion, almacenes
+        with open(ruta, "rb") as archivo:
+            leidos = leer_volcado_escaner(archivo.read(), os.path.basename(ruta))
+        for destino in destinos:
+            codigos[destino].extend(leidos)
+    return codigos
+
+
+def _procesar(tarea):
+    return procesar_almacen(*tarea)
+
+
+def auditar(indice, escaneos_por_almacen, procesos=None, carpeta_detalle=None, almacenes=None):
+    """
+    Calcula ERI/ERU para los almacenes de un IndiceAlmacenes, en paralelo.
+    - Retorna la lista de resultados (uno por almacén, ordenados por nombre).
+    """
+    if almacenes is not None:
+        almacenes = {nombre_almacen(a) for a in almacenes}
+    almacenes = [a for a in indice.almacenes if almacenes is None or nombre_almacen(a) in almacenes]
+    tareas = [
+        (almacen, indice.obtener(almacen)[1], escaneos_por_almacen.get(almacen, []), carpeta_detalle)
+        for almacen in almacenes
+    ]
+    procesos = procesos or os.cpu_count() or 1
+    if procesos == 1 or len(tareas) <= 1:
+        return [_procesar(tarea) for tarea in tareas]
+    with ProcessPoolExecutor(max_workers=min(procesos, len(tareas))) as pool:
+        return list(pool.map(_procesar, tareas))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Auditoría ERI/ERU de todos los almacenes sin interfaz.")
+    parser.add_argument("inventario", help="Inventario .xlsx/.csv o snapshot .parquet")
+    parser.add_argument("--escaneos", action="append", default=[], metavar="[ALMACEN=]RUTA",
+                        help="Volcado de colector (TXT/CSV). Se puede repetir.")
+    parser.add_argument("--almacen", action="append", default=None,
+                        help="Limitar a estos almacenes (se puede repetir).")
+    parser.add_argument("--procesos", type=int, default=None, help="Procesos en paralelo (por defecto: núcleos).")
+    parser.add_argument("--formato", choices=["json", "jsonl"], default="json")
+    parser.add_argument("--salida", default="-", help="Archivo de salida ('-' = stdout).")
+    parser.add_argument("--detalle", default=None, help="Carpeta donde escribir las tablas de detalle en CSV.")
+    args = parser.parse_args(argv)
+
+    indice = IndiceAlmacenes(cargar_inventario(args.inventario))
+    if indice.faltantes:
+        print(f"❌ Faltan columnas requeridas: {', '.join(indice.faltantes)}", file=sys.stderr)
+        return 2
+
+    escaneos = cargar_escaneos(args.escaneos, indice.almacenes)
+    resultados = auditar(indice, escaneos, args.procesos, args.detalle, args.almacen)
+
+    if args.formato == "jsonl":
+        texto = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in resultados)
+    else:
+        texto = json.dumps({"inventario": args.inventario, "almacenes": resultados}, ensure_ascii=False, indent=2) + "\n"
+
+    if args.salida == "-":
+        sys.stdout.write(texto)
+    else:
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            archivo.write(texto)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""
+Chequeo de tiempo de arranque: costo de importación por módulo de lo que carga app.py.
+
+Uso:
+    python -m benchmarks.arranque                          # reporte en consola
+    python -m benchmarks.arranque --salida arranque.json --limite-ms 2500
+
+- Cada medición corre en un proceso nuevo con `python -X importtime`.
+- Falla (código 1) si algún módulo diferido se carga al inicio o si se supera el límite.
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Módulos que importa app.py al arrancar
+MODULOS_APP = [
+    "src.data.google_loader",
+    "src.ui.layout",
+    "src.logic.escaneo_logic",
+    "src.reports.eri_report",
+    "src.reports.eru_report",
+    "src.reports.general_report",
+    "src.reports.resumen_report",
+    "src.ui.diagnostico",
+]
+
+# Dependencias pesadas que solo deben cargarse al usar su función
+DIFERIDOS = [
+    "plotly.express",
+    "reportlab.platypus",
+    "gspread",
+    "googleapiclient.discovery",
+    "googleapiclient.http",
+    "matplotlib.pyplot",
+]
+
+
+def _importtime(codigo):
+    """Ejecuta `codigo` con -X importtime; retorna {módulo: (propio_us, acumulado_us, nivel)}."""
+    proceso = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", codigo],
+        cwd=BASE_DIR, capture_output=True, text=True,
+        env=dict(os.environ, STREAMLIT_LOGGER_LEVEL="error"),
+    )
+    if proceso.returncode != 0:
+        raise RuntimeError(proceso.stderr.strip().splitlines()[-1])
+    modulos = {}
+    for linea in proceso.stderr.splitlines():
+        if not linea.startswith("import time:") or "self [us]" in linea:
+            continue
+        propio, acumulado, nombre = linea[len("import time:"):].split("|")
+        nivel = (len(nombre) - len(nombre.lstrip())) // 2
+        modulos[nombre.strip()] = (int(propio), int(acumulado), nivel)
+    return modulos
+
+
+def medir_arranque():
+    """Costo de importar los módulos de la app (por paquete de primer nivel) y diferidos cargados."""
+    codigo = "import sys; sys.path.insert(0, '.'); " + "; ".join(f"import {m}" for m in MODULOS_APP)
+    modulos = _importtime(codigo)
+
+    # Costo acumulado de los imports directos y de lo que cada uno importa en primer nivel
+    por_modulo = {
+        nombre: acumulado / 1000
+        for nombre, (_, acumulado, nivel) in modulos.items()
+        if nivel <= 1
+    }
+    total_ms = sum(propio for propio, _, _ in modulos.values()) / 1000
+    cargados = [m for m in DIFERIDOS if m in modulos]
+    return total_ms, dict(sorted(por_modulo.items(), key=lambda x: -x[1])), cargados
+
+
+def medir_diferidos():
+    """Costo de cada dependencia diferida (medido sobre pandas + streamlit ya cargados)."""
+    costos = {}
+    for modulo in DIFERIDOS:
+        try:
+            modulos = _importtime(f"import pandas, streamlit; import {modulo}")
+        except RuntimeError:
+            costos[modulo] = None  # no instalado
+            continue
+        costos[modulo] = modulos.get(modulo, (0, 0, 0))[1] / 1000
+    return costos
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Costo de importación por módulo al arrancar la app.")
+    parser.add_argument("--salida", default=None, help="Guardar el resultado en JSON.")
+    parser.add_argument("--limite-ms", type=float, default=None, help="Falla si el arranque supera este tiempo.")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args(argv)
+
+    total_ms, por_modulo, cargados = medir_arranque()
+    diferidos = medir_diferidos()
+
+    print(f"⏱️ Importación de la app: {total_ms:.0f} ms")
+    for nombre, ms in list(por_modulo.items())[:args.top]:
+        print(f"  {ms:9.1f} ms  {nombre}")
+    print("💤 Dependencias diferidas (costo al primer uso):")
+    for nombre, ms in diferidos.items():
+        estado = "no instalado" if ms is None else f"{ms:9.1f} ms"
+        marca = "  ⚠️ cargado al inicio" if nombre in cargados else ""
+        print(f"  {estado:>12}  {nombre}{marca}")
+
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump({
+                "total_ms": total_ms,
+                "por_modulo_ms": por_modulo,
+                "diferidos_ms": diferidos,
+                "diferidos_cargados_al_inicio": cargados,
+            }, f, ensure_ascii=False, indent=2)
+
+    fallas = []
+    if cargados:
+        fallas.append(f"módulos diferidos cargados al inicio: {', '.join(cargados)}")
+    if args.limite_ms is not None and total_ms > args.limite_ms:
+        fallas.append(f"arranque de {total_ms:.0f} ms supera el límite de {args.limite_ms:.0f} ms")
+    for falla in fallas:
+        print(f"❌ {falla}", file=sys.stderr)
+    return 1 if fallas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,226 @@
+"""
+Benchmarks del flujo escaneo → conciliación → reporte con datos sintéticos.
+
+Uso:
+    python -m benchmarks.ejecutar                               # escalas pequeña y mediana
+    python -m benchmarks.ejecutar --escalas pequeña,mediana,grande --salida bench.json
+    python -m benchmarks.ejecutar --comparar bench_anterior.json --salida bench.json
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import statistics
+import subprocess
+from io import BytesIO
+from datetime import datetime
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from benchmarks.sinteticos import generar_inventario, generar_escaneos
+from src.logic.utils import desconcatenar_producto_ref, DecodificadorEscaneo
+from src.logic.almacenes import IndiceAlmacenes
+from src.logic.conciliacion import ubicaciones_por_clave, conciliar_eri_escaneos
+from src.logic.procesamiento import construir_escaneos, construir_conciliacion_eri, construir_conciliacion_eru
+from src.logic.resumen import resumen_empresa, escaneos_a_dataframe
+from src.data.parsers import leer_inventario
+from src.data.lector_sheets import BackendSheetsFalso, leer_inventario_sheets
+from src.ui.layout import seleccionar_almacen, _construir_indice_almacenes
+from src.reports.general_report import generar_pdf
+from streamlit import config as st_config
+from streamlit.logger import set_log_level
+
+# Streamlit en modo "bare" (sin `streamlit run`) avisa en cada llamada: se fija el nivel
+# después de que la configuración se haya leído (si no, la lectura lo vuelve a INFO)
+st_config.get_config_options()
+set_log_level("error")
+
+# ================================================================
+# 📏 Escalas
+# ================================================================
+ESCALAS = {
+    "pequeña": {"skus": 1_000, "ubicaciones": 300, "almacenes": 2, "escaneos": 5_000},
+    "mediana": {"skus": 10_000, "ubicaciones": 2_000, "almacenes": 5, "escaneos": 50_000},
+    "grande": {"skus": 50_000, "ubicaciones": 8_000, "almacenes": 10, "escaneos": 200_000},
+}
+
+# desconcatenar_producto_ref recorre el catálogo por escaneo: se mide sobre una muestra
+MUESTRA_REFERENCIA = 20
+
+
+def medir(funcion, repeticiones=3):
+    """Ejecuta `funcion` varias veces y retorna (tiempos en segundos, último resultado)."""
+    tiempos = []
+    resultado = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return tiempos, resultado
+
+
+def _registro(escala, etapa, tiempos, unidades=None):
+    registro = {
+        "escala": escala,
+        "etapa": etapa,
+        "repeticiones": len(tiempos),
+        "min_s": min(tiempos),
+        "mediana_s": statistics.median(tiempos),
+        "media_s": statistics.fmean(tiempos),
+    }
+    if unidades:
+        registro["unidades"] = unidades
+        registro["us_por_unidad"] = min(tiempos) / unidades * 1e6
+    return registro
+
+
+def ejecutar_escala(nombre, parametros, repeticiones=3, tasa_invalidos=0.02, tasa_mal_ubicados=0.05):
+    """Genera los datos de una escala y mide cada etapa. Retorna la lista de registros."""
+    registros = []
+    inventario = generar_inventario(parametros["skus"], parametros["ubicaciones"], parametros["almacenes"])
+
+    # --- Parseo del cargador (CSV y Excel, modos streaming y completo) ---
+    csv_bytes = inventario.to_csv(index=False).encode("utf-8")
+    excel = BytesIO()
+    inventario.to_excel(excel, sheet_name="Listado Stock", index=False)
+    excel_bytes = excel.getvalue()
+    for archivo, contenido in (("inventario.csv", csv_bytes), ("inventario.xlsx", excel_bytes)):
+        for modo in ("streaming", "completo"):
+            tiempos, _ = medir(lambda: leer_inventario(BytesIO(contenido), archivo, modo=modo), repeticiones)
+            registros.append(_registro(nombre, f"parseo_{archivo.rsplit('.', 1)[1]}_{modo}", tiempos, len(inventario)))
+
+    # --- Google Sheets por lotes (backend falso en memoria: mide el armado, no la red) ---
+    backend = BackendSheetsFalso({"LISTADO": inventario})
+    tiempos, _ = medir(lambda: leer_inventario_sheets(backend, "benchmark"), repeticiones)
+    registros.append(_registro(nombre, "parseo_sheets_lotes", tiempos, len(inventario)))
+
+    # --- seleccionar_almacen (en frío: construye el índice; en caliente: índice cacheado) ---
+    def _seleccionar_en_frio():
+        _construir_indice_almacenes.clear()
+        return seleccionar_almacen(inventario)
+
+    tiempos, _ = medir(_seleccionar_en_frio, repeticiones)
+    registros.append(_registro(nombre, "seleccionar_almacen_frio", tiempos, len(inventario)))
+    tiempos, _ = medir(lambda: seleccionar_almacen(inventario), repeticiones)
+    registros.append(_registro(nombre, "seleccionar_almacen_caliente", tiempos))
+
+    indice = IndiceAlmacenes(inventario)
+    almacen = indice.almacenes[0]
+    _, stock = indice.obtener(almacen)
+    codigos = generar_escaneos(stock, parametros["escaneos"], tasa_invalidos, tasa_mal_ubicados)
+
+    # --- Decodificación de escaneos ---
+    lista_ubicaciones = stock["UBICACION_NOMBRE"].explode().tolist()
+    muestra = codigos[:MUESTRA_REFERENCIA]
+    tiempos, _ = medir(
+        lambda: [desconcatenar_producto_ref(c, lista_ubicaciones, stock) for c in muestra], 1
+    )
+    registros.append(_registro(nombre, "desconcatenar_producto_ref", tiempos, len(muestra)))
+
+    tiempos, decodificador = medir(lambda: DecodificadorEscaneo(stock), repeticiones)
+    registros.append(_registro(nombre, "decodificador_construccion", tiempos, len(stock)))
+    tiempos, _ = medir(lambda: [decodificador.decodificar(c) for c in codigos], repeticiones)
+    registros.append(_registro(nombre, "decodificador_por_escaneo", tiempos, len(codigos)))
+    tiempos, (escaneos, _) = medir(lambda: construir_escaneos(decodificador, codigos), repeticiones)
+    registros.append(_registro(nombre, "decodificador_lote", tiempos, len(codigos)))
+
+    # --- Conciliación ERI/ERU ---
+    tiempos, eri = medir(lambda: construir_conciliacion_eri(stock, escaneos), repeticiones)
+    registros.append(_registro(nombre, "conciliacion_eri", tiempos, len(escaneos)))
+    tiempos, _ = medir(lambda: conciliar_eri_escaneos(stock, escaneos.ids_claves()), repeticiones)
+    registros.append(_registro(nombre, "conciliar_eri_kernel", tiempos, len(stock)))
+    tiempos, ubicaciones = medir(lambda: ubicaciones_por_clave(stock), repeticiones)
+    registros.append(_registro(nombre, "ubicaciones_por_clave", tiempos, len(stock)))
+    tiempos, eru = medir(lambda: construir_conciliacion_eru(ubicaciones, escaneos), repeticiones)
+    registros.append(_registro(nombre, "conciliacion_eru", tiempos, len(escaneos)))
+    tiempos, _ = medir(lambda: eri.tabla_detalle(stock), repeticiones)
+    registros.append(_registro(nombre, "tabla_detalle_eri", tiempos, len(stock)))
+    tiempos, _ = medir(lambda: eru.tabla_detalle(escaneos), repeticiones)
+    registros.append(_registro(nombre, "tabla_detalle_eru", tiempos, len(escaneos)))
+
+    # --- Resumen de todos los almacenes ---
+    escaneos_df = escaneos_a_dataframe({almacen: (escaneos.claves(), escaneos.ubicaciones_escaneadas())})
+    tiempos, _ = medir(lambda: resumen_empresa(indice, escaneos_df), repeticiones)
+    registros.append(_registro(nombre, "resumen_empresa", tiempos, len(indice.almacenes)))
+
+    # --- PDF ---
+    tiempos, _ = medir(
+        lambda: generar_pdf(almacen, eri.metricas(), eru.metricas(), "Observación ERI", "Observación ERU"),
+        repeticiones
+    )
+    registros.append(_registro(nombre, "generar_pdf", tiempos))
+
+    for registro in registros:
+        registro["parametros"] = dict(parametros, tasa_invalidos=tasa_invalidos, tasa_mal_ubicados=tasa_mal_ubicados)
+    return registros
+
+
+def _commit_actual():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def comparar(anterior, actual):
+    """Tabla de texto con la mediana anterior vs actual por (escala, etapa)."""
+    previos = {(r["escala"], r["etapa"]): r for r in anterior["resultados"]}
+    lineas = [f"{'escala':<10} {'etapa':<32} {'antes (s)':>11} {'ahora (s)':>11} {'cambio':>8}"]
+    for r in actual["resultados"]:
+        previo = previos.get((r["escala"], r["etapa"]))
+        if previo is None:
+            continue
+        cambio = r["mediana_s"] / previo["mediana_s"] if previo["mediana_s"] else float("inf")
+        lineas.append(
+            f"{r['escala']:<10} {r['etapa']:<32} {previo['mediana_s']:>11.4f} {r['mediana_s']:>11.4f} {cambio:>7.2f}x"
+        )
+    return "\n".join(lineas)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks con inventario y escaneos sintéticos.")
+    parser.add_argument("--escalas", default="pequeña,mediana", help=f"Separadas por coma: {', '.join(ESCALAS)}")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--tasa-invalidos", type=float, default=0.02)
+    parser.add_argument("--tasa-mal-ubicados", type=float, default=0.05)
+    parser.add_argument("--salida", default="benchmarks/resultados.json")
+    parser.add_argument("--comparar", default=None, help="JSON de una corrida anterior.")
+    args = parser.parse_args(argv)
+
+    resultado = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "commit": _commit_actual(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "resultados": [],
+    }
+    for nombre in args.escalas.split(","):
+        nombre = nombre.strip()
+        if nombre not in ESCALAS:
+            parser.error(f"Escala desconocida: {nombre}")
+        print(f"⏱️ Escala {nombre}: {ESCALAS[nombre]}", file=sys.stderr)
+        resultado["resultados"].extend(
+            ejecutar_escala(nombre, ESCALAS[nombre], args.repeticiones, args.tasa_invalidos, args.tasa_mal_ubicados)
+        )
+
+    carpeta = os.path.dirname(args.salida)
+    if carpeta:
+        os.makedirs(carpeta, exist_ok=True)
+    with open(args.salida, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, ensure_ascii=False, indent=2)
+    print(f"✅ Resultados guardados en {args.salida}", file=sys.stderr)
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            print(comparar(json.load(f), resultado))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+
+# ================================================================
+# 🧪 Datos sintéticos para benchmarks
+# ================================================================
+# Formatos de ubicación reales (ver patrones en src/logic/utils.py):
+#   R12A-B-3 · R12A-B-C · R12-B-3 · R12-B-C
+_LETRAS = np.array(list("ABCDEFGHIJKLMNOPQRSTUVWXYZ"))
+
+
+def generar_ubicaciones(n_ubicaciones, semilla=0):
+    """Lista de `n_ubicaciones` ubicaciones distintas, repartidas entre los cuatro formatos válidos."""
+    rng = np.random.default_rng(semilla)
+    ubicaciones = set()
+    while len(ubicaciones) < n_ubicaciones:
+        faltan = n_ubicaciones - len(ubicaciones)
+        rack = rng.integers(1, 1000, faltan)
+        pasillo = _LETRAS[rng.integers(0, 26, faltan)]
+        nivel = _LETRAS[rng.integers(0, 26, faltan)]
+        posicion = rng.integers(1, 1000, faltan)
+        posicion_letra = _LETRAS[rng.integers(0, 26, faltan)]
+        formato = rng.integers(0, 4, faltan)
+        for r, p, n, pos, pos_l, f in zip(rack, pasillo, nivel, posicion, posicion_letra, formato):
+            prefijo = f"R{r}{p}" if f < 2 else f"R{r}"
+            final = pos if f % 2 == 0 else pos_l
+            ubicaciones.add(f"{prefijo}-{n}-{final}")
+    return sorted(ubicaciones)
+
+
+def generar_inventario(n_skus, n_ubicaciones, n_almacenes, max_ubicaciones_por_sku=3, semilla=0):
+    """
+    Inventario sintético con las cinco columnas requeridas.
+    - Cada SKU (PRODUCTO_CODIGO + REFERENCIA1) está en todos los almacenes,
+      en 1..max_ubicaciones_por_sku ubicaciones del almacén.
+    """
+    rng = np.random.default_rng(semilla)
+    ubicaciones = np.array(generar_ubicaciones(n_ubicaciones, semilla), dtype=object)
+
+    productos = np.array([f"P{i:06d}" for i in range(n_skus)], dtype=object)
+    referencias = np.array([f"REF{i % 97:02d}" for i in range(n_skus)], dtype=object)
+
+    partes = []
+    for a in range(n_almacenes):
+        por_sku = rng.integers(1, max_ubicaciones_por_sku + 1, n_skus)
+        sku = np.repeat(np.arange(n_skus), por_sku)
+        partes.append(pd.DataFrame({
+            "ALMACEN_NOMBRE": f"ALMACEN_{a:03d}",
+            "PRODUCTO_CODIGO": productos[sku],
+            "REFERENCIA1": referencias[sku],
+            "STOCK_REFERENCIAUBICACION": rng.integers(0, 20, len(sku)).astype(float),
+            "UBICACION_NOMBRE": ubicaciones[rng.integers(0, len(ubicaciones), len(sku))],
+        }))
+    return pd.concat(partes, ignore_index=True)
+
+
+def generar_escaneos(stock_teorico_eri, n_escaneos, tasa_invalidos=0.02, tasa_mal_ubicados=0.05,
+                     ubicaciones=None, semilla=0):
+    """
+    Flujo de códigos escaneados para un almacén (stock_teorico_eri de IndiceAlmacenes.obtener).
+    - Válidos: clave + una de sus ubicaciones teóricas.
+    - Mal ubicados: clave + una ubicación válida de otro lugar.
+    - Inválidos: códigos que no corresponden a ningún producto.
+    """
+    rng = np.random.default_rng(semilla)
+    claves = stock_teorico_eri["clave_teorica_eri"].to_numpy()
+    listas = stock_teorico_eri["UBICACION_NOMBRE"].to_numpy()
+    if ubicaciones is None:
+        ubicaciones = sorted({u for lista in listas for u in lista})
+
+    ids = rng.integers(0, len(claves), n_escaneos)
+    tipo = rng.random(n_escaneos)
+    codigos = []
+    for id_clave, t in zip(ids, tipo):
+        if t < tasa_invalidos:
+            codigos.append(f"X{rng.integers(0, 10**9):09d}")
+        elif t < tasa_invalidos + tasa_mal_ubicados:
+            codigos.append(claves[id_clave] + ubicaciones[rng.integers(0, len(ubicaciones))])
+        else:
+            lista = listas[id_clave]
+            codigos.append(claves[id_clave] + str(lista[rng.integers(0, len(lista))]))
+    return codigos
@@ -0,0 +1,293 @@
+import os
+import json
+import hashlib
+import queue
+import threading
+import weakref
+
+# ====================================================
+# 📓 Diario de escaneos (append-only) con recuperación
+# ====================================================
+DIARIO_DIR = os.getenv("DIARIO_DIR", os.path.join(".cache", "diario"))
+DIARIO_FLUSH_SEG = float(os.getenv("DIARIO_FLUSH_SEG", "0.2"))
+DIARIO_COMPACTAR_CADA = int(os.getenv("DIARIO_COMPACTAR_CADA", "5000"))
+# Segundos sin escaneos tras los que el hilo escritor termina (vuelve con el próximo `agregar`)
+DIARIO_INACTIVO_SEG = float(os.getenv("DIARIO_INACTIVO_SEG", "30"))
+# Diarios abiertos a la vez en el proceso (sesión × almacén)
+DIARIO_MAX_ABIERTOS = int(os.getenv("DIARIO_MAX_ABIERTOS", "64"))
+
+MAX_LOTE = 1000
+
+_VACIAR = object()
+_CERRAR = object()
+
+
+def ruta_base_diario(token, almacen, carpeta=None):
+    """Ruta base (sin extensión) del diario de una sesión (`?sesion=`) en un almacén."""
+    nombre = hashlib.sha1(f"{token}|{almacen}".encode("utf-8")).hexdigest()[:16]
+    return os.path.join(carpeta or DIARIO_DIR, nombre)
+
+
+def leer_registros(ruta_diario, ruta_snapshot):
+    """
+    Registros (codigo, clave, ubicacion) de snapshot + diario, sin abrir el hilo escritor.
+    - El diario se ignora si el snapshot ya cubre su generación (caída a mitad de una compactación).
+    """
+    generacion_snapshot, registros = _leer_snapshot(ruta_snapshot)
+    generacion, lineas = _leer_lineas(ruta_diario)
+    if generacion > generacion_snapshot:
+        registros.extend(lineas)
+    return registros
+
+
+def leer_diario(ruta_base):
+    """Lectura de solo consulta de un diario guardado (ej. almacenes que no están abiertos)."""
+    return leer_registros(f"{ruta_base}.jsonl", f"{ruta_base}.snapshot.json")
+
+
+# Generaciones: cada compactación escribe un snapshot con la generación del diario que
+# cubre y empieza un diario con la siguiente (encabezado {"generacion": n}). Diarios sin
+# encabezado son de generación 0 y snapshots sin generación, de -1 (formato anterior).
+def _leer_snapshot(ruta_snapshot):
+    """(generación, registros) del snapshot; (-1, []) si no existe."""
+    if not os.path.exists(ruta_snapshot):
+        return -1, []
+    with open(ruta_snapshot, encoding="utf-8") as f:
+        snapshot = json.load(f)
+    registros = list(zip(snapshot["codigos"], snapshot["claves"], snapshot["ubicaciones"]))
+    return snapshot.get("generacion", -1), registros
+
+
+def _leer_lineas(ruta_diario):
+    """(generación, registros) del diario."""
+    if not os.path.exists(ruta_diario):
+        return 0, []
+    generacion, registros = 0, []
+    with open(ruta_diario, encoding="utf-8") as f:
+        for linea in f:
+            try:
+                valor = json.loads(linea)
+            except ValueError:
+                break  # última línea incompleta tras una caída
+            if isinstance(valor, dict):
+                generacion = valor.get("generacion", 0)
+                continue
+            codigo, clave, ubicacion = valor
+            registros.append((codigo, clave, ubicacion))
+    return generacion, registros
+
+
+def _escribir_atomico(ruta, texto):
+    """Escribe en un temporal, fsync y os.replace: la ruta queda con el contenido viejo o el nuevo."""
+    temporal = f"{ruta}.tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        f.write(texto)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporal, ruta)
+
+
+class DiarioEscaneos:
+    """
+    Diario durable de escaneos aceptados: (codigo, clave, ubicacion).
+    - `agregar` solo encola: un hilo escribe por lotes y hace fsync cada DIARIO_FLUSH_SEG.
+    - El hilo termina tras DIARIO_INACTIVO_SEG sin escaneos o con `cerrar`; `agregar` lo vuelve a crear.
+    - Cada DIARIO_COMPACTAR_CADA registros el diario se compacta en un snapshot columnar (JSON).
+    - `leer` reconstruye todo (snapshot + diario) tolerando una última línea incompleta.
+    - Un error de escritura no detiene el hilo: se cuenta en `errores` y el lote se reintenta.
+    """
+
+    def __init__(self, ruta_base, intervalo_flush=DIARIO_FLUSH_SEG, compactar_cada=DIARIO_COMPACTAR_CADA,
+                 inactivo=DIARIO_INACTIVO_SEG):
+        self.ruta_diario = f"{ruta_base}.jsonl"
+        self.ruta_snapshot = f"{ruta_base}.snapshot.json"
+        self.intervalo_flush = intervalo_flush
+        self.compactar_cada = compactar_cada
+        self.inactivo = inactivo
+        carpeta = os.path.dirname(ruta_base)
+        if carpeta:
+            os.makedirs(carpeta, exist_ok=True)
+
+        self.errores = 0
+        self.ultimo_error = None
+        self._reintentar = []  # registros de un lote que no se pudo escribir
+
+        self._reparar_diario()
+        self._cola = queue.Queue()
+        self._retomar_compactacion()
+        self._lock = threading.Lock()
+        self._hilo = None
+
+    # ---------- API ----------
+    def agregar(self, registros):
+        for codigo, clave, ubicacion in registros:
+            self._cola.put((codigo, clave, ubicacion))
+        self._asegurar_hilo()
+
+    def vaciar(self):
+        """Borra el diario y el snapshot (tras limpiar los escaneos)."""
+        self._cola.put(_VACIAR)
+        self._asegurar_hilo()
+        self.sincronizar()
+
+    def cerrar(self):
+        """Escribe lo pendiente y termina el hilo escritor (ej. al dejar el almacén)."""
+        self._cola.put(_CERRAR)
+        self._asegurar_hilo()
+        self.sincronizar()
+
+    def sincronizar(self):
+        """
+        Espera a que el hilo procese todo lo encolado.
+        - Retorna False si quedaron registros sin escribir por un error de disco (ver `ultimo_error`).
+        """
+        self._cola.join()
+        return not self._reintentar
+
+    def leer(self):
+        """Snapshot + diario, más los registros que aún esperan reintento."""
+        self.sincronizar()
+        return self._leer_todo() + self._reintentar
+
+    # ---------- Hilo escritor ----------
+    def _asegurar_hilo(self):
+        with self._lock:
+            if self._hilo is None:
+                self._hilo = threading.Thread(target=self._escribir, name="diario-escaneos", daemon=True)
+                self._hilo.start()
+
+    def _terminar_si_vacio(self):
+        """El hilo solo termina si no quedó nada encolado (con el lock de `_asegurar_hilo`)."""
+        with self._lock:
+            if self._cola.empty():
+                self._hilo = None
+                return True
+            return False
+
+    def _escribir(self):
+        while True:
+            try:
+                lote = [self._cola.get(timeout=self.inactivo)]
+            except queue.Empty:
+                if self._terminar_si_vacio():
+                    return
+                continue
+            try:
+                while len(lote) < MAX_LOTE:
+                    lote.append(self._cola.get(timeout=self.intervalo_flush))
+            except queue.Empty:
+                pass
+            try:
+                self._procesar_lote(lote)
+            except Exception as e:
+                # Disco lleno, permisos, fsync...: el hilo sigue vivo para no bloquear `sincronizar`
+                # y los registros del lote se reintentan con el siguiente
+                self.errores += 1
+                self.ultimo_error = e
+            finally:
+                for _ in lote:
+                    self._cola.task_done()
+            if any(item is _CERRAR for item in lote) and self._terminar_si_vacio():
+                return
+
+    def _procesar_lote(self, lote):
+        ultimo_vaciar = max((i for i, item in enumerate(lote) if item is _VACIAR), default=-1)
+        if ultimo_vaciar >= 0:
+            self._reintentar = []
+        # Quedan como pendientes de reintento hasta que estén en disco
+        pendientes = self._reintentar = self._reintentar + [
+            item for item in lote[ultimo_vaciar + 1:] if item is not _CERRAR
+        ]
+        if ultimo_vaciar >= 0:
+            self._borrar_todo()
+        if not pendientes:
+            return
+
+        inicio = os.path.getsize(self.ruta_diario) if os.path.exists(self.ruta_diario) else 0
+        try:
+            with open(self.ruta_diario, "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in pendientes))
+                f.flush()
+                os.fsync(f.fileno())
+        except Exception:
+            # Sin líneas a medias ni repetidas: el lote completo se vuelve a escribir
+            os.truncate(self.ruta_diario, inicio)
+            raise
+        self._reintentar = []
+        self.ultimo_error = None
+        self._lineas_diario += len(pendientes)
+
+        if self._lineas_diario >= self.compactar_cada:
+            self._compactar()
+
+    def _compactar(self):
+        """
+        Snapshot nuevo con todo lo escrito y diario vacío de la generación siguiente.
+        - Ambos archivos se reemplazan de forma atómica; si el proceso cae entre los dos,
+          el diario viejo queda cubierto por el snapshot y no se vuelve a contar.
+        """
+        registros = self._leer_todo()
+        snapshot = {
+            "generacion": self._generacion,
+            "codigos": [r[0] for r in registros],
+            "claves": [r[1] for r in registros],
+            "ubicaciones": [r[2] for r in registros],
+        }
+        _escribir_atomico(self.ruta_snapshot, json.dumps(snapshot, ensure_ascii=False))
+        self._nuevo_diario(self._generacion + 1)
+
+    def _nuevo_diario(self, generacion):
+        _escribir_atomico(self.ruta_diario, json.dumps({"generacion": generacion}) + "\n")
+        self._generacion = generacion
+        self._lineas_diario = 0
+
+    def _retomar_compactacion(self):
+        """Generación y largo del diario; termina una compactación interrumpida por una caída."""
+        generacion_snapshot, _ = _leer_snapshot(self.ruta_snapshot)
+        generacion, lineas = _leer_lineas(self.ruta_diario)
+        if generacion <= generacion_snapshot:
+            self._nuevo_diario(generacion_snapshot + 1)
+        else:
+            self._generacion = generacion
+            self._lineas_diario = len(lineas)
+
+    def _leer_todo(self):
+        return leer_registros(self.ruta_diario, self.ruta_snapshot)
+
+    def _reparar_diario(self):
+        """Recorta una última línea incompleta (caída a mitad de escritura) antes de seguir agregando."""
+        if not os.path.exists(self.ruta_diario):
+            return
+        with open(self.ruta_diario, "rb+") as f:
+            contenido = f.read()
+            if contenido and not contenido.endswith(b"\n"):
+                f.truncate(contenido.rfind(b"\n") + 1)
+
+    def _borrar_todo(self):
+        for ruta in (self.ruta_diario, self.ruta_snapshot):
+            if os.path.exists(ruta):
+                os.remove(ruta)
+        self._generacion = 0
+        self._lineas_diario = 0
+
+
+# ====================================================
+# 🗃️ Diarios abiertos en el proceso
+# ====================================================
+# Un solo DiarioEscaneos vivo por ruta: dos escritores sobre los mismos archivos se pisan
+# (ej. uno nuevo que retoma la compactación mientras el anterior aún vacía su cola)
+_abiertos = weakref.WeakValueDictionary()
+_abiertos_lock = threading.Lock()
+
+
+def abrir_diario(ruta_base, **opciones):
+    """
+    Diario de `ruta_base`, reutilizando la instancia viva si la hay.
+    - Una instancia sigue viva mientras alguien la use o su hilo escritor tenga pendientes,
+      aunque la caché que la abrió ya la haya descartado.
+    """
+    with _abiertos_lock:
+        diario = _abiertos.get(ruta_base)
+        if diario is None:
+            diario = _abiertos[ruta_base] = DiarioEscaneos(ruta_base, **opciones)
+        return diario
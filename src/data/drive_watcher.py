@@ -0,0 +1,140 @@
+import os
+import time
+import threading
+from datetime import datetime, timezone
+
+# ====================================================
+# ⏱️ Configuración (segundos)
+# ====================================================
+DRIVE_METADATA_TTL = float(os.getenv("DRIVE_METADATA_TTL", "60"))
+DRIVE_WATCH_INTERVAL = float(os.getenv("DRIVE_WATCH_INTERVAL", "30"))
+
+MIME_POR_EXTENSION = {
+    ".xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    ".xls": "application/vnd.ms-excel",
+    ".csv": "text/csv",
+}
+
+
+# ====================================================
+# 🔌 Transporte local (sustituto de Drive para pruebas)
+# ====================================================
+class TransporteLocal:
+    """
+    Lista inventarios desde una carpeta local con el mismo formato que Drive.
+    - `modifiedTime` sale del mtime del archivo (ISO 8601, UTC).
+    - `id` es la ruta del archivo.
+    """
+
+    def __init__(self, carpeta):
+        self.carpeta = carpeta
+        self.llamadas = 0
+
+    def listar_inventarios(self, folder_id=None):
+        self.llamadas += 1
+        archivos = []
+        for nombre in os.listdir(self.carpeta):
+            mime = MIME_POR_EXTENSION.get(os.path.splitext(nombre)[1].lower())
+            if not mime:
+                continue
+            ruta = os.path.join(self.carpeta, nombre)
+            modificado = datetime.fromtimestamp(os.path.getmtime(ruta), tz=timezone.utc)
+            archivos.append({
+                "id": ruta,
+                "name": nombre,
+                "mimeType": mime,
+                "modifiedTime": modificado.isoformat().replace("+00:00", "Z"),
+            })
+        return sorted(archivos, key=lambda f: f["modifiedTime"], reverse=True)
+
+
+# ====================================================
+# 🗂️ Metadatos de la carpeta con TTL
+# ====================================================
+class MetadatosDrive:
+    """
+    Caché de la lista de inventarios de la carpeta (más reciente primero).
+    - Sin vigilante: se refresca de forma síncrona al vencer el TTL.
+    - Con vigilante: los reruns siempre leen la caché; el hilo la mantiene al día.
+    """
+
+    def __init__(self, transporte, folder_id, ttl=DRIVE_METADATA_TTL):
+        self.transporte = transporte
+        self.folder_id = folder_id
+        self.ttl = ttl
+        self.vigilado = False
+        self.version = 0
+        self._archivos = None
+        self._obtenido_en = 0.0
+        self._obsoleto = True
+        self._lock = threading.Lock()
+
+    def archivos(self):
+        with self._lock:
+            archivos = self._archivos
+            vigente = (
+                archivos is not None
+                and not self._obsoleto
+                and time.monotonic() - self._obtenido_en < self.ttl
+            )
+        if archivos is not None and (vigente or self.vigilado):
+            return archivos
+        return self.refrescar()
+
+    def refrescar(self):
+        archivos = self.transporte.listar_inventarios(self.folder_id)
+        self.actualizar(archivos)
+        return archivos
+
+    def actualizar(self, archivos):
+        """Guarda una nueva lista; sube la versión solo si cambió algún archivo (id o fecha)."""
+        with self._lock:
+            if _firma(archivos) != _firma(self._archivos):
+                self.version += 1
+            self._archivos = archivos
+            self._obtenido_en = time.monotonic()
+            self._obsoleto = False
+
+    def marcar_obsoleto(self):
+        with self._lock:
+            self._obsoleto = True
+
+
+def _firma(archivos):
+    if not archivos:
+        return None
+    # Toda la lista: en modo múltiple importa cualquier archivo, no solo el más reciente
+    return tuple((a["id"], a["modifiedTime"]) for a in archivos)
+
+
+# ====================================================
+# 👀 Vigilante en segundo plano
+# ====================================================
+class VigilanteDrive(threading.Thread):
+    """Consulta periódicamente el transporte y actualiza los metadatos si aparece un archivo nuevo."""
+
+    def __init__(self, metadatos, intervalo=DRIVE_WATCH_INTERVAL):
+        super().__init__(name="vigilante-drive", daemon=True)
+        self.metadatos = metadatos
+        self.intervalo = intervalo
+        self.errores = 0
+        self._detener = threading.Event()
+
+    def run(self):
+        self.metadatos.vigilado = True
+        try:
+            while not self._detener.wait(self.intervalo):
+                self.revisar()
+        finally:
+            self.metadatos.vigilado = False
+
+    def revisar(self):
+        try:
+            self.metadatos.refrescar()
+        except Exception:
+            # Sin red o sin permisos: se conserva la última lista conocida y se marca obsoleta
+            self.errores += 1
+            self.metadatos.marcar_obsoleto()
+
+    def detener(self):
+        self._detener.set()
@@ -0,0 +1,130 @@
+import os
+import json
+import queue
+import threading
+from contextlib import contextmanager
+
+SCOPES = [
+    "https://www.googleapis.com/auth/drive.readonly",
+    "https://www.googleapis.com/auth/spreadsheets.readonly",
+]
+
+
+# ================================================================
+# 🔐 Credenciales (única implementación: local, variable de entorno o st.secrets)
+# ================================================================
+def cargar_credenciales(scopes=None):
+    """
+    Crea el objeto Credentials de la cuenta de servicio.
+    - En local: credentials.json del proyecto.
+    - En Render: variable de entorno GCP_CREDENTIALS (JSON, sin escribir archivos temporales).
+    - En Streamlit Cloud: st.secrets["gcp_credentials"].
+    """
+    from google.oauth2.service_account import Credentials
+
+    scopes = scopes or SCOPES
+    if os.path.exists("credentials.json"):
+        return Credentials.from_service_account_file("credentials.json", scopes=scopes)
+
+    creds_env = os.getenv("GCP_CREDENTIALS")
+    if creds_env:
+        return Credentials.from_service_account_info(json.loads(creds_env), scopes=scopes)
+
+    try:
+        import streamlit as st
+        creds_json = st.secrets["gcp_credentials"]
+    except Exception:
+        creds_json = None
+    if creds_json:
+        info = json.loads(creds_json) if isinstance(creds_json, str) else dict(creds_json)
+        return Credentials.from_service_account_info(info, scopes=scopes)
+
+    raise RuntimeError("No se encontró la variable de entorno 'GCP_CREDENTIALS'.")
+
+
+# ================================================================
+# 🏭 Fábricas de clientes
+# ================================================================
+class FabricaGoogle:
+    """Construye clientes reales de Drive/Sheets; cada uno con su propia conexión HTTP persistente."""
+
+    def credenciales(self):
+        return cargar_credenciales()
+
+    def drive(self, creds):
+        import httplib2
+        from google_auth_httplib2 import AuthorizedHttp
+        from googleapiclient.discovery import build
+
+        # AuthorizedHttp refresca el token en el mismo objeto Credentials compartido
+        http = AuthorizedHttp(creds, http=httplib2.Http(timeout=60))
+        return build("drive", "v3", http=http, cache_discovery=False)
+
+    def sheets(self, creds):
+        import gspread
+        return gspread.authorize(creds)
+
+
+# ================================================================
+# ♻️ Proveedor de clientes compartido por el proceso
+# ================================================================
+class ProveedorClientes:
+    """
+    Reutiliza credenciales y clientes autorizados entre sesiones y reruns.
+    - Las credenciales se cargan una sola vez y se refrescan en el mismo objeto.
+    - Los clientes se prestan desde un pool (httplib2 no es seguro entre hilos).
+    """
+
+    def __init__(self, fabrica=None, max_clientes=4):
+        self.fabrica = fabrica or FabricaGoogle()
+        self.max_clientes = max_clientes
+        self._creds = None
+        self._lock = threading.Lock()
+        self._pools = {"drive": queue.LifoQueue(), "sheets": queue.LifoQueue()}
+
+    def credenciales(self):
+        with self._lock:
+            if self._creds is None:
+                self._creds = self.fabrica.credenciales()
+            return self._creds
+
+    @contextmanager
+    def _prestar(self, tipo):
+        pool = self._pools[tipo]
+        try:
+            cliente = pool.get_nowait()
+        except queue.Empty:
+            cliente = getattr(self.fabrica, tipo)(self.credenciales())
+        try:
+            yield cliente
+        finally:
+            if pool.qsize() < self.max_clientes:
+                pool.put(cliente)
+
+    def drive(self):
+        """Uso: `with proveedor.drive() as service: ...`"""
+        return self._prestar("drive")
+
+    def sheets(self):
+        """Uso: `with proveedor.sheets() as client: ...`"""
+        return self._prestar("sheets")
+
+    def reiniciar(self):
+        """Descarta credenciales y clientes (ej. tras rotar la cuenta de servicio)."""
+        with self._lock:
+            self._creds = None
+            for tipo in self._pools:
+                self._pools[tipo] = queue.LifoQueue()
+
+
+_proveedor = None
+_proveedor_lock = threading.Lock()
+
+
+def obtener_proveedor():
+    """Proveedor único del proceso."""
+    global _proveedor
+    with _proveedor_lock:
+        if _proveedor is None:
+            _proveedor = ProveedorClientes()
+        return _proveedor
@@ -1,49 +1,24 @@
-import os
-import json
 from io import BytesIO
+from functools import lru_cache
 
 import pandas as pd
-import gspread
 import streamlit as st
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseDownload
 
-# Si ya tienes un helper para credenciales, usa ese; de lo contrario, estas funciones manejan local/toml
-from google.oauth2.service_account import Credentials
+from src.data.parsers import leer_inventario, MODO_PARSEO
+from src.data.lector_sheets import BackendSheetsAPI, leer_inventario_sheets, leer_sheets_completo
+from src.data.snapshot_cache import leer_snapshot, guardar_snapshot
+from src.data.drive_watcher import (
+    MetadatosDrive, VigilanteDrive, DRIVE_METADATA_TTL, DRIVE_WATCH_INTERVAL
+)
+from src.data.google_clients import obtener_proveedor
+from src.data.ingesta_multiple import (
+    DRIVE_MODO, DRIVE_PATRON, seleccionar_archivos, leer_en_paralelo, combinar_inventarios
+)
+from src.logic.instrumentacion import medir, contar
+from src.logic.carga_diferida import diferido
 
-
-# ========= Helpers de credenciales =========
-def get_credentials_path():
-    """
-    Retorna ruta a credentials.json.
-    - En local: usa credentials.json del proyecto.
-    - En Render: crea temporal desde variable de entorno GCP_CREDENTIALS.
-    """
-    if os.path.exists("credentials.json"):
-        return "credentials.json"
-
-    creds_path = "/tmp/credentials.json"
-    creds_env = os.getenv("GCP_CREDENTIALS")
-
-    if not creds_env:
-        raise RuntimeError("No se encontró la variable de entorno 'GCP_CREDENTIALS'.")
-
-    with open(creds_path, "w") as f:
-        f.write(creds_env)
-    return creds_path
-
-
-def get_google_credentials():
-    """
-    Crea objeto Credentials con los SCOPES necesarios para Drive y Sheets.
-    """
-    creds_path = get_credentials_path()
-    SCOPES = [
-        "https://www.googleapis.com/auth/drive.readonly",
-        "https://www.googleapis.com/auth/spreadsheets.readonly",
-    ]
-    creds = Credentials.from_service_account_file(creds_path, scopes=SCOPES)
-    return creds, SCOPES
+# Cliente HTTP de la API de Google: solo se importa al descargar un archivo
+googleapiclient_http = diferido("googleapiclient.http")
 
 
 # ====================================================
@@ -57,13 +32,11 @@ FOLDER_ID = "1vHecH1CsmgSn4oYuCu2uRf0kqV1SKgOQ"
 # ====================================================
 def list_drive_files():
     """Lista todos los archivos visibles en la carpeta de Drive."""
-    creds, _ = get_google_credentials()
-    service = build("drive", "v3", credentials=creds)
-
-    results = service.files().list(
-        q=f"'{FOLDER_ID}' in parents",
-        fields="files(id, name, mimeType, modifiedTime)"
-    ).execute()
+    with obtener_proveedor().drive() as service:
+        results = service.files().list(
+            q=f"'{FOLDER_ID}' in parents",
+            fields="files(id, name, mimeType, modifiedTime)"
+        ).execute()
 
     files = results.get("files", [])
     if not files:
@@ -77,29 +50,51 @@ def list_drive_files():
 
 
 # ====================================================
-# 🔍 Buscar el archivo más reciente compatible
+# 🔌 Transporte Drive (API real)
 # ====================================================
-def get_latest_file_info():
-    """Busca el archivo más reciente (.xlsx, .xls, .csv o Google Sheet)."""
-    creds, _ = get_google_credentials()
-    service = build("drive", "v3", credentials=creds)
-
-    query = (
-        f"'{FOLDER_ID}' in parents and ("
-        f"mimeType='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet' or "
-        f"mimeType='application/vnd.ms-excel' or "
-        f"mimeType='text/csv' or "
-        f"mimeType='application/vnd.google-apps.spreadsheet')"
-    )
+class TransporteDriveAPI:
+    """Lista los inventarios compatibles de una carpeta usando la API de Drive."""
+
+    def listar_inventarios(self, folder_id):
+        query = (
+            f"'{folder_id}' in parents and ("
+            f"mimeType='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet' or "
+            f"mimeType='application/vnd.ms-excel' or "
+            f"mimeType='text/csv' or "
+            f"mimeType='application/vnd.google-apps.spreadsheet')"
+        )
+
+        contar("drive.llamadas")
+        with medir("drive.listar"), obtener_proveedor().drive() as service:
+            results = service.files().list(
+                q=query,
+                orderBy="modifiedTime desc",
+                # En modo múltiple se listan más archivos para poder filtrarlos por patrón
+                pageSize=100 if DRIVE_MODO == "multiple" else 5,
+                fields="files(id, name, mimeType, modifiedTime)"
+            ).execute()
+        return results.get("files", [])
+
+
+@st.cache_resource(show_spinner=False)
+def obtener_metadatos_drive():
+    """
+    Metadatos de la carpeta compartidos por todo el proceso.
+    - TTL configurable con DRIVE_METADATA_TTL.
+    - Si DRIVE_WATCH_INTERVAL > 0, un hilo vigila la carpeta y los reruns nunca esperan a Drive.
+    """
+    metadatos = MetadatosDrive(TransporteDriveAPI(), FOLDER_ID, ttl=DRIVE_METADATA_TTL)
+    if DRIVE_WATCH_INTERVAL > 0:
+        VigilanteDrive(metadatos, intervalo=DRIVE_WATCH_INTERVAL).start()
+    return metadatos
 
-    results = service.files().list(
-        q=query,
-        orderBy="modifiedTime desc",
-        pageSize=5,
-        fields="files(id, name, mimeType, modifiedTime)"
-    ).execute()
 
-    files = results.get("files", [])
+# ====================================================
+# 🔍 Buscar el archivo más reciente compatible
+# ====================================================
+def get_latest_file_info():
+    """Busca el archivo más reciente (.xlsx, .xls, .csv o Google Sheet) usando la caché de metadatos."""
+    files = obtener_metadatos_drive().archivos()
     if not files:
         st.warning("⚠️ No se encontraron archivos Excel ni Google Sheets en la carpeta.")
         list_drive_files()
@@ -113,83 +108,160 @@ def get_latest_file_info():
 # ====================================================
 # 📥 Descargar y leer el archivo
 # ====================================================
+def leer_archivo_drive(file_id, mime_type, file_name, modified_time=None):
+    """
+    Descarga un archivo de Drive y lo lee como DataFrame, sin usar Streamlit (se puede llamar desde hilos).
+    - Si hay snapshot local para (file_id, modifiedTime), lo lee del disco sin tocar Drive.
+    - Retorna (df, hoja_detectada); si algo falla, lanza la excepción.
+    """
+    # 💾 Snapshot local de esta versión del archivo
+    if modified_time:
+        with medir("carga.snapshot"):
+            df_cache = leer_snapshot(file_id, modified_time)
+        if df_cache is not None:
+            contar("cache.snapshot.acierto")
+            return df_cache, None
+        contar("cache.snapshot.fallo")
+
+    proveedor = obtener_proveedor()
+    found_sheet = None
+
+    # === Caso 1: Google Sheets ===
+    if mime_type == "application/vnd.google-apps.spreadsheet":
+        df = None
+        if MODO_PARSEO == "streaming":
+            with medir("sheets.lectura"):
+                df, _ = leer_inventario_sheets(BackendSheetsAPI(proveedor), file_id)
+        if df is None:
+            # Faltan columnas requeridas (o modo completo): lectura original de todas las celdas
+            contar("sheets.llamadas")
+            with medir("sheets.lectura_completa"), proveedor.sheets() as client:
+                df = leer_sheets_completo(client, file_id)
+
+    # === Caso 2: Excel o CSV ===
+    else:
+        buffer = BytesIO()
+        contar("drive.llamadas")
+        with medir("drive.descarga"), proveedor.drive() as service:
+            request = service.files().get_media(fileId=file_id)
+            downloader = googleapiclient_http.MediaIoBaseDownload(buffer, request)
+            done = False
+            while not done:
+                _, done = downloader.next_chunk()
+        buffer.seek(0)
+
+        with medir("carga.parseo"):
+            df, found_sheet = leer_inventario(buffer, file_name)
+
+    # 🧹 Normalizar encabezados (solo quitar espacios)
+    df.columns = df.columns.str.strip()
+
+    if modified_time and not df.empty:
+        guardar_snapshot(df, file_id, modified_time)
+    return df, found_sheet
+
+
 @st.cache_data(show_spinner=False)
-def load_data_from_drive(file_id, mime_type, file_name):
+def load_data_from_drive(file_id, mime_type, file_name, modified_time=None):
     """
-    Descarga el archivo desde Drive y lo carga como DataFrame.
+    Descarga el archivo desde Drive y lo carga como DataFrame (ver `leer_archivo_drive`).
     - Si es Google Sheet: intenta hoja 'LISTADO', si no, la primera hoja.
+      Por defecto pide solo las columnas requeridas por lotes de filas (ver src/data/lector_sheets.py).
     - Si es Excel/CSV: intenta hoja 'LISTADO' (case-insensitive, strip), si no, la primera hoja.
+      Por defecto lee por streaming solo las columnas requeridas (ver src/data/parsers.py).
     - Limpia encabezados (solo strip de espacios). NO cambia mayúsc/minúsc para no romper lógica externa.
     """
-    creds, _ = get_google_credentials()
-    service = build("drive", "v3", credentials=creds)
-
-    df = pd.DataFrame()  # fallback seguro
+    # Esta función solo se ejecuta cuando st.cache_data no tiene el archivo
+    contar("cache.datos.fallo")
 
     try:
-        # === Caso 1: Google Sheets ===
-        if mime_type == "application/vnd.google-apps.spreadsheet":
-            client = gspread.authorize(creds)
-            try:
-                sheet = client.open_by_key(file_id).worksheet("LISTADO")
-            except Exception:
-                sheet = client.open_by_key(file_id).sheet1
-            data = sheet.get_all_records()
-            df = pd.DataFrame(data)
-
-        # === Caso 2: Excel o CSV ===
-        else:
-            request = service.files().get_media(fileId=file_id)
-            buffer = BytesIO()
-            downloader = MediaIoBaseDownload(buffer, request)
-            done = False
-            while not done:
-                _, done = downloader.next_chunk()
-            buffer.seek(0)
-
-            if file_name.lower().endswith(".csv"):
-                df = pd.read_csv(buffer)
-            else:
-                xls = pd.ExcelFile(buffer, engine="openpyxl")
-                sheet_names = [s.strip() for s in xls.sheet_names]
-                sheet_names_lower = [s.lower() for s in sheet_names]
-
-                # Buscar hoja que contenga las palabras clave "listado", "stock" o "inventario"
-                keywords = ["listado", "stock", "inventario"]
-                found_sheet = None
-                for name in sheet_names:
-                    name_lower = name.strip().lower()
-                    if any(k in name_lower for k in keywords):
-                        found_sheet = name
-                        break
-
-                if found_sheet:
-                    st.info(f"📄 Usando hoja detectada automáticamente: {found_sheet}")
-                    df = pd.read_excel(xls, sheet_name=found_sheet)
-                else:
-                    df = pd.read_excel(xls, sheet_name=xls.sheet_names[0])
-
-
-        # 🧹 Normalizar encabezados (solo quitar espacios)
-        df.columns = df.columns.str.strip()
-
+        df, found_sheet = leer_archivo_drive(file_id, mime_type, file_name, modified_time)
     except Exception as e:
         st.error(f"❌ Error al leer el archivo: {e}")
+        return pd.DataFrame()  # siempre DataFrame
 
-    return df  # siempre DataFrame
+    if found_sheet:
+        st.info(f"📄 Usando hoja detectada automáticamente: {found_sheet}")
+    return df
+
+
+# ====================================================
+# 🗃️ Varios archivos combinados (DRIVE_MODO=multiple)
+# ====================================================
+@lru_cache(maxsize=32)
+def _leer_version(file_id, mime_type, file_name, modified_time):
+    """
+    Un archivo en una versión concreta, en memoria del proceso (compartido: no modificar).
+    - Al subir un archivo nuevo solo ese se vuelve a leer; el resto sale de aquí o del snapshot.
+    """
+    contar("cache.archivo.fallo")
+    return leer_archivo_drive(file_id, mime_type, file_name, modified_time)[0]
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def load_multiple_from_drive(versiones):
+    """
+    Lee en paralelo y combina varios archivos (ver src/data/ingesta_multiple.py).
+    - `versiones`: tupla de (file_id, mimeType, name, modifiedTime) en orden de prioridad.
+    - Retorna (df, errores) con errores = [(versión, mensaje)] de los archivos que no se pudieron leer.
+    """
+    contar("cache.datos.fallo")
+    with medir("carga.multiple"):
+        resultados = leer_en_paralelo(list(versiones), lambda version: _leer_version(*version))
+        df = combinar_inventarios([df for _, df, error in resultados if error is None])
+    errores = [(version, str(error)) for version, _, error in resultados if error is not None]
+    return df, errores
+
+
+def get_drive_data_multiple():
+    """Combina los archivos de la carpeta que coinciden con DRIVE_PATRON (los más recientes primero)."""
+    archivos = seleccionar_archivos(obtener_metadatos_drive().archivos(), DRIVE_PATRON)
+    if not archivos:
+        st.warning(f"⚠️ No se encontraron archivos que coincidan con '{DRIVE_PATRON}' en la carpeta.")
+        list_drive_files()
+        return pd.DataFrame(), None
+
+    st.info(f"📄 Combinando {len(archivos)} archivos: " + ", ".join(f"**{a['name']}**" for a in archivos))
+    versiones = tuple((a["id"], a["mimeType"], a["name"], a["modifiedTime"]) for a in archivos)
+
+    contar("cache.datos.consulta")
+    df, errores = load_multiple_from_drive(versiones)
+    if errores:
+        for (_, _, nombre, _), mensaje in errores:
+            st.warning(f"⚠️ No se pudo leer '{nombre}': {mensaje}")
+        # No dejar el resultado parcial en caché: en el próximo rerun se reintentan los que fallaron
+        load_multiple_from_drive.clear()
+
+    # Identificador de la combinación cargada (para los índices cacheados por archivo)
+    fallidos = {version for version, _ in errores}
+    df.attrs["snapshot_id"] = "||".join(
+        f"{version[0]}|{version[3]}" for version in versiones if version not in fallidos
+    )
+    if df.empty:
+        st.warning("⚠️ Los archivos seleccionados no contienen datos.")
+    return df, f"{len(archivos) - len(errores)} archivos ({DRIVE_PATRON})"
 
 
 # ====================================================
 # 🚀 Controlador principal
 # ====================================================
 def get_drive_data():
-    """Obtiene automáticamente el archivo más reciente desde Google Drive."""
-    file_id, file_name, mime_type, _ = get_latest_file_info()
+    """
+    Obtiene automáticamente el inventario desde Google Drive.
+    - Por defecto el archivo más reciente; con DRIVE_MODO=multiple, varios archivos combinados.
+    """
+    if DRIVE_MODO == "multiple":
+        return get_drive_data_multiple()
+
+    file_id, file_name, mime_type, modified_time = get_latest_file_info()
     if not file_id:
         return pd.DataFrame(), None
 
     try:
-        df = load_data_from_drive(file_id, mime_type, file_name)
+        contar("cache.datos.consulta")
+        df = load_data_from_drive(file_id, mime_type, file_name, modified_time)
+        # Identificador de la versión cargada (para los índices cacheados por archivo)
+        df.attrs["snapshot_id"] = f"{file_id}|{modified_time}"
         if df.empty:
             st.warning(f"⚠️ El archivo '{file_name}' no contiene datos o está vacío.")
         return df, file_name
@@ -0,0 +1,84 @@
+import os
+import fnmatch
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.data.parsers import COLUMNAS_REQUERIDAS
+
+# ====================================================
+# 🗃️ Varios inventarios de la carpeta (uno por almacén o zona)
+# ====================================================
+# DRIVE_MODO: "reciente" (solo el archivo más reciente) o "multiple" (todos los que
+# coincidan con DRIVE_PATRON, hasta DRIVE_MAX_ARCHIVOS, los más recientes primero).
+DRIVE_MODO = os.getenv("DRIVE_MODO", "reciente")
+DRIVE_PATRON = os.getenv("DRIVE_PATRON", "*")
+DRIVE_MAX_ARCHIVOS = int(os.getenv("DRIVE_MAX_ARCHIVOS", "20"))
+DRIVE_HILOS = int(os.getenv("DRIVE_HILOS", "4"))
+
+# Una fila de inventario se identifica por almacén + producto + referencia + ubicación
+COLUMNAS_DEDUPLICACION = ["ALMACEN_NOMBRE", "PRODUCTO_CODIGO", "REFERENCIA1", "UBICACION_NOMBRE"]
+
+
+def seleccionar_archivos(archivos, patron=None, max_archivos=None):
+    """
+    Archivos a combinar, en orden de prioridad (más reciente primero).
+    - `patron`: comodines sobre el nombre, sin distinguir mayúsculas (ej. "inventario_*.xlsx").
+    - Empates de fecha se ordenan por nombre e id para que el resultado sea siempre el mismo.
+    """
+    patron = (patron or "*").lower()
+    max_archivos = max_archivos or DRIVE_MAX_ARCHIVOS
+    elegidos = [a for a in archivos if fnmatch.fnmatch(a["name"].lower(), patron)]
+    elegidos.sort(key=lambda a: (a["name"], a["id"]))
+    elegidos.sort(key=lambda a: a["modifiedTime"], reverse=True)
+    return elegidos[:max_archivos]
+
+
+def leer_en_paralelo(archivos, leer, hilos=None):
+    """
+    Ejecuta `leer(archivo)` para cada archivo con un pool acotado de hilos.
+    - Retorna [(archivo, df, error)] en el mismo orden que `archivos`.
+    """
+    hilos = max(1, min(hilos or DRIVE_HILOS, len(archivos)))
+
+    def _leer(archivo):
+        try:
+            return archivo, leer(archivo), None
+        except Exception as e:
+            return archivo, None, e
+
+    if hilos == 1:
+        return [_leer(a) for a in archivos]
+    with ThreadPoolExecutor(max_workers=hilos, thread_name_prefix="ingesta") as ejecutor:
+        return list(ejecutor.map(_leer, archivos))
+
+
+def combinar_inventarios(partes):
+    """
+    Une los inventarios (en orden de prioridad) en un solo DataFrame.
+    - Encabezados requeridos se unifican (strip + mayúsculas) para que coincidan entre archivos.
+    - Si la misma fila (almacén, producto, referencia, ubicación) viene en varios archivos,
+      se conservan solo las filas del archivo de mayor prioridad (el más reciente).
+    - Dentro de un mismo archivo no se elimina nada.
+    """
+    partes = [p for p in partes if p is not None and not p.empty]
+    if not partes:
+        return pd.DataFrame()
+
+    requeridas = set(COLUMNAS_REQUERIDAS)
+    partes = [
+        p.rename(columns=lambda c: str(c).strip().upper() if str(c).strip().upper() in requeridas else c)
+        for p in partes
+    ]
+    df = pd.concat(partes, ignore_index=True, sort=False)
+    if len(partes) == 1 or not all(c in df.columns for c in COLUMNAS_DEDUPLICACION):
+        return df
+
+    origen = np.repeat(np.arange(len(partes)), [len(p) for p in partes])
+    grupo = df[COLUMNAS_DEDUPLICACION].astype(str).groupby(COLUMNAS_DEDUPLICACION, sort=False).ngroup().to_numpy()
+    prioridad = pd.Series(origen).groupby(grupo).transform("min").to_numpy()
+    conservar = origen == prioridad
+    if conservar.all():
+        return df
+    return df[conservar].reset_index(drop=True)
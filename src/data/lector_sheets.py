@@ -0,0 +1,252 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.data.parsers import COLUMNAS_NUMERICAS, _indices_requeridos, _construir_columnas
+from src.logic.instrumentacion import contar
+from src.logic.carga_diferida import diferido
+
+# gspread se importa recién al leer la primera hoja
+gspread_utils = diferido("gspread.utils")
+
+# ====================================================
+# 📗 Lectura por lotes de Google Sheets
+# ====================================================
+# En vez de get_all_records (todas las celdas como lista de dicts), se lee el
+# encabezado, se ubican las columnas requeridas y se piden solo esos rangos con
+# values:batchGet (por columnas), en lotes de filas paralelos.
+#
+# Las celdas se tratan igual que en get_all_records (lectura original), para que las
+# claves no cambien: valor con formato + numericise de gspread, celdas vacías como "".
+# Única diferencia conocida: pandas pasaba a float una columna de códigos con enteros y
+# decimales mezclados ('123' quedaba '123.0'); aquí cada celda conserva su propio texto.
+# INVENTARIO_PARSEO=completo vuelve a la lectura original.
+SHEETS_FILAS_POR_LOTE = int(os.getenv("SHEETS_FILAS_POR_LOTE", "20000"))
+SHEETS_HILOS = int(os.getenv("SHEETS_HILOS", "4"))
+
+HOJA_PREFERIDA = "LISTADO"
+
+
+def letra_columna(indice):
+    """Letra A1 de una columna (0 → A, 26 → AA)."""
+    letras = ""
+    indice += 1
+    while indice:
+        indice, resto = divmod(indice - 1, 26)
+        letras = chr(ord("A") + resto) + letras
+    return letras
+
+
+def indice_columna(letras):
+    """Inversa de `letra_columna` (A → 0)."""
+    indice = 0
+    for letra in letras.upper():
+        indice = indice * 26 + ord(letra) - ord("A") + 1
+    return indice - 1
+
+
+def _hoja_a1(titulo):
+    return "'" + titulo.replace("'", "''") + "'"
+
+
+# ====================================================
+# 🔌 Backends (API real y falso en memoria)
+# ====================================================
+class BackendSheetsAPI:
+    """
+    Sheets API v4 a través de los clientes gspread del proveedor compartido.
+    - Usa el cliente HTTP de gspread (respuestas JSON crudas, sin objetos Cell/ValueRange).
+    - Cada llamada toma prestado su propio cliente del pool (se puede usar desde varios hilos).
+    """
+
+    def __init__(self, proveedor):
+        self.proveedor = proveedor
+
+    def hojas(self, spreadsheet_id):
+        """[(título, filas)] en el orden del libro."""
+        contar("sheets.llamadas")
+        with self.proveedor.sheets() as client:
+            meta = client.http_client.fetch_sheet_metadata(spreadsheet_id, params={
+                "includeGridData": "false",
+                "fields": "sheets.properties(title,index,gridProperties.rowCount)",
+            })
+        propiedades = sorted((s["properties"] for s in meta.get("sheets", [])), key=lambda p: p.get("index", 0))
+        return [(p["title"], p.get("gridProperties", {}).get("rowCount", 0)) for p in propiedades]
+
+    def leer_rangos(self, spreadsheet_id, rangos, por_columnas=True):
+        """Valores sin formato de cada rango (una sola llamada batchGet)."""
+        contar("sheets.llamadas")
+        with self.proveedor.sheets() as client:
+            respuesta = client.http_client.values_batch_get(spreadsheet_id, rangos, params={
+                "valueRenderOption": "FORMATTED_VALUE",
+                "majorDimension": "COLUMNS" if por_columnas else "ROWS",
+            })
+        return [rango.get("values", []) for rango in respuesta.get("valueRanges", [])]
+
+
+class BackendSheetsFalso:
+    """
+    Backend en memoria con la misma interfaz (pruebas y benchmarks, sin red).
+    - `hojas`: {título: DataFrame}; las columnas del DataFrame son el encabezado (fila 1).
+    - Imita a la API: valores con formato (texto), celdas vacías como "", sin celdas vacías al
+      final de cada columna/fila. Los números se muestran con formato automático (5.0 → "5").
+    - `pedidos` guarda los rangos de cada llamada.
+    """
+
+    def __init__(self, hojas, filas_extra=0):
+        self._hojas = hojas
+        self._filas_extra = filas_extra  # filas vacías al final de la grilla, como en Sheets
+        self._lock = threading.Lock()
+        self._columnas_por_hoja = {}
+        self.pedidos = []
+
+    def hojas(self, spreadsheet_id):
+        with self._lock:
+            self.pedidos.append(("hojas", spreadsheet_id))
+        return [(titulo, len(df) + 1 + self._filas_extra) for titulo, df in self._hojas.items()]
+
+    def _columnas(self, titulo):
+        """Celdas de la hoja por columna (encabezado incluido); se arman una sola vez."""
+        with self._lock:
+            columnas = self._columnas_por_hoja.get(titulo)
+            if columnas is None:
+                df = self._hojas[titulo]
+                columnas = [
+                    [nombre] + [formato_automatico(v) for v in df[nombre].astype(object).where(df[nombre].notna(), "")]
+                    for nombre in df.columns
+                ]
+                self._columnas_por_hoja[titulo] = columnas
+        return columnas
+
+    def leer_rangos(self, spreadsheet_id, rangos, por_columnas=True):
+        with self._lock:
+            self.pedidos.append(("rangos", tuple(rangos)))
+        resultado = []
+        for rango in rangos:
+            hoja, celdas = rango.rsplit("!", 1)
+            columnas = self._columnas(hoja[1:-1].replace("''", "'"))
+            inicio, fin = celdas.split(":")
+            if inicio.isdigit():  # filas completas (ej. 1:1)
+                fila_inicio, fila_fin = int(inicio), int(fin)
+                posiciones = range(len(columnas))
+            else:
+                letra = inicio.rstrip("0123456789")
+                fila_inicio, fila_fin = int(inicio[len(letra):]), int(fin[len(letra):])
+                posiciones = [indice_columna(letra)]
+            bloque = [columnas[c][fila_inicio - 1:fila_fin] if c < len(columnas) else [] for c in posiciones]
+            if not por_columnas:
+                bloque = [list(fila) for fila in zip(*bloque)]
+            bloque = [self._recortar(v) for v in bloque]
+            while bloque and not bloque[-1]:
+                bloque.pop()
+            resultado.append(bloque)
+        return resultado
+
+    @staticmethod
+    def _recortar(valores):
+        fin = len(valores)
+        while fin and valores[fin - 1] == "":
+            fin -= 1
+        return valores[:fin]
+
+
+def formato_automatico(valor):
+    """Texto que muestra Sheets para un valor con formato automático (123.0 → '123')."""
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    return str(valor)
+
+
+# ====================================================
+# ⚡ Lector
+# ====================================================
+_ESPECIALES_FLOAT = {"nan", "inf", "infinity"}
+
+
+def _numericise(valor):
+    """
+    numericise de gspread (como get_all_records): '00123' → 123, '1,234.5' → 1234.5.
+    - Solo se intenta la conversión si el texto puede ser un número (la mayoría de los códigos no).
+    """
+    inicio = valor.lstrip()[:1]
+    if inicio and (inicio.isdigit() or inicio in "+-." or valor.strip().lower() in _ESPECIALES_FLOAT):
+        return gspread_utils.numericise(valor)
+    return valor
+
+
+def _columna_tipada(valores, n, numerica):
+    """Lista de la API → array de `n` filas ("" en celdas de texto vacías o ausentes, None si son numéricas)."""
+    if numerica:
+        columna = np.full(n, None, dtype=object)
+        columna[:len(valores)] = [None if v == "" else _numericise(v) for v in valores]
+    else:
+        columna = np.full(n, "", dtype=object)
+        columna[:len(valores)] = [v if v == "" else str(_numericise(v)) for v in valores]
+    return columna
+
+
+def leer_inventario_sheets(backend, spreadsheet_id, filas_por_lote=None, hilos=None):
+    """
+    Lee solo las columnas requeridas de la hoja 'LISTADO' (o la primera).
+    - 1 llamada de metadatos + 1 de encabezado + 1 batchGet por lote de filas (en paralelo).
+    Retorna (df, hoja) o (None, hoja) si el encabezado no tiene todas las columnas.
+    """
+    filas_por_lote = filas_por_lote or SHEETS_FILAS_POR_LOTE
+    hilos = hilos or SHEETS_HILOS
+
+    hojas = backend.hojas(spreadsheet_id)
+    if not hojas:
+        return None, None
+    titulo, total_filas = next(((t, n) for t, n in hojas if t == HOJA_PREFERIDA), hojas[0])
+    hoja = _hoja_a1(titulo)
+
+    encabezado = backend.leer_rangos(spreadsheet_id, [f"{hoja}!1:1"], por_columnas=False)[0]
+    indices = _indices_requeridos(encabezado[0] if encabezado else [])
+    if indices is None:
+        return None, titulo
+
+    letras = [letra_columna(i) for i, _ in indices.values()]
+    lotes = [(inicio, min(inicio + filas_por_lote - 1, total_filas)) for inicio in range(2, total_filas + 1, filas_por_lote)]
+
+    def leer_lote(lote):
+        inicio, fin = lote
+        return backend.leer_rangos(spreadsheet_id, [f"{hoja}!{l}{inicio}:{l}{fin}" for l in letras])
+
+    if len(lotes) > 1 and hilos > 1:
+        with ThreadPoolExecutor(max_workers=min(hilos, len(lotes)), thread_name_prefix="sheets") as ejecutor:
+            respuestas = list(ejecutor.map(leer_lote, lotes))
+    else:
+        respuestas = [leer_lote(lote) for lote in lotes]
+
+    # --- Columnas tipadas por lote (en el orden de las filas) ---
+    valores = {clave: [] for clave in indices}
+    for (inicio, fin), columnas in zip(lotes, respuestas):
+        n = fin - inicio + 1
+        bloque = {
+            clave: _columna_tipada(col[0] if col else [], n, clave in COLUMNAS_NUMERICAS)
+            for clave, col in zip(indices, columnas)
+        }
+        # Filas totalmente vacías (ej. el final de la grilla) se descartan
+        con_datos = np.zeros(n, dtype=bool)
+        for columna in bloque.values():
+            con_datos |= pd.notna(columna) & (columna != "")
+        for clave, columna in bloque.items():
+            valores[clave].append(columna[con_datos])
+
+    valores = {
+        clave: np.concatenate(partes) if partes else np.empty(0, dtype=object)
+        for clave, partes in valores.items()
+    }
+    return _construir_columnas(valores, indices), titulo
+
+
+def leer_sheets_completo(client, spreadsheet_id):
+    """Lectura original de la hoja (todas las columnas, get_all_records)."""
+    try:
+        sheet = client.open_by_key(spreadsheet_id).worksheet(HOJA_PREFERIDA)
+    except Exception:
+        sheet = client.open_by_key(spreadsheet_id).sheet1
+    return pd.DataFrame(sheet.get_all_records())
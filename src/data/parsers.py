@@ -0,0 +1,159 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# ====================================================
+# 📋 Columnas que usa la app (ver seleccionar_almacen)
+# ====================================================
+COLUMNAS_REQUERIDAS = ["ALMACEN_NOMBRE", "PRODUCTO_CODIGO", "REFERENCIA1", "STOCK_REFERENCIAUBICACION", "UBICACION_NOMBRE"]
+COLUMNAS_NUMERICAS = ["STOCK_REFERENCIAUBICACION"]
+
+# Palabras clave para detectar la hoja de inventario
+PALABRAS_CLAVE_HOJA = ["listado", "stock", "inventario"]
+
+# "streaming" (solo columnas requeridas, tipos explícitos) o "completo" (lectura original)
+MODO_PARSEO = os.getenv("INVENTARIO_PARSEO", "streaming")
+CSV_CHUNKSIZE = 50_000
+
+
+def detectar_hoja(sheet_names):
+    """Primera hoja cuyo nombre contenga 'listado', 'stock' o 'inventario' (o None)."""
+    for name in sheet_names:
+        name_lower = name.strip().lower()
+        if any(k in name_lower for k in PALABRAS_CLAVE_HOJA):
+            return name
+    return None
+
+
+def _indices_requeridos(encabezados):
+    """Posición de cada columna requerida en el encabezado (strip + mayúsculas), o None si falta alguna."""
+    indices = {}
+    for i, h in enumerate(encabezados):
+        if h is None:
+            continue
+        nombre = str(h).strip()
+        clave = nombre.upper()
+        if clave in COLUMNAS_REQUERIDAS and clave not in indices:
+            indices[clave] = (i, nombre)
+    if len(indices) < len(COLUMNAS_REQUERIDAS):
+        return None
+    return indices
+
+
+# Texto de las columnas de código frente a la lectura original (pd.read_excel / read_csv):
+# - Enteros siempre sin '.0': antes una columna con alguna celda vacía pasaba a float y
+#   sus códigos quedaban como '123.0' (el código de barras impreso dice '123').
+# - CSV: los códigos se leen como texto y conservan ceros a la izquierda ('00123');
+#   antes pandas los convertía a número ('123').
+# - Celdas vacías: siguen formando claves con 'nan' (ver almacenes.texto_clave).
+# Para volver al texto anterior (ej. comparar con reportes viejos): INVENTARIO_PARSEO=completo.
+def _a_texto(valor):
+    """Texto de una celda (enteros sin '.0', como los lee pandas); None si está vacía."""
+    if valor is None:
+        return None
+    if isinstance(valor, float):
+        if np.isnan(valor):
+            return None
+        if valor.is_integer():
+            return str(int(valor))
+    return str(valor)
+
+
+def _construir_columnas(valores, indices):
+    """Arma el DataFrame final con tipos explícitos a partir de listas por columna."""
+    datos = {}
+    for clave, (_, nombre) in indices.items():
+        if clave in COLUMNAS_NUMERICAS:
+            datos[nombre] = pd.to_numeric(pd.Series(valores[clave], dtype=object), errors="coerce").astype("float64")
+        else:
+            datos[nombre] = pd.Series(valores[clave], dtype=object)
+    return pd.DataFrame(datos)
+
+
+# ====================================================
+# 📄 Lectura original (todas las columnas)
+# ====================================================
+def leer_completo(buffer, file_name):
+    """Lectura completa del archivo (modo original). Retorna (df, hoja_detectada)."""
+    if file_name.lower().endswith(".csv"):
+        return pd.read_csv(buffer), None
+
+    xls = pd.ExcelFile(buffer, engine="openpyxl")
+    found_sheet = detectar_hoja(xls.sheet_names)
+    if found_sheet:
+        return pd.read_excel(xls, sheet_name=found_sheet), found_sheet.strip()
+    return pd.read_excel(xls, sheet_name=xls.sheet_names[0]), None
+
+
+# ====================================================
+# ⚡ Lectura por streaming (solo columnas requeridas)
+# ====================================================
+def leer_excel_streaming(buffer):
+    """
+    Recorre la hoja fila a fila (openpyxl read_only) guardando solo las columnas requeridas.
+    Retorna (df, hoja_detectada) o (None, hoja) si el encabezado no tiene todas las columnas.
+    """
+    from openpyxl import load_workbook
+
+    wb = load_workbook(buffer, read_only=True, data_only=True)
+    try:
+        found_sheet = detectar_hoja(wb.sheetnames)
+        ws = wb[found_sheet] if found_sheet else wb[wb.sheetnames[0]]
+        filas = ws.iter_rows(values_only=True)
+
+        encabezados = next(filas, None)
+        indices = _indices_requeridos(encabezados or [])
+        hoja = found_sheet.strip() if found_sheet else None
+        if indices is None:
+            return None, hoja
+
+        valores = {clave: [] for clave in indices}
+        posiciones = [(clave, i) for clave, (i, _) in indices.items()]
+        for fila in filas:
+            celdas = [fila[i] if i < len(fila) else None for _, i in posiciones]
+            if all(c is None for c in celdas):
+                continue
+            for (clave, _), celda in zip(posiciones, celdas):
+                valores[clave].append(celda if clave in COLUMNAS_NUMERICAS else _a_texto(celda))
+        return _construir_columnas(valores, indices), hoja
+    finally:
+        wb.close()
+
+
+def leer_csv_streaming(buffer, chunksize=CSV_CHUNKSIZE):
+    """
+    Lee el CSV por bloques proyectando solo las columnas requeridas con tipos explícitos.
+    Retorna None si el encabezado no tiene todas las columnas.
+    """
+    encabezados = list(pd.read_csv(buffer, nrows=0).columns)
+    buffer.seek(0)
+    indices = _indices_requeridos(encabezados)
+    if indices is None:
+        return None
+
+    usecols = [encabezados[i] for i, _ in indices.values()]
+    dtype = {
+        encabezados[i]: ("float64" if clave in COLUMNAS_NUMERICAS else str)
+        for clave, (i, _) in indices.items()
+    }
+    bloques = pd.read_csv(buffer, usecols=usecols, dtype=dtype, chunksize=chunksize)
+    return pd.concat(list(bloques), ignore_index=True)
+
+
+def leer_inventario(buffer, file_name, modo=None):
+    """
+    Lee un inventario Excel/CSV desde un buffer. Retorna (df, hoja_detectada).
+    - En modo streaming, si faltan columnas requeridas se hace la lectura completa
+      para que la validación de columnas muestre lo que trae el archivo.
+    """
+    modo = modo or MODO_PARSEO
+    if modo == "streaming":
+        if file_name.lower().endswith(".csv"):
+            df, hoja = leer_csv_streaming(buffer), None
+        else:
+            df, hoja = leer_excel_streaming(buffer)
+        if df is not None:
+            return df, hoja
+        buffer.seek(0)
+    return leer_completo(buffer, file_name)
@@ -0,0 +1,113 @@
+import os
+import time
+import sqlite3
+import threading
+
+# ====================================================
+# 👥 Conteo compartido entre operadores (SQLite en modo WAL)
+# ====================================================
+CONTEO_DB = os.getenv("CONTEO_DB", os.path.join(".cache", "conteos.sqlite3"))
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS escaneos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    almacen TEXT NOT NULL,
+    conteo_id TEXT NOT NULL,
+    operador TEXT,
+    codigo TEXT NOT NULL,
+    clave TEXT NOT NULL,
+    ubicacion TEXT NOT NULL,
+    creado REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_escaneos_conteo ON escaneos (almacen, conteo_id, id);
+CREATE TABLE IF NOT EXISTS totales (
+    almacen TEXT NOT NULL,
+    conteo_id TEXT NOT NULL,
+    clave TEXT NOT NULL,
+    cantidad INTEGER NOT NULL,
+    PRIMARY KEY (almacen, conteo_id, clave)
+);
+"""
+
+
+class SesionConteoCompartida:
+    """
+    Conteo de un almacén compartido por varias sesiones/operadores.
+    - Cada hilo usa su propia conexión; WAL permite leer mientras otro escribe.
+    - Las escrituras son transacciones cortas (BEGIN IMMEDIATE) para no bloquear la UI.
+    - `leer_desde(id)` devuelve solo lo nuevo, para actualizar el estado local de forma incremental.
+    """
+
+    def __init__(self, almacen, conteo_id, ruta_db=None):
+        self.almacen = str(almacen)
+        self.conteo_id = str(conteo_id)
+        self.ruta_db = ruta_db or CONTEO_DB
+        self._local = threading.local()
+        carpeta = os.path.dirname(self.ruta_db)
+        if carpeta:
+            os.makedirs(carpeta, exist_ok=True)
+        self._conexion().executescript(_ESQUEMA)
+
+    def _conexion(self):
+        conexion = getattr(self._local, "conexion", None)
+        if conexion is None:
+            conexion = sqlite3.connect(self.ruta_db, timeout=30, isolation_level=None)
+            conexion.execute("PRAGMA journal_mode=WAL")
+            conexion.execute("PRAGMA synchronous=NORMAL")
+            conexion.execute("PRAGMA busy_timeout=30000")
+            self._local.conexion = conexion
+        return conexion
+
+    def agregar(self, aceptados, operador=None):
+        """Agrega escaneos (codigo, clave, ubicacion) y actualiza los totales en una transacción."""
+        if not aceptados:
+            return
+        ahora = time.time()
+        filas = [
+            (self.almacen, self.conteo_id, operador, codigo, clave, ubicacion, ahora)
+            for codigo, clave, ubicacion in aceptados
+        ]
+        conteo = {}
+        for _, clave, _ in aceptados:
+            conteo[clave] = conteo.get(clave, 0) + 1
+
+        conexion = self._conexion()
+        conexion.execute("BEGIN IMMEDIATE")
+        try:
+            conexion.executemany(
+                "INSERT INTO escaneos (almacen, conteo_id, operador, codigo, clave, ubicacion, creado) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                filas
+            )
+            conexion.executemany(
+                "INSERT INTO totales (almacen, conteo_id, clave, cantidad) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (almacen, conteo_id, clave) DO UPDATE SET cantidad = cantidad + excluded.cantidad",
+                [(self.almacen, self.conteo_id, clave, n) for clave, n in conteo.items()]
+            )
+            conexion.execute("COMMIT")
+        except Exception:
+            conexion.execute("ROLLBACK")
+            raise
+
+    def leer_desde(self, ultimo_id=0):
+        """Escaneos con id > ultimo_id, en orden: lista de (id, codigo, clave, ubicacion)."""
+        return self._conexion().execute(
+            "SELECT id, codigo, clave, ubicacion FROM escaneos "
+            "WHERE almacen = ? AND conteo_id = ? AND id > ? ORDER BY id",
+            (self.almacen, self.conteo_id, ultimo_id)
+        ).fetchall()
+
+    def totales_por_clave(self):
+        """Vista agregada del conteo: {clave: cantidad}."""
+        return dict(self._conexion().execute(
+            "SELECT clave, cantidad FROM totales WHERE almacen = ? AND conteo_id = ?",
+            (self.almacen, self.conteo_id)
+        ).fetchall())
+
+    def escaneos_por_operador(self):
+        """Cantidad de escaneos por operador: {operador: cantidad}."""
+        return dict(self._conexion().execute(
+            "SELECT COALESCE(operador, ''), COUNT(*) FROM escaneos "
+            "WHERE almacen = ? AND conteo_id = ? GROUP BY operador",
+            (self.almacen, self.conteo_id)
+        ).fetchall())
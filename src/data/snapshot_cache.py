@@ -0,0 +1,116 @@
+import os
+import hashlib
+
+import pandas as pd
+from src.data.parsers import COLUMNAS_NUMERICAS
+
+# ====================================================
+# 💾 Caché local de inventarios (snapshots Parquet)
+# ====================================================
+# Carpeta y tamaño máximo configurables por variables de entorno
+CACHE_DIR = os.getenv("INVENTARIO_CACHE_DIR", os.path.join(".cache", "inventarios"))
+CACHE_MAX_MB = float(os.getenv("INVENTARIO_CACHE_MAX_MB", "512"))
+
+
+def _ruta_snapshot(file_id, modified_time, cache_dir=None):
+    """Ruta del snapshot para un archivo de Drive en una versión concreta (file_id + modifiedTime)."""
+    cache_dir = cache_dir or CACHE_DIR
+    version = hashlib.sha1(f"{file_id}|{modified_time}".encode("utf-8")).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{file_id}_{version}.parquet")
+
+
+def _preparar_para_parquet(df):
+    """
+    Deja el DataFrame listo para Parquet sin alterar la lógica posterior.
+    - Encabezados como texto.
+    - Columnas object con tipos mezclados (ej. códigos numéricos y alfanuméricos) pasan a texto,
+      conservando los nulos (layout igual los convierte con astype(str)).
+    - Salvo las numéricas (stock): pasan a número y lo que no lo es queda NaN, como en el parser.
+    """
+    df = df.copy()
+    df.columns = [str(c) for c in df.columns]
+    for col in df.columns:
+        serie = df[col]
+        if serie.dtype == object:
+            tipos = set(map(type, serie.dropna()))
+            if len(tipos) > 1:
+                if col.strip().upper() in COLUMNAS_NUMERICAS:
+                    df[col] = pd.to_numeric(serie, errors="coerce")
+                else:
+                    df[col] = serie.where(serie.isna(), serie.astype(str))
+    return df
+
+
+def leer_snapshot(file_id, modified_time, cache_dir=None):
+    """Retorna el DataFrame cacheado para esa versión del archivo, o None si no existe."""
+    ruta = _ruta_snapshot(file_id, modified_time, cache_dir)
+    if not os.path.exists(ruta):
+        return None
+    try:
+        df = pd.read_parquet(ruta, engine="pyarrow", memory_map=True)
+        os.utime(ruta)  # marcar como usado recientemente (para la expulsión LRU)
+        return df
+    except Exception:
+        # Snapshot corrupto o pyarrow no disponible: se ignora y se vuelve a descargar
+        return None
+
+
+def guardar_snapshot(df, file_id, modified_time, cache_dir=None, max_mb=None):
+    """
+    Guarda el DataFrame normalizado como Parquet y aplica la expulsión por tamaño.
+    - Borra versiones anteriores del mismo file_id.
+    - Nunca lanza excepciones: si no se puede escribir, la app sigue sin caché.
+    """
+    cache_dir = cache_dir or CACHE_DIR
+    ruta = _ruta_snapshot(file_id, modified_time, cache_dir)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        temporal = f"{ruta}.tmp"
+        _preparar_para_parquet(df).to_parquet(temporal, engine="pyarrow", index=False)
+        os.replace(temporal, ruta)
+    except Exception:
+        return False
+
+    # 🧹 Versiones anteriores del mismo archivo ya no sirven
+    for nombre in os.listdir(cache_dir):
+        otra = os.path.join(cache_dir, nombre)
+        if nombre.startswith(f"{file_id}_") and nombre.endswith(".parquet") and otra != ruta:
+            _borrar(otra)
+
+    expulsar_por_tamano(cache_dir, max_mb, conservar=ruta)
+    return True
+
+
+def expulsar_por_tamano(cache_dir=None, max_mb=None, conservar=None):
+    """Elimina los snapshots usados hace más tiempo hasta quedar bajo el límite de tamaño."""
+    cache_dir = cache_dir or CACHE_DIR
+    limite = (CACHE_MAX_MB if max_mb is None else max_mb) * 1024 * 1024
+    if not os.path.isdir(cache_dir):
+        return
+
+    snapshots = []
+    for nombre in os.listdir(cache_dir):
+        if nombre.endswith(".parquet"):
+            ruta = os.path.join(cache_dir, nombre)
+            try:
+                info = os.stat(ruta)
+            except OSError:
+                continue
+            snapshots.append((info.st_mtime, info.st_size, ruta))
+
+    total = sum(tamano for _, tamano, _ in snapshots)
+    for _, tamano, ruta in sorted(snapshots):
+        if total <= limite:
+            break
+        if ruta == conservar:
+            continue
+        if _borrar(ruta):
+            total -= tamano
+
+
+def _borrar(ruta):
+    try:
+        os.remove(ruta)
+        return True
+    except OSError:
+        return False
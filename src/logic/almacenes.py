@@ -0,0 +1,79 @@
+import pandas as pd
+from src.data.parsers import COLUMNAS_REQUERIDAS
+from src.logic.conciliacion import normalizar_ubicaciones
+
+
+def texto_clave(serie):
+    """
+    Texto de una columna para armar claves: celdas vacías como 'nan', igual que con la
+    lectura original (pandas las dejaba en NaN), aunque el lector o el snapshot traigan None.
+    """
+    return serie.astype(str).where(serie.notna(), "nan")
+
+
+class IndiceAlmacenes:
+    """
+    Particiones por almacén de un inventario cargado (se construye una vez por archivo).
+    - Normaliza encabezados y calcula las claves ERI/ERU sobre todo el archivo en una sola pasada.
+    - Guarda por almacén: df_filtrado y stock_teorico_eri (stock agrupado + ubicaciones únicas).
+    - `stock` conserva el stock teórico de todos los almacenes (índice almacén + clave) para el resumen.
+    """
+
+    def __init__(self, df_raw):
+        df = df_raw.rename(columns=lambda c: str(c).strip().upper())
+        self.columnas = list(df.columns)
+        self.faltantes = [col for col in COLUMNAS_REQUERIDAS if col not in self.columnas]
+        self.almacenes = []
+        self.particiones = {}
+        self.stock_teorico = {}
+        self.stock = None
+        self._ubicaciones_normalizadas = None
+        if self.faltantes:
+            return
+
+        self.almacenes = sorted(df["ALMACEN_NOMBRE"].dropna().unique())
+
+        # Claves únicas (vectorizadas sobre todo el archivo)
+        df["clave_teorica_eri"] = texto_clave(df["PRODUCTO_CODIGO"]) + texto_clave(df["REFERENCIA1"])
+        df["clave_teorica_eru"] = df["clave_teorica_eri"] + texto_clave(df["UBICACION_NOMBRE"])
+
+        # Stock teórico por almacén y clave
+        stock = (
+            df.groupby(["ALMACEN_NOMBRE", "clave_teorica_eri"])["STOCK_REFERENCIAUBICACION"]
+            .sum().round(3)
+            .rename("stock_teorico")
+        )
+
+        # Ubicaciones únicas (en orden de aparición) por almacén y clave, sin lambdas por grupo
+        ubicaciones = (
+            df[["ALMACEN_NOMBRE", "clave_teorica_eri", "UBICACION_NOMBRE"]]
+            .drop_duplicates()
+            .groupby(["ALMACEN_NOMBRE", "clave_teorica_eri"])["UBICACION_NOMBRE"]
+            .agg(list)
+        )
+        stock_teorico = pd.concat([stock, ubicaciones], axis=1)
+        self.stock = stock_teorico
+
+        # Particiones por almacén
+        for almacen, df_almacen in df.groupby("ALMACEN_NOMBRE", sort=False):
+            self.particiones[almacen] = df_almacen
+        for almacen, grupo in stock_teorico.groupby(level="ALMACEN_NOMBRE", sort=False):
+            self.stock_teorico[almacen] = grupo.droplevel("ALMACEN_NOMBRE").reset_index()
+
+    def obtener(self, almacen):
+        """Retorna (df_filtrado, stock_teorico_eri) del almacén (vacíos si no existe)."""
+        df_filtrado = self.particiones.get(almacen)
+        if df_filtrado is None:
+            return pd.DataFrame(), pd.DataFrame(columns=["clave_teorica_eri", "stock_teorico", "UBICACION_NOMBRE"])
+        return df_filtrado, self.stock_teorico[almacen]
+
+    def ubicaciones_normalizadas(self):
+        """(almacén, clave, ubicación normalizada) únicos de todo el inventario (se calcula una vez)."""
+        if self._ubicaciones_normalizadas is None:
+            planas = self.stock["UBICACION_NOMBRE"].explode()
+            self._ubicaciones_normalizadas = pd.MultiIndex.from_arrays([
+                planas.index.get_level_values(0),
+                planas.index.get_level_values(1),
+                normalizar_ubicaciones(planas).to_numpy(),
+            ]).unique()
+        return self._ubicaciones_normalizadas
@@ -0,0 +1,55 @@
+import sys
+import time
+import importlib
+import threading
+
+from src.logic.instrumentacion import instrumentacion
+
+# ================================================================
+# 💤 Carga diferida de dependencias pesadas
+# ================================================================
+# plotly, reportlab y los clientes de Google tardan en importarse; con `diferido`
+# el módulo se importa recién al primer uso (gráfico, PDF, descarga de Drive...).
+
+# Segundos que tardó cada import diferido (para el panel de diagnóstico)
+tiempos_importacion = {}
+
+_lock = threading.Lock()
+
+
+def importar(nombre):
+    """Importa un módulo (una sola vez) y registra cuánto tardó si no estaba cargado."""
+    modulo = sys.modules.get(nombre)
+    if modulo is not None:
+        return modulo
+    with _lock:
+        modulo = sys.modules.get(nombre)
+        if modulo is None:
+            inicio = time.perf_counter()
+            modulo = importlib.import_module(nombre)
+            segundos = time.perf_counter() - inicio
+            tiempos_importacion[nombre] = segundos
+            instrumentacion.registrar_tiempo(f"importacion.{nombre}", segundos)
+    return modulo
+
+
+class ModuloDiferido:
+    """Proxy de un módulo: se importa al primer acceso a uno de sus atributos."""
+
+    def __init__(self, nombre):
+        self._nombre = nombre
+        self._modulo = None
+
+    def __getattr__(self, atributo):
+        modulo = self._modulo
+        if modulo is None:
+            modulo = self._modulo = importar(self._nombre)
+        return getattr(modulo, atributo)
+
+    def __repr__(self):
+        estado = "cargado" if self._modulo is not None else "sin cargar"
+        return f"<módulo diferido {self._nombre} ({estado})>"
+
+
+def diferido(nombre):
+    return ModuloDiferido(nombre)
@@ -0,0 +1,307 @@
+from array import array
+
+import numpy as np
+import pandas as pd
+
+ESTADOS_ERI = ["Completo", "Faltante", "Sobrante"]
+
+# Código de estado según el signo de la diferencia (-1, 0, +1) → índice en ESTADOS_ERI
+_ESTADO_POR_SIGNO = np.array([1, 0, 2], dtype=np.int8)
+
+
+def estado_por_diferencia(diferencia):
+    """Estado ERI de un ítem según la diferencia físico - teórico."""
+    return "Completo" if diferencia == 0 else ("Sobrante" if diferencia > 0 else "Faltante")
+
+
+class ResultadoERI:
+    """
+    Resultado de `conciliar_eri`: vectores por ítem + contadores y exactitud.
+    - `estado` son códigos int8 (índices de ESTADOS_ERI); los textos se arman solo al pedir la tabla.
+    """
+
+    def __init__(self, claves, stock_teorico, stock_fisico, diferencia, estado, conteo):
+        self.claves = claves
+        self.stock_teorico = stock_teorico
+        self.stock_fisico = stock_fisico
+        self.diferencia = diferencia
+        self.estado = estado
+        self.conteo_estados = {nombre: int(n) for nombre, n in zip(ESTADOS_ERI, conteo)}
+
+    @property
+    def total_items(self):
+        return len(self.estado)
+
+    @property
+    def items_correctos(self):
+        return self.conteo_estados["Completo"]
+
+    @property
+    def items_con_error(self):
+        return self.conteo_estados["Faltante"] + self.conteo_estados["Sobrante"]
+
+    @property
+    def exactitud(self):
+        total = self.total_items
+        return (1 - self.items_con_error / total) * 100 if total > 0 else 0
+
+    def metricas(self):
+        """Métricas en el formato que usa el reporte general."""
+        return {
+            "exactitud": self.exactitud,
+            "ok": self.items_correctos,
+            "error": self.items_con_error,
+        }
+
+    def tabla(self, ubicaciones=None):
+        """Tabla teórico vs físico por ítem."""
+        datos = {
+            "clave_teorica_eri": self.claves,
+            "stock_teorico": self.stock_teorico,
+        }
+        if ubicaciones is not None:
+            datos["UBICACION_NOMBRE"] = ubicaciones
+        datos.update({
+            "stock_fisico": self.stock_fisico,
+            "diferencia": self.diferencia,
+            "estado": np.array(ESTADOS_ERI, dtype=object)[self.estado],
+        })
+        return pd.DataFrame(datos)
+
+
+def conciliar_eri(stock_teorico, stock_fisico, claves=None):
+    """
+    Conciliación ERI vectorizada (sin Streamlit ni pandas en el cálculo).
+    - `stock_teorico` y `stock_fisico`: vectores alineados por ítem (ids de clave).
+    - Diferencia, código de estado, conteo por estado y exactitud en una sola pasada.
+    """
+    stock_teorico = np.nan_to_num(np.asarray(stock_teorico, dtype=float))
+    stock_fisico = np.asarray(stock_fisico)
+    diferencia = stock_fisico - stock_teorico
+    estado = _ESTADO_POR_SIGNO[np.sign(diferencia).astype(np.int64) + 1]
+    conteo = np.bincount(estado, minlength=len(ESTADOS_ERI))
+    return ResultadoERI(claves, stock_teorico, stock_fisico, diferencia, estado, conteo)
+
+
+def conciliar_eri_escaneos(stock_teorico_eri, ids_clave):
+    """Concilia un catálogo (stock_teorico_eri) con escaneos dados como ids de clave."""
+    stock_fisico = np.bincount(np.asarray(ids_clave, dtype=np.int64), minlength=len(stock_teorico_eri))
+    return conciliar_eri(
+        stock_teorico_eri["stock_teorico"].to_numpy(dtype=float),
+        stock_fisico,
+        claves=stock_teorico_eri["clave_teorica_eri"].to_numpy(),
+    )
+
+
+class ConciliacionERI:
+    """
+    Estado acumulado de la conciliación ERI (teórico vs físico) por clave_teorica_eri.
+    - Trabaja con ids de clave (posición en stock_teorico_eri) y vectores NumPy.
+    - Cada escaneo aceptado actualiza conteo físico y contadores por estado en O(1);
+      un lote se suma de una vez con bincount.
+    """
+
+    def __init__(self, stock_teorico_eri, firma=None):
+        self.firma = firma
+        self.claves = stock_teorico_eri["clave_teorica_eri"].to_numpy()
+        self.stock_teorico = stock_teorico_eri["stock_teorico"].fillna(0).to_numpy(dtype=float)
+        self.stock_fisico = np.zeros(len(self.claves), dtype=np.int64)
+        self.total_escaneos = 0
+        self._orden_diferencia = None
+
+        # Sin escaneos: diferencia = -teórico en todos los ítems
+        self.conteo_estados = conciliar_eri(self.stock_teorico, self.stock_fisico).conteo_estados
+
+    def registrar(self, id_clave, cantidad=1):
+        """Suma `cantidad` unidades físicas a la clave y actualiza contadores."""
+        teorico = float(self.stock_teorico[id_clave])
+        fisico_anterior = int(self.stock_fisico[id_clave])
+        fisico = fisico_anterior + cantidad
+        self.conteo_estados[estado_por_diferencia(fisico_anterior - teorico)] -= 1
+        self.conteo_estados[estado_por_diferencia(fisico - teorico)] += 1
+        self.stock_fisico[id_clave] = fisico
+        self.total_escaneos += cantidad
+
+    def registrar_lote(self, ids_clave):
+        """Suma un lote de escaneos (ids de clave) con bincount."""
+        ids_clave = np.asarray(ids_clave, dtype=np.int64)
+        if len(ids_clave) == 0:
+            return
+        self.stock_fisico += np.bincount(ids_clave, minlength=len(self.claves))
+        self.total_escaneos += len(ids_clave)
+        self.conteo_estados = self.resultado().conteo_estados
+
+    def resultado(self):
+        """Conciliación vectorizada completa del estado actual (una foto: no cambia con escaneos posteriores)."""
+        return conciliar_eri(self.stock_teorico, self.stock_fisico.copy(), claves=self.claves)
+
+    def orden_por_diferencia(self):
+        """Ids de clave de mayor a menor |diferencia| (se recalcula solo si hubo escaneos nuevos)."""
+        if self._orden_diferencia is None or self._orden_diferencia[0] != self.total_escaneos:
+            diferencia = np.abs(self.stock_fisico - self.stock_teorico)
+            self._orden_diferencia = (self.total_escaneos, np.argsort(-diferencia, kind="stable"))
+        return self._orden_diferencia[1]
+
+    @property
+    def total_items(self):
+        return len(self.claves)
+
+    @property
+    def items_correctos(self):
+        return self.conteo_estados["Completo"]
+
+    @property
+    def items_con_error(self):
+        return self.conteo_estados["Faltante"] + self.conteo_estados["Sobrante"]
+
+    @property
+    def exactitud(self):
+        total = self.total_items
+        return (1 - self.items_con_error / total) * 100 if total > 0 else 0
+
+    def metricas(self):
+        """Métricas en el formato que usa el reporte general."""
+        return {
+            "exactitud": self.exactitud,
+            "ok": self.items_correctos,
+            "error": self.items_con_error,
+        }
+
+    def stock_fisico_df(self):
+        """Conteo físico por clave escaneada (equivalente al value_counts de los escaneos)."""
+        contadas = np.flatnonzero(self.stock_fisico)
+        df = pd.DataFrame({
+            "clave_escaneada_eri": self.claves[contadas],
+            "stock_fisico": self.stock_fisico[contadas],
+        })
+        return df.sort_values("stock_fisico", ascending=False, kind="stable").reset_index(drop=True)
+
+    def tabla_detalle(self, stock_teorico_eri):
+        """Tabla teórico vs físico por ítem, leída del estado acumulado (sin merge ni apply)."""
+        return self.resultado().tabla(stock_teorico_eri["UBICACION_NOMBRE"].to_numpy())
+
+
+# ================================================================
+# 📍 ERU: evaluación de ubicaciones por escaneo
+# ================================================================
+ESTADOS_ERU = [
+    "Ubicación Correcta",
+    "Ubicación Incorrecta",
+    "Código Escaneado Inválido",
+    "Producto/Referencia No Encontrado",
+]
+_CODIGO_ESTADO_ERU = {estado: i for i, estado in enumerate(ESTADOS_ERU)}
+
+
+def normalizar_ubicacion(u):
+    """Convierte una ubicación a formato estándar (sin espacios, mayúsculas)."""
+    if isinstance(u, list):
+        u = " ".join(map(str, u))
+    if pd.isna(u):
+        return ""
+    return str(u).strip().replace(" ", "").replace("_", "").upper()
+
+
+def normalizar_ubicaciones(serie):
+    """Versión vectorizada de `normalizar_ubicacion` para una Serie de ubicaciones (texto)."""
+    texto = serie.astype(str).str.strip().str.replace(" ", "", regex=False).str.replace("_", "", regex=False).str.upper()
+    return texto.where(serie.notna(), "")
+
+
+def ubicaciones_por_clave(stock_teorico_eri):
+    """
+    Ubicaciones teóricas por id de clave (posición en stock_teorico_eri).
+    - Retorna (listas originales como array object, frozensets normalizados) para evaluar escaneos en O(1).
+    """
+    listas = np.empty(len(stock_teorico_eri), dtype=object)
+    normalizadas = []
+    for i, ubicaciones in enumerate(stock_teorico_eri["UBICACION_NOMBRE"]):
+        listas[i] = [ubicaciones]
+        planas = ubicaciones if isinstance(ubicaciones, list) else [ubicaciones]
+        normalizadas.append(frozenset(normalizar_ubicacion(u) for u in planas))
+    return listas, normalizadas
+
+
+class ConciliacionERU:
+    """
+    Veredictos ERU acumulados de la sesión.
+    - Cada escaneo se evalúa una sola vez, al momento de escanear, y se guarda como código int8.
+    - El reporte solo agrega los veredictos guardados.
+    """
+
+    def __init__(self, ubicaciones_teoricas, ubicaciones_normalizadas, firma=None):
+        self.firma = firma
+        self.ubicaciones_teoricas = ubicaciones_teoricas
+        self.ubicaciones_normalizadas = ubicaciones_normalizadas
+        self.estados = array("b")
+        self.conteo_estados = {estado: 0 for estado in ESTADOS_ERU}
+
+    def evaluar(self, id_clave, ubicacion_escaneada):
+        """Evalúa si la ubicación escaneada coincide con alguna ubicación teórica de la clave."""
+        if id_clave is None or ubicacion_escaneada is None:
+            return "Código Escaneado Inválido"
+
+        if not 0 <= id_clave < len(self.ubicaciones_normalizadas):
+            return "Producto/Referencia No Encontrado"
+
+        if normalizar_ubicacion(ubicacion_escaneada) in self.ubicaciones_normalizadas[id_clave]:
+            return "Ubicación Correcta"
+        return "Ubicación Incorrecta"
+
+    def registrar(self, id_clave, ubicacion_escaneada):
+        estado = self.evaluar(id_clave, ubicacion_escaneada)
+        self.estados.append(_CODIGO_ESTADO_ERU[estado])
+        self.conteo_estados[estado] += 1
+        return estado
+
+    def registrar_escaneos(self, escaneos):
+        """Evalúa todos los escaneos guardados (una vez por par clave/ubicación distinto)."""
+        ubicaciones = escaneos.ubicaciones.textos
+        cache = {}
+        for id_clave, id_ubicacion in zip(escaneos.id_clave, escaneos.id_ubicacion):
+            estado = cache.get((id_clave, id_ubicacion))
+            if estado is None:
+                estado = self.evaluar(id_clave, ubicaciones[id_ubicacion])
+                cache[(id_clave, id_ubicacion)] = estado
+            self.estados.append(_CODIGO_ESTADO_ERU[estado])
+            self.conteo_estados[estado] += 1
+
+    @property
+    def total_escaneos(self):
+        return len(self.estados)
+
+    def codigos_estado(self):
+        """Veredicto de cada escaneo como vector int8 (índices de ESTADOS_ERU)."""
+        return np.array(self.estados, dtype=np.int8)
+
+    @property
+    def items_correctos(self):
+        return self.conteo_estados["Ubicación Correcta"]
+
+    @property
+    def items_con_error(self):
+        return self.total_escaneos - self.items_correctos
+
+    @property
+    def exactitud(self):
+        total = self.total_escaneos
+        return (self.items_correctos / total) * 100 if total > 0 else 0
+
+    def metricas(self):
+        """Métricas en el formato que usa el reporte general."""
+        return {
+            "exactitud": self.exactitud,
+            "ok": self.items_correctos,
+            "error": self.items_con_error,
+        }
+
+    def tabla_detalle(self, escaneos):
+        """Detalle por escaneo con sus ubicaciones teóricas (armado desde los ids guardados)."""
+        ids_clave = escaneos.ids_claves()
+        return pd.DataFrame({
+            "clave_escaneada_eru": escaneos.codigos(),
+            "clave_producto_ref_eru": escaneos.claves(),
+            "ubicacion_escaneada": escaneos.ubicaciones_escaneadas(),
+            "estado_ubicacion": np.array(ESTADOS_ERU, dtype=object)[self.codigos_estado()],
+            "UBICACION_NOMBRE": self.ubicaciones_teoricas[ids_clave],
+        })
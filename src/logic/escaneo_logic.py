@@ -1,46 +1,467 @@
+import os
+import uuid
+
 import streamlit as st
 import pandas as pd
-from src.logic.utils import desconcatenar_producto_ref
+from src.logic.utils import DecodificadorEscaneo
+from src.logic.conciliacion import ubicaciones_por_clave
+from src.logic.importacion import leer_volcado_escaner, separar_resultados
+from src.logic.instrumentacion import medir, contar
+from src.logic.tabla_paginada import IndiceBusqueda
+from src.logic.procesamiento import (
+    construir_escaneos, construir_conciliacion_eri, construir_conciliacion_eru, revalidar_registros
+)
+from src.data.sesion_conteo import SesionConteoCompartida
+from src.data.diario_escaneos import abrir_diario, DIARIO_MAX_ABIERTOS, ruta_base_diario, leer_diario
+
+
+# Cada cuántos segundos se refrescan tablas y gráficos si hubo escaneos (0 = solo a pedido)
+REPORTES_REFRESCO_SEG = float(os.getenv("REPORTES_REFRESCO_SEG", "5"))
+
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def _construir_decodificador(firma, _stock_teorico_eri, _claves_eru):
+    """Construye (una vez por almacén y catálogo) el índice de decodificación de escaneos."""
+    contar("cache.decodificador.fallo")
+    with medir("escaneo.construir_decodificador"):
+        return DecodificadorEscaneo(_stock_teorico_eri, _claves_eru)
+
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def _construir_ubicaciones_por_clave(firma, _stock_teorico_eri):
+    """Ubicaciones teóricas normalizadas por clave (una vez por almacén y catálogo)."""
+    return ubicaciones_por_clave(_stock_teorico_eri)
+
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def _construir_indice_busqueda(firma, _stock_teorico_eri):
+    """Orden alfabético y búsqueda de claves para las tablas paginadas (una vez por catálogo)."""
+    return IndiceBusqueda(_stock_teorico_eri["clave_teorica_eri"].to_numpy())
+
+
+def firma_catalogo(stock_teorico_eri):
+    """
+    Firma del catálogo teórico del almacén actual (almacén, claves, stock y ubicaciones).
+    - Se calcula una vez por DataFrame y queda guardada en `attrs`.
+    """
+    almacen = st.session_state.get("almacen_actual")
+    firma = stock_teorico_eri.attrs.get("firma_catalogo")
+    if firma is None or firma[0] != almacen:
+        firma = (
+            almacen,
+            len(stock_teorico_eri),
+            int(pd.util.hash_pandas_object(stock_teorico_eri["clave_teorica_eri"], index=False).sum()),
+            int(pd.util.hash_pandas_object(stock_teorico_eri["stock_teorico"], index=False).sum()),
+            int(pd.util.hash_pandas_object(
+                stock_teorico_eri["UBICACION_NOMBRE"].explode().astype(str), index=False
+            ).sum()),
+        )
+        stock_teorico_eri.attrs["firma_catalogo"] = firma
+    return firma
+
+
+def obtener_decodificador(stock_teorico_eri, claves_eru=None):
+    """
+    Devuelve el decodificador del almacén actual.
+    - Si la firma del catálogo no cambia, se reutiliza el mismo índice.
+    """
+    contar("cache.decodificador.consulta")
+    return _construir_decodificador(firma_catalogo(stock_teorico_eri), stock_teorico_eri, claves_eru)
+
+
+def obtener_indice_busqueda(stock_teorico_eri):
+    """Índice de búsqueda de claves del almacén actual (compartido entre sesiones)."""
+    return _construir_indice_busqueda(firma_catalogo(stock_teorico_eri), stock_teorico_eri)
+
+
+def obtener_escaneos(stock_teorico_eri):
+    """
+    Escaneos aceptados de la sesión, guardados como ids enteros sobre el catálogo del almacén.
+    - Si el catálogo cambió (nuevo archivo), los códigos se vuelven a decodificar contra el nuevo.
+    """
+    firma = firma_catalogo(stock_teorico_eri)
+    escaneos = st.session_state.get("escaneos")
+
+    if escaneos is None or escaneos.firma != firma:
+        codigos = escaneos.codigos().tolist() if escaneos is not None else []
+        escaneos, _ = construir_escaneos(obtener_decodificador(stock_teorico_eri), codigos, firma=firma)
+        st.session_state["escaneos"] = escaneos
+    return escaneos
+
+
+def obtener_conciliacion_eri(stock_teorico_eri):
+    """
+    Devuelve el estado acumulado ERI de la sesión.
+    - Solo se reconstruye (bincount sobre los ids escaneados) si cambió el catálogo o los escaneos.
+    """
+    firma = firma_catalogo(stock_teorico_eri)
+    escaneos = obtener_escaneos(stock_teorico_eri)
+    conciliacion = st.session_state.get("conciliacion_eri")
+
+    if (
+        conciliacion is None
+        or conciliacion.firma != firma
+        or conciliacion.total_escaneos != len(escaneos)
+    ):
+        conciliacion = construir_conciliacion_eri(stock_teorico_eri, escaneos, firma=firma)
+        st.session_state["conciliacion_eri"] = conciliacion
+    return conciliacion
+
+
+def obtener_conciliacion_eru(stock_teorico_eri):
+    """
+    Devuelve los veredictos ERU acumulados de la sesión.
+    - Solo se reconstruye (evaluando los escaneos guardados) si cambió el catálogo o los escaneos.
+    """
+    firma = firma_catalogo(stock_teorico_eri)
+    escaneos = obtener_escaneos(stock_teorico_eri)
+    conciliacion = st.session_state.get("conciliacion_eru")
+
+    if (
+        conciliacion is None
+        or conciliacion.firma != firma
+        or conciliacion.total_escaneos != len(escaneos)
+    ):
+        ubicaciones = _construir_ubicaciones_por_clave(firma, stock_teorico_eri)
+        conciliacion = construir_conciliacion_eru(ubicaciones, escaneos, firma=firma)
+        st.session_state["conciliacion_eru"] = conciliacion
+    return conciliacion
+
+
+@st.cache_resource(show_spinner=False)
+def _abrir_conteo_compartido(almacen, conteo_id):
+    return SesionConteoCompartida(almacen, conteo_id)
+
+
+def obtener_conteo_compartido():
+    """Conteo compartido activo en esta sesión (o None si se trabaja en modo individual)."""
+    conteo = st.session_state.get("conteo_compartido")
+    if not conteo:
+        return None
+    return _abrir_conteo_compartido(conteo["almacen"], conteo["conteo_id"])
+
+
+def sincronizar_conteo_compartido(stock_teorico_eri):
+    """Trae solo los escaneos nuevos del conteo compartido (de cualquier operador) al estado local."""
+    sesion = obtener_conteo_compartido()
+    if sesion is None:
+        return
+    filas = sesion.leer_desde(st.session_state.get("conteo_ultimo_id", 0))
+    if filas:
+        descartados = _registrar_local(
+            stock_teorico_eri, [(codigo, clave, ubicacion) for _, codigo, clave, ubicacion in filas]
+        )
+        st.session_state["conteo_ultimo_id"] = filas[-1][0]
+        if descartados:
+            st.session_state["mensaje_escaneo"] = (
+                f"⚠️ {len(descartados)} escaneos del conteo compartido no están en el inventario actual y se omitieron."
+            )
+
+
+@st.cache_resource(show_spinner=False, max_entries=DIARIO_MAX_ABIERTOS)
+def _abrir_diario(token, almacen):
+    """
+    Un diario por sesión (`?sesion=`) y almacén, compartido entre recargas de la página.
+    - Su hilo escritor termina solo tras DIARIO_INACTIVO_SEG, así que un diario descartado
+      o de una pestaña cerrada no deja hilos vivos.
+    - Si la caché descarta un diario que aún escribe, `abrir_diario` devuelve esa misma
+      instancia en vez de abrir un segundo escritor sobre los mismos archivos.
+    """
+    return abrir_diario(ruta_base_diario(token, almacen))
+
+
+def obtener_diario():
+    """
+    Diario durable de la sesión para el almacén actual.
+    - La sesión se identifica con `?sesion=` en la URL, que sobrevive a recargas y reinicios.
+    """
+    token = st.query_params.get("sesion")
+    if not token:
+        token = uuid.uuid4().hex[:12]
+        st.query_params["sesion"] = token
+    return _abrir_diario(token, st.session_state.get("almacen_actual"))
+
+
+def cerrar_diario(almacen):
+    """Escribe lo pendiente y termina el hilo escritor del diario de `almacen` (al cambiar de almacén)."""
+    token = st.query_params.get("sesion")
+    if token and almacen:
+        _abrir_diario(token, almacen).cerrar()
+
+
+def escaneos_de_la_sesion(almacenes):
+    """
+    Escaneos aceptados de la sesión en cada almacén: {almacen: (claves, ubicaciones)}.
+    - Almacén actual: estado en memoria (incluye el conteo compartido si está activo).
+    - Resto: diario guardado de la sesión, leído sin abrir escritores.
+    """
+    token = st.query_params.get("sesion")
+    actual = st.session_state.get("almacen_actual")
+    escaneos = st.session_state.get("escaneos")
+    resultado = {}
+    for almacen in almacenes:
+        if almacen == actual and escaneos is not None:
+            resultado[almacen] = (escaneos.claves(), escaneos.ubicaciones_escaneadas())
+        elif token:
+            registros = leer_diario(ruta_base_diario(token, almacen))
+            resultado[almacen] = ([r[1] for r in registros], [r[2] for r in registros])
+    return resultado
+
+
+def recuperar_escaneos(stock_teorico_eri):
+    """Reconstruye los escaneos de la sesión desde el diario (una vez por almacén)."""
+    if st.session_state.get("conteo_compartido"):
+        return
+    diario = obtener_diario()
+    if st.session_state.get("diario_recuperado") is diario:
+        return
+    st.session_state["diario_recuperado"] = diario
+    if len(obtener_escaneos(stock_teorico_eri)):
+        return
+    registros = diario.leer()
+    if registros:
+        descartados = _registrar_local(stock_teorico_eri, registros)
+        mensaje = f"♻️ Recuperados {len(registros) - len(descartados)} escaneos guardados."
+        if descartados:
+            mensaje += f" {len(descartados)} ya no están en el inventario actual y se omitieron."
+        st.session_state["mensaje_escaneo"] = mensaje
 
-def procesar_escaneo(stock_teorico_eri):
+
+def registrar_escaneos(stock_teorico_eri, aceptados):
+    """
+    Agrega escaneos aceptados a la sesión y a los estados acumulados ERI/ERU.
+    - `aceptados`: lista de (codigo, clave_producto_ref, ubicacion_escaneada).
+    - En modo individual se guardan además en el diario durable de la sesión.
+    - En un conteo compartido se escriben primero en la base y luego se sincronizan.
+    """
+    contar("escaneo.aceptados", len(aceptados))
+    with medir("escaneo.registrar"):
+        sesion = obtener_conteo_compartido()
+        if sesion is None:
+            _registrar_local(stock_teorico_eri, aceptados)
+            obtener_diario().agregar(aceptados)
+            return
+        sesion.agregar(aceptados, operador=st.session_state["conteo_compartido"].get("operador"))
+        sincronizar_conteo_compartido(stock_teorico_eri)
+
+
+def _registrar_local(stock_teorico_eri, aceptados):
+    """
+    Suma escaneos al estado de la sesión; retorna los códigos descartados.
+    - Registros del diario o del conteo compartido pueden venir de otra versión del
+      inventario: se vuelven a decodificar y los que ya no existen se descartan.
+    """
+    aceptados, descartados = revalidar_registros(obtener_decodificador(stock_teorico_eri), aceptados)
+    if descartados:
+        contar("escaneo.descartados", len(descartados))
+    if not aceptados:
+        return descartados
+
+    _avanzar_version()
+    escaneos = obtener_escaneos(stock_teorico_eri)
+    conciliacion_eri = obtener_conciliacion_eri(stock_teorico_eri)
+    conciliacion_eru = obtener_conciliacion_eru(stock_teorico_eri)
+
+    ids_clave = []
+    for codigo, clave_producto_ref, ubicacion_escaneada in aceptados:
+        id_clave = escaneos.agregar(codigo, clave_producto_ref, ubicacion_escaneada)
+        conciliacion_eru.registrar(id_clave, ubicacion_escaneada)
+        ids_clave.append(id_clave)
+
+    # Un solo escaneo: actualización O(1); un lote (importación, recuperación): bincount
+    if len(ids_clave) == 1:
+        conciliacion_eri.registrar(ids_clave[0])
+    else:
+        conciliacion_eri.registrar_lote(ids_clave)
+    return descartados
+
+
+def importar_escaneos(stock_teorico_eri, decodificador):
+    """Importación masiva desde volcados de colectores (TXT/CSV) en un solo paso."""
+    with st.expander("📥 Importar escaneos desde archivo del colector"):
+        archivo = st.file_uploader(
+            "Archivo TXT o CSV (un código por línea o columna 'codigo')",
+            type=["txt", "csv"],
+            key="archivo_escaneos"
+        )
+        if archivo is None or not st.button("Importar Escaneos"):
+            return
+
+        codigos = leer_volcado_escaner(archivo.getvalue(), archivo.name)
+        contar("escaneo.importados", len(codigos))
+        with medir("escaneo.decodificar_lote"):
+            aceptados, rechazados = separar_resultados(codigos, decodificador.decodificar_lote(codigos))
+        registrar_escaneos(stock_teorico_eri, aceptados)
+
+        st.success(f"✅ Importados {len(aceptados)} escaneos de {len(codigos)} códigos leídos.")
+        if rechazados:
+            st.warning(f"⚠️ {len(rechazados)} códigos no coinciden con el catálogo.")
+            st.dataframe(
+                pd.DataFrame(rechazados, columns=["codigo_rechazado"]).value_counts().reset_index(name="veces"),
+                width='stretch'
+            )
+
+
+def configurar_conteo_compartido(stock_teorico_eri):
+    """Permite unir esta sesión a un conteo compartido por almacén e ID de conteo."""
+    almacen = st.session_state.get("almacen_actual")
+    activo = st.session_state.get("conteo_compartido")
+
+    with st.expander("👥 Conteo compartido entre operadores", expanded=bool(activo)):
+        if activo:
+            sesion = obtener_conteo_compartido()
+            st.caption(f"Conteo **{activo['conteo_id']}** en {activo['almacen']} — operador: {activo.get('operador') or '-'}")
+            totales = sesion.totales_por_clave()
+            st.caption(f"Total del conteo: {sum(totales.values())} escaneos en {len(totales)} claves.")
+            por_operador = sesion.escaneos_por_operador()
+            if por_operador:
+                st.dataframe(
+                    pd.DataFrame(list(por_operador.items()), columns=["operador", "escaneos"]),
+                    width='stretch'
+                )
+            if st.button("Salir del conteo compartido"):
+                _reiniciar_escaneos()
+                st.session_state.pop("conteo_compartido", None)
+                st.rerun()
+            return
+
+        conteo_id = st.text_input("ID del conteo", key="conteo_id_input")
+        operador = st.text_input("Operador", key="conteo_operador_input")
+        if st.button("Unirse al conteo") and conteo_id.strip():
+            _reiniciar_escaneos()
+            st.session_state["conteo_compartido"] = {
+                "almacen": almacen,
+                "conteo_id": conteo_id.strip(),
+                "operador": operador.strip(),
+            }
+            sincronizar_conteo_compartido(stock_teorico_eri)
+            st.rerun()
+
+
+def _reiniciar_escaneos():
+    _avanzar_version()
+    st.session_state.pop("escaneos", None)
+    st.session_state.pop("conciliacion_eri", None)
+    st.session_state.pop("conciliacion_eru", None)
+    st.session_state.pop("conteo_ultimo_id", None)
+    st.session_state.pop("diario_recuperado", None)
+
+
+# ================================================================
+# 🔗 Dependencias entre el escaneo y los reportes
+# ================================================================
+# - "version_escaneos": cambia con cada escaneo registrado o limpieza.
+# - "version_reportes": versión con la que se dibujaron tablas y gráficos (rerun completo).
+# Un escaneo solo reejecuta el fragmento del formulario (contador y métricas O(1));
+# los reportes se ponen al día a pedido o cada REPORTES_REFRESCO_SEG.
+def _avanzar_version():
+    st.session_state["version_escaneos"] = st.session_state.get("version_escaneos", 0) + 1
+
+
+def marcar_reportes_actualizados(stock_teorico_eri):
+    """
+    Llamar en el rerun completo, antes de dibujar los reportes.
+    - Registra la versión dibujada y programa el refresco periódico (si está habilitado).
+    """
+    st.session_state["version_reportes"] = st.session_state.get("version_escaneos", 0)
+    if REPORTES_REFRESCO_SEG > 0:
+        st.fragment(_refrescar_reportes, run_every=REPORTES_REFRESCO_SEG)(stock_teorico_eri)
+
+
+def reportes_desactualizados():
+    return st.session_state.get("version_reportes", 0) != st.session_state.get("version_escaneos", 0)
+
+
+def _refrescar_reportes(stock_teorico_eri):
+    """
+    Fragmento periódico: si hubo escaneos desde el último dibujo, rerun completo.
+    - En un conteo compartido trae antes lo escaneado por otros operadores, así una
+      pantalla que solo mira el conteo también se actualiza.
+    """
+    sincronizar_conteo_compartido(stock_teorico_eri)
+    if reportes_desactualizados():
+        st.rerun()
+
+
+def procesar_escaneo(stock_teorico_eri, df_filtrado=None):
     st.subheader("🔍 Escaneo Físico ")
 
-    if "escaneos_eri" not in st.session_state:
-        st.session_state["escaneos_eri"] = []
-    if "escaneos_eru" not in st.session_state:
-        st.session_state["escaneos_eru"] = []
     if "mensaje_escaneo" not in st.session_state:
         st.session_state["mensaje_escaneo"] = ""
 
-    def callback_procesar():
-        codigo_ingresado = st.session_state.get("codigo_escaneado_form", "")
-        if codigo_ingresado:
-            clave_producto_ref, ubicacion_escaneada = desconcatenar_producto_ref(
-                codigo_ingresado,
-                stock_teorico_eri['UBICACION_NOMBRE'].explode().unique(),
-                stock_teorico_eri
-            )
+    claves_eru = df_filtrado["clave_teorica_eru"] if df_filtrado is not None else None
+    decodificador = obtener_decodificador(stock_teorico_eri, claves_eru)
 
-            if clave_producto_ref and ubicacion_escaneada:
-                st.session_state["escaneos_eru"].append(codigo_ingresado)
-                st.session_state["mensaje_escaneo"] = f"✅ Escaneado: {codigo_ingresado}"
-                st.session_state["escaneos_eri"].append(clave_producto_ref)
-            else:
-                st.session_state["mensaje_escaneo"] = f"⚠️ Código escaneado no coincide: {codigo_ingresado}"
-            st.session_state["codigo_escaneado_form"] = ""
-
-    # Mostrar mensaje
-    if st.session_state["mensaje_escaneo"]:
-        st.success(st.session_state["mensaje_escaneo"])
-        st.session_state["mensaje_escaneo"] = ""
+    # Recuperar escaneos tras recarga, reinicio o cambio de almacén
+    recuperar_escaneos(stock_teorico_eri)
+
+    # Conteo compartido: unirse y traer lo escaneado por otros operadores
+    configurar_conteo_compartido(stock_teorico_eri)
 
-    # Formulario
-    with st.form(key="form_escaneo"):
-        st.text_input("Escanee un código de barras", key="codigo_escaneado_form")
-        st.form_submit_button("Agregar Escaneo", on_click=callback_procesar)
+    # Formulario + métricas en vivo (rerun parcial por escaneo)
+    st.fragment(_fragmento_escaneo)(stock_teorico_eri, decodificador)
 
-    # Botón limpiar
-    if st.button("🗑️ Limpiar Todos los Escaneos"):
-        st.session_state["escaneos_eri"].clear()
-        st.session_state["escaneos_eru"].clear()
+    # Importación masiva
+    importar_escaneos(stock_teorico_eri, decodificador)
+
+    # Botón limpiar (un conteo compartido no se borra desde una sola sesión)
+    if st.session_state.get("conteo_compartido"):
+        st.caption("Los escaneos del conteo compartido no se pueden limpiar desde esta sesión.")
+    elif st.button("🗑️ Limpiar Todos los Escaneos"):
+        _reiniciar_escaneos()
+        obtener_diario().vaciar()
         st.success("Escaneos limpiados")
+
+
+def _fragmento_escaneo(stock_teorico_eri, decodificador):
+    """Formulario de escaneo, mensaje y métricas en vivo; un escaneo solo reejecuta este bloque."""
+    with medir("fragmento.escaneo"):
+        sincronizar_conteo_compartido(stock_teorico_eri)
+
+        def callback_procesar():
+            codigo_ingresado = st.session_state.get("codigo_escaneado_form", "")
+            if codigo_ingresado:
+                with medir("escaneo.decodificar"):
+                    clave_producto_ref, ubicacion_escaneada = decodificador.decodificar(codigo_ingresado)
+
+                if clave_producto_ref and ubicacion_escaneada:
+                    registrar_escaneos(
+                        stock_teorico_eri, [(codigo_ingresado, clave_producto_ref, ubicacion_escaneada)]
+                    )
+                    st.session_state["mensaje_escaneo"] = f"✅ Escaneado: {codigo_ingresado}"
+                else:
+                    st.session_state["mensaje_escaneo"] = f"⚠️ Código escaneado no coincide: {codigo_ingresado}"
+                st.session_state["codigo_escaneado_form"] = ""
+
+        # Mostrar mensaje
+        if st.session_state["mensaje_escaneo"]:
+            st.success(st.session_state["mensaje_escaneo"])
+            st.session_state["mensaje_escaneo"] = ""
+        if not st.session_state.get("conteo_compartido"):
+            error = obtener_diario().ultimo_error
+            if error is not None:
+                st.warning(f"⚠️ No se pudieron guardar los escaneos en disco ({error}); se reintentará con el próximo escaneo.")
+
+        # Formulario
+        with st.form(key="form_escaneo"):
+            st.text_input("Escanee un código de barras", key="codigo_escaneado_form")
+            st.form_submit_button("Agregar Escaneo", on_click=callback_procesar)
+
+        # Métricas en vivo (estado acumulado, O(1) por escaneo)
+        escaneos = obtener_escaneos(stock_teorico_eri)
+        if len(escaneos):
+            eri = obtener_conciliacion_eri(stock_teorico_eri)
+            eru = obtener_conciliacion_eru(stock_teorico_eri)
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Escaneos", len(escaneos))
+            col2.metric("Exactitud ERI", f"{eri.exactitud:.2f}%")
+            col3.metric("Exactitud ERU", f"{eru.exactitud:.2f}%")
+
+        if reportes_desactualizados():
+            col_info, col_boton = st.columns([3, 1])
+            col_info.caption(
+                f"Tablas y gráficos se actualizan cada {REPORTES_REFRESCO_SEG:g} s."
+                if REPORTES_REFRESCO_SEG > 0 else "Tablas y gráficos se actualizan a pedido."
+            )
+            if col_boton.button("🔄 Actualizar reportes"):
+                st.rerun()
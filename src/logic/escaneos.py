@@ -0,0 +1,88 @@
+from array import array
+
+import numpy as np
+
+
+class TablaInterna:
+    """Textos internados: cada texto distinto se guarda una sola vez y se referencia por un id entero."""
+
+    def __init__(self):
+        self.textos = []
+        self._ids = {}
+
+    def id(self, texto):
+        i = self._ids.get(texto)
+        if i is None:
+            i = len(self.textos)
+            self._ids[texto] = i
+            self.textos.append(texto)
+        return i
+
+    def __len__(self):
+        return len(self.textos)
+
+    def como_array(self):
+        return np.array(self.textos, dtype=object)
+
+
+class EscaneosInternados:
+    """
+    Escaneos aceptados de una sesión guardados como ids enteros (array('i')).
+    - Clave: posición en stock_teorico_eri (tabla compartida del catálogo, no se copia por sesión).
+    - Ubicación: tabla interna de la sesión (pocas ubicaciones distintas).
+    - El código escaneado casi siempre es clave + ubicación; solo se guardan aparte los que no.
+    """
+
+    def __init__(self, claves_catalogo, ids_clave, firma=None):
+        self.firma = firma
+        self.claves_catalogo = claves_catalogo
+        self.ids_clave = ids_clave
+        self.ubicaciones = TablaInterna()
+        self.id_clave = array("i")
+        self.id_ubicacion = array("i")
+        self.codigos_especiales = {}
+
+    def agregar(self, codigo, clave, ubicacion):
+        """Guarda un escaneo y retorna el id de su clave."""
+        id_clave = self.ids_clave[clave]
+        if codigo != clave + ubicacion:
+            self.codigos_especiales[len(self.id_clave)] = codigo
+        self.id_clave.append(id_clave)
+        self.id_ubicacion.append(self.ubicaciones.id(ubicacion))
+        return id_clave
+
+    def __len__(self):
+        return len(self.id_clave)
+
+    def ids_claves(self):
+        return np.array(self.id_clave, dtype=np.int64)
+
+    def ids_ubicaciones(self):
+        return np.array(self.id_ubicacion, dtype=np.int64)
+
+    def claves(self, indices=None):
+        """Clave de cada escaneo (array de textos); con `indices`, solo esas filas."""
+        ids = self.ids_claves()
+        return self.claves_catalogo[ids if indices is None else ids[indices]]
+
+    def ubicaciones_escaneadas(self, indices=None):
+        """Ubicación de cada escaneo (array de textos); con `indices`, solo esas filas."""
+        ids = self.ids_ubicaciones()
+        return self.ubicaciones.como_array()[ids if indices is None else ids[indices]]
+
+    def codigos(self, indices=None):
+        """Código original de cada escaneo (array de textos); con `indices`, solo esas filas."""
+        codigos = self.claves(indices) + self.ubicaciones_escaneadas(indices)
+        if indices is None:
+            for i, codigo in self.codigos_especiales.items():
+                codigos[i] = codigo
+        elif self.codigos_especiales:
+            for posicion, i in enumerate(indices):
+                codigo = self.codigos_especiales.get(int(i))
+                if codigo is not None:
+                    codigos[posicion] = codigo
+        return codigos
+
+    def registros(self):
+        """Lista de (codigo, clave, ubicacion), en el orden de escaneo."""
+        return list(zip(self.codigos().tolist(), self.claves().tolist(), self.ubicaciones_escaneadas().tolist()))
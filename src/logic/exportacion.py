@@ -0,0 +1,160 @@
+import io
+import os
+import importlib.util
+import tempfile
+import weakref
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from src.logic.conciliacion import ESTADOS_ERI, ESTADOS_ERU
+from src.logic.carga_diferida import importar
+from src.logic.tabla_paginada import texto_ubicaciones
+
+# ================================================================
+# 📤 Exportación de resultados de conciliación (CSV / Parquet / Excel)
+# ================================================================
+# El archivo se arma por bloques de filas (nunca la tabla completa como DataFrame)
+# y cada bloque se vuelca a un archivo temporal en disco: ni el armado ni la última
+# exportación guardada en la sesión ocupan memoria. Streamlit igual lee el archivo
+# completo al hacer clic (la descarga diferida guarda bytes en su almacenamiento).
+TAMANO_BLOQUE = 50_000
+
+# Excel admite 1.048.576 filas por hoja (una es el encabezado)
+FILAS_POR_HOJA_XLSX = 1_048_575
+
+FORMATOS = {
+    "CSV": ("csv", "text/csv"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+    "Excel": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+_DEPENDENCIA_FORMATO = {"Parquet": "pyarrow", "Excel": "openpyxl"}
+
+
+@lru_cache(maxsize=None)
+def formatos_disponibles():
+    """Formatos cuya dependencia está instalada (se consulta una vez por proceso)."""
+    return [
+        formato for formato in FORMATOS
+        if formato not in _DEPENDENCIA_FORMATO
+        or importlib.util.find_spec(_DEPENDENCIA_FORMATO[formato]) is not None
+    ]
+
+
+# ---------- Filas de detalle (mismas columnas que las tablas del reporte) ----------
+def detalle_eri(resultado, ubicaciones, indices):
+    """Filas `indices` del detalle ERI (resultado de conciliar_eri + ubicaciones teóricas)."""
+    return pd.DataFrame({
+        "clave_producto_referencia": resultado.claves[indices],
+        "stock_registro": resultado.stock_teorico[indices],
+        "stock_fisico_contado": resultado.stock_fisico[indices],
+        "diferencia_fisico_registro": resultado.diferencia[indices],
+        "estado_conteo": np.array(ESTADOS_ERI, dtype=object)[resultado.estado[indices]],
+        "ubicaciones_teoricas": texto_ubicaciones(ubicaciones[indices]),
+    })
+
+
+def detalle_eru(estados, ubicaciones_teoricas, escaneos, indices):
+    """Filas `indices` del detalle ERU (`estados` = códigos de veredicto por escaneo)."""
+    ids_clave = escaneos.ids_claves()[indices]
+    return pd.DataFrame({
+        "clave_escaneada_eru": escaneos.codigos(indices),
+        "clave_producto_ref_eru": escaneos.claves(indices),
+        "ubicacion_escaneada": escaneos.ubicaciones_escaneadas(indices),
+        "UBICACION_NOMBRE": texto_ubicaciones(ubicaciones_teoricas[ids_clave]),
+        "estado_ubicacion": np.array(ESTADOS_ERU, dtype=object)[estados[indices]],
+    })
+
+
+def bloques(total, armar, tamano=TAMANO_BLOQUE):
+    """Genera DataFrames de `tamano` filas con `armar(indices)`; siempre al menos uno (encabezado)."""
+    for inicio in range(0, max(total, 1), tamano):
+        yield armar(np.arange(inicio, min(inicio + tamano, total)))
+
+
+# ---------- Escritores por formato ----------
+def escribir_csv(bloques_df, destino):
+    texto = io.TextIOWrapper(destino, encoding="utf-8", newline="", write_through=True)
+    for i, bloque in enumerate(bloques_df):
+        bloque.to_csv(texto, header=i == 0, index=False)
+    texto.detach()  # no cerrar el archivo destino
+
+
+def escribir_parquet(bloques_df, destino):
+    pa = importar("pyarrow")
+    pq = importar("pyarrow.parquet")
+    escritor = None
+    try:
+        for bloque in bloques_df:
+            tabla = pa.Table.from_pandas(bloque, preserve_index=False)
+            if escritor is None:
+                escritor = pq.ParquetWriter(destino, tabla.schema)
+            escritor.write_table(tabla)  # un row group por bloque
+    finally:
+        if escritor is not None:
+            escritor.close()
+
+
+def escribir_xlsx(bloques_df, destino, hoja="Detalle"):
+    """Excel en modo write_only de openpyxl: las filas se vuelcan al archivo sin quedar en memoria."""
+    openpyxl = importar("openpyxl")
+    libro = openpyxl.Workbook(write_only=True)
+    actual, filas, numero = None, 0, 0
+    for bloque in bloques_df:
+        encabezado = list(bloque.columns)
+        for fila in bloque.itertuples(index=False, name=None):
+            if actual is None or filas >= FILAS_POR_HOJA_XLSX:
+                numero += 1
+                actual = libro.create_sheet(hoja if numero == 1 else f"{hoja} ({numero})")
+                actual.append(encabezado)
+                filas = 0
+            actual.append([v.item() if isinstance(v, np.generic) else v for v in fila])
+            filas += 1
+    if actual is None:
+        libro.create_sheet(hoja).append(encabezado)
+    libro.save(destino)
+
+
+_ESCRITORES = {"CSV": escribir_csv, "Parquet": escribir_parquet, "Excel": escribir_xlsx}
+
+
+def _borrar_archivo(ruta):
+    try:
+        os.remove(ruta)
+    except FileNotFoundError:
+        pass
+
+
+class ArchivoExportado:
+    """
+    Exportación escrita en un archivo temporal.
+    - `leer()` devuelve el contenido (lo que recibe st.download_button).
+    - El archivo se borra con `borrar()` o al liberar el objeto (ej. al cerrar la sesión).
+    """
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._borrar = weakref.finalize(self, _borrar_archivo, ruta)
+
+    def leer(self):
+        with open(self.ruta, "rb") as archivo:
+            return archivo.read()
+
+    def borrar(self):
+        self._borrar()
+
+
+def exportar(bloques_df, formato):
+    """
+    Escribe los bloques en el formato pedido, bloque a bloque, en un archivo temporal.
+    - Retorna un ArchivoExportado; si la escritura falla, el temporal se borra.
+    """
+    descriptor, ruta = tempfile.mkstemp(prefix="exportacion_", suffix=f".{FORMATOS[formato][0]}")
+    try:
+        with open(descriptor, "wb") as archivo:
+            _ESCRITORES[formato](bloques_df, archivo)
+    except BaseException:
+        _borrar_archivo(ruta)
+        raise
+    return ArchivoExportado(ruta)
@@ -0,0 +1,57 @@
+import csv
+from io import StringIO
+
+import pandas as pd
+
+# Encabezados reconocidos para la columna de códigos en volcados CSV
+COLUMNAS_CODIGO = ["codigo", "código", "code", "barcode", "codigo_barras", "codigo_escaneado"]
+
+
+def leer_volcado_escaner(contenido, nombre_archivo):
+    """
+    Lee los códigos de un volcado de colector (TXT o CSV).
+    - TXT: un código por línea.
+    - CSV: columna 'codigo'/'code'/'barcode' si existe; si no, la primera columna.
+    - Se quitan espacios y líneas vacías; se respeta el orden de escaneo.
+    """
+    if isinstance(contenido, bytes):
+        try:
+            texto = contenido.decode("utf-8-sig")
+        except UnicodeDecodeError:
+            texto = contenido.decode("latin-1")
+    else:
+        texto = contenido
+
+    if nombre_archivo.lower().endswith(".csv"):
+        try:
+            separador = csv.Sniffer().sniff(texto[:4096], delimiters=",;\t|").delimiter
+        except csv.Error:
+            separador = ","
+        df = pd.read_csv(StringIO(texto), dtype=str, header=None, sep=separador)
+        encabezado = [str(c).strip().lower() for c in df.iloc[0]] if len(df) else []
+        columna = next((i for i, c in enumerate(encabezado) if c in COLUMNAS_CODIGO), None)
+        if columna is None:
+            codigos = df.iloc[:, 0]
+        else:
+            codigos = df.iloc[1:, columna]
+    else:
+        codigos = pd.Series(texto.splitlines(), dtype=object)
+
+    codigos = codigos.dropna().astype(str).str.strip()
+    return codigos[codigos != ""].tolist()
+
+
+def separar_resultados(codigos, resultados):
+    """
+    Separa los resultados de `decodificar_lote` en aceptados y rechazados.
+    - Aceptados: lista de (codigo, clave_producto_ref, ubicacion).
+    - Rechazados: lista de códigos que no coinciden con el catálogo.
+    """
+    aceptados = []
+    rechazados = []
+    for codigo, (clave, ubicacion) in zip(codigos, resultados):
+        if clave and ubicacion:
+            aceptados.append((codigo, clave, ubicacion))
+        else:
+            rechazados.append(codigo)
+    return aceptados, rechazados
@@ -0,0 +1,121 @@
+import os
+import time
+import json
+import threading
+from contextlib import nullcontext
+
+# ================================================================
+# 🩺 Instrumentación liviana (tiempos por etapa y contadores)
+# ================================================================
+# Desactivada por defecto: `medir` devuelve un contexto vacío reutilizable y
+# `contar` retorna de inmediato, así el costo con el panel apagado es un if.
+INSTRUMENTACION_ACTIVA = os.getenv("INSTRUMENTACION", "0") == "1"
+
+_NULO = nullcontext()
+
+
+class _Cronometro:
+    __slots__ = ("_registro", "_nombre", "_inicio")
+
+    def __init__(self, registro, nombre):
+        self._registro = registro
+        self._nombre = nombre
+
+    def __enter__(self):
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._registro.registrar_tiempo(self._nombre, time.perf_counter() - self._inicio)
+        return False
+
+
+class Instrumentacion:
+    """
+    Tiempos y contadores del proceso (compartidos entre sesiones y hilos).
+    - Tiempos: por nombre guarda [llamadas, total, máximo, último] en segundos.
+    - Contadores: enteros por nombre (ej. aciertos/fallos de caché, llamadas a Drive).
+    """
+
+    def __init__(self, activo=False):
+        self.activo = activo
+        self._lock = threading.Lock()
+        self.tiempos = {}
+        self.contadores = {}
+
+    def activar(self, activo=True):
+        self.activo = bool(activo)
+
+    def medir(self, nombre):
+        """Context manager que mide la duración del bloque (no hace nada si está inactivo)."""
+        if not self.activo:
+            return _NULO
+        return _Cronometro(self, nombre)
+
+    def registrar_tiempo(self, nombre, segundos):
+        if not self.activo:
+            return
+        with self._lock:
+            t = self.tiempos.get(nombre)
+            if t is None:
+                self.tiempos[nombre] = [1, segundos, segundos, segundos]
+            else:
+                t[0] += 1
+                t[1] += segundos
+                t[2] = max(t[2], segundos)
+                t[3] = segundos
+
+    def contar(self, nombre, n=1):
+        if not self.activo:
+            return
+        with self._lock:
+            self.contadores[nombre] = self.contadores.get(nombre, 0) + n
+
+    def reiniciar(self):
+        with self._lock:
+            self.tiempos.clear()
+            self.contadores.clear()
+
+    # ---------- Exportación ----------
+    def como_dict(self):
+        with self._lock:
+            return {
+                "tiempos": {
+                    nombre: {
+                        "llamadas": n,
+                        "total_s": total,
+                        "promedio_s": total / n,
+                        "max_s": maximo,
+                        "ultimo_s": ultimo,
+                    }
+                    for nombre, (n, total, maximo, ultimo) in sorted(self.tiempos.items())
+                },
+                "contadores": dict(sorted(self.contadores.items())),
+            }
+
+    def como_json(self):
+        return json.dumps(self.como_dict(), ensure_ascii=False, indent=2)
+
+    def como_prometheus(self, prefijo="inventario"):
+        """Formato de texto de Prometheus (un summary por etapa y un counter por contador)."""
+        datos = self.como_dict()
+        lineas = [
+            f"# HELP {prefijo}_etapa_segundos Duración de cada etapa instrumentada.",
+            f"# TYPE {prefijo}_etapa_segundos summary",
+        ]
+        for nombre, t in datos["tiempos"].items():
+            etiqueta = f'{{etapa="{nombre}"}}'
+            lineas.append(f"{prefijo}_etapa_segundos_count{etiqueta} {t['llamadas']}")
+            lineas.append(f"{prefijo}_etapa_segundos_sum{etiqueta} {t['total_s']:.6f}")
+            lineas.append(f"{prefijo}_etapa_segundos_max{etiqueta} {t['max_s']:.6f}")
+        lineas.append(f"# HELP {prefijo}_eventos_total Contadores de eventos (caché, llamadas a APIs).")
+        lineas.append(f"# TYPE {prefijo}_eventos_total counter")
+        for nombre, valor in datos["contadores"].items():
+            lineas.append(f'{prefijo}_eventos_total{{evento="{nombre}"}} {valor}')
+        return "\n".join(lineas) + "\n"
+
+
+# Registro único del proceso
+instrumentacion = Instrumentacion(activo=INSTRUMENTACION_ACTIVA)
+medir = instrumentacion.medir
+contar = instrumentacion.contar
@@ -0,0 +1,102 @@
+import os
+import re
+
+from src.logic.utils import DecodificadorEscaneo
+from src.logic.escaneos import EscaneosInternados
+from src.logic.conciliacion import ConciliacionERI, ConciliacionERU, ubicaciones_por_clave
+from src.logic.importacion import separar_resultados
+
+# ================================================================
+# ⚙️ Procesamiento ERI/ERU sin Streamlit
+# ================================================================
+# Mismas piezas que usa la app (escaneo_logic.py), pero sin st.*:
+# sirven para la CLI de auditoría y para procesos en paralelo.
+
+
+def construir_escaneos(decodificador, codigos, firma=None):
+    """
+    Decodifica una lista de códigos contra el catálogo del decodificador.
+    - Retorna (EscaneosInternados con los aceptados, lista de códigos rechazados).
+    """
+    escaneos = EscaneosInternados(decodificador.claves_catalogo, decodificador.ids_clave, firma=firma)
+    if not codigos:
+        return escaneos, []
+    aceptados, rechazados = separar_resultados(codigos, decodificador.decodificar_lote(codigos))
+    for codigo, clave, ubicacion in aceptados:
+        escaneos.agregar(codigo, clave, ubicacion)
+    return escaneos, rechazados
+
+
+def revalidar_registros(decodificador, registros):
+    """
+    Prepara registros guardados (codigo, clave, ubicacion) para el catálogo actual.
+    - El diario y el conteo compartido pueden traer claves de otra versión del inventario:
+      esos códigos se vuelven a decodificar contra el catálogo del decodificador.
+    - Retorna (registros válidos en el orden original, códigos descartados).
+    """
+    pendientes = [codigo for codigo, clave, _ in registros if clave not in decodificador.ids_clave]
+    if not pendientes:
+        return list(registros), []
+
+    unicos = list(dict.fromkeys(pendientes))
+    decodificados = dict(zip(unicos, decodificador.decodificar_lote(unicos)))
+    validos, descartados = [], []
+    for codigo, clave, ubicacion in registros:
+        if clave not in decodificador.ids_clave:
+            clave, ubicacion = decodificados[codigo]
+            if not (clave and ubicacion):
+                descartados.append(codigo)
+                continue
+        validos.append((codigo, clave, ubicacion))
+    return validos, descartados
+
+
+def construir_conciliacion_eri(stock_teorico_eri, escaneos, firma=None):
+    """Conciliación ERI de todos los escaneos guardados (bincount sobre los ids)."""
+    conciliacion = ConciliacionERI(stock_teorico_eri, firma=firma)
+    conciliacion.registrar_lote(escaneos.ids_claves())
+    return conciliacion
+
+
+def construir_conciliacion_eru(ubicaciones, escaneos, firma=None):
+    """Veredictos ERU de todos los escaneos guardados (`ubicaciones` = ubicaciones_por_clave)."""
+    listas, normalizadas = ubicaciones
+    conciliacion = ConciliacionERU(listas, normalizadas, firma=firma)
+    conciliacion.registrar_escaneos(escaneos)
+    return conciliacion
+
+
+def _nombre_archivo(almacen):
+    """Nombre de archivo seguro para un almacén."""
+    return re.sub(r"[^\w.-]+", "_", str(almacen)).strip("_") or "almacen"
+
+
+def procesar_almacen(almacen, stock_teorico_eri, codigos, carpeta_detalle=None):
+    """
+    Calcula métricas ERI/ERU de un almacén para una lista de códigos escaneados.
+    - Retorna un dict serializable a JSON.
+    - Si se indica `carpeta_detalle`, escribe las tablas de detalle ERI/ERU como CSV.
+    """
+    decodificador = DecodificadorEscaneo(stock_teorico_eri)
+    escaneos, rechazados = construir_escaneos(decodificador, codigos)
+    eri = construir_conciliacion_eri(stock_teorico_eri, escaneos)
+    eru = construir_conciliacion_eru(ubicaciones_por_clave(stock_teorico_eri), escaneos)
+
+    resultado = {
+        "almacen": str(almacen),
+        "items": eri.total_items,
+        "escaneos_leidos": len(codigos),
+        "escaneos_aceptados": len(escaneos),
+        "escaneos_rechazados": len(rechazados),
+        "eri": {**eri.metricas(), "estados": dict(eri.conteo_estados)},
+        "eru": {**eru.metricas(), "estados": dict(eru.conteo_estados)},
+    }
+
+    if carpeta_detalle:
+        os.makedirs(carpeta_detalle, exist_ok=True)
+        base = os.path.join(carpeta_detalle, _nombre_archivo(almacen))
+        eri.tabla_detalle(stock_teorico_eri).to_csv(f"{base}_eri.csv", index=False)
+        eru.tabla_detalle(escaneos).to_csv(f"{base}_eru.csv", index=False)
+        resultado["detalle"] = {"eri": f"{base}_eri.csv", "eru": f"{base}_eru.csv"}
+
+    return resultado
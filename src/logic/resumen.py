@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+
+from src.logic.conciliacion import normalizar_ubicaciones
+
+# ================================================================
+# 🏢 Resumen de exactitud de todos los almacenes
+# ================================================================
+COLUMNAS_RESUMEN = [
+    "ALMACEN_NOMBRE",
+    "items",
+    "stock_teorico",
+    "stock_fisico",
+    "items_correctos",
+    "exactitud_eri",
+    "escaneos",
+    "ubicaciones_correctas",
+    "exactitud_eru",
+]
+
+
+def escaneos_a_dataframe(escaneos_por_almacen):
+    """
+    Une los escaneos aceptados de varios almacenes en un solo DataFrame.
+    - `escaneos_por_almacen`: {almacen: (claves, ubicaciones)} con secuencias alineadas.
+    """
+    partes = [
+        pd.DataFrame({"ALMACEN_NOMBRE": almacen, "clave": list(claves), "ubicacion": list(ubicaciones)})
+        for almacen, (claves, ubicaciones) in escaneos_por_almacen.items()
+        if len(claves)
+    ]
+    if not partes:
+        return pd.DataFrame(columns=["ALMACEN_NOMBRE", "clave", "ubicacion"])
+    return pd.concat(partes, ignore_index=True)
+
+
+def resumen_empresa(indice, escaneos):
+    """
+    Exactitud ERI/ERU de todos los almacenes en una sola pasada agrupada.
+    - `indice`: IndiceAlmacenes del inventario cargado.
+    - `escaneos`: DataFrame ALMACEN_NOMBRE / clave / ubicacion con los escaneos aceptados.
+    - ERI: ítems con físico == teórico sobre el total de ítems del almacén.
+    - ERU: escaneos en una ubicación teórica de su clave sobre el total de escaneos.
+    """
+    if indice.stock is None or indice.stock.empty:
+        return pd.DataFrame(columns=COLUMNAS_RESUMEN)
+
+    stock = indice.stock
+    teorico = stock["stock_teorico"].fillna(0).to_numpy(dtype=float)
+
+    # --- ERI: conteo físico por (almacén, clave) alineado con el stock teórico ---
+    fisico = (
+        escaneos.groupby(["ALMACEN_NOMBRE", "clave"]).size()
+        .reindex(stock.index, fill_value=0)
+        .to_numpy()
+    )
+    por_item = pd.DataFrame({
+        "ALMACEN_NOMBRE": stock.index.get_level_values(0),
+        "stock_teorico": teorico,
+        "stock_fisico": fisico,
+        "items_correctos": fisico == teorico,
+    })
+    eri = por_item.groupby("ALMACEN_NOMBRE", sort=True).agg(
+        items=("items_correctos", "size"),
+        stock_teorico=("stock_teorico", "sum"),
+        stock_fisico=("stock_fisico", "sum"),
+        items_correctos=("items_correctos", "sum"),
+    )
+    eri["exactitud_eri"] = eri["items_correctos"] / eri["items"] * 100
+
+    # --- ERU: ubicación escaneada dentro de las ubicaciones teóricas de la clave ---
+    correcta = pd.MultiIndex.from_arrays([
+        escaneos["ALMACEN_NOMBRE"].to_numpy(),
+        escaneos["clave"].to_numpy(),
+        normalizar_ubicaciones(escaneos["ubicacion"]).to_numpy(),
+    ]).isin(indice.ubicaciones_normalizadas()) if len(escaneos) else np.zeros(0, dtype=bool)
+    eru = pd.DataFrame({
+        "ALMACEN_NOMBRE": escaneos["ALMACEN_NOMBRE"].to_numpy(),
+        "ubicaciones_correctas": correcta,
+    }).groupby("ALMACEN_NOMBRE").agg(
+        escaneos=("ubicaciones_correctas", "size"),
+        ubicaciones_correctas=("ubicaciones_correctas", "sum"),
+    )
+
+    resumen = eri.join(eru, how="left").fillna({"escaneos": 0, "ubicaciones_correctas": 0})
+    resumen = resumen.astype({"escaneos": "int64", "ubicaciones_correctas": "int64", "items_correctos": "int64"})
+    resumen["exactitud_eru"] = np.where(
+        resumen["escaneos"] > 0,
+        resumen["ubicaciones_correctas"] / resumen["escaneos"].where(resumen["escaneos"] > 0, 1) * 100,
+        0.0,
+    )
+    return resumen.reset_index()[COLUMNAS_RESUMEN]
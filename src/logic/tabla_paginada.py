@@ -0,0 +1,71 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+# ================================================================
+# 📄 Tablas paginadas del lado del servidor
+# ================================================================
+# Las tablas de detalle se filtran con máscaras booleanas y se ordenan con
+# permutaciones precalculadas; solo las filas de la página visible se convierten
+# a DataFrame (y se envían al navegador).
+TAMANOS_PAGINA = [25, 50, 100, 250]
+
+
+class IndiceBusqueda:
+    """
+    Índice de claves del catálogo (uno por almacén y catálogo).
+    - `orden`: permutación alfabética de las claves; `rango`: posición de cada clave en ese orden.
+    - `mascara(termino)`: claves que contienen el texto (sin distinguir mayúsculas), memoizada.
+    - Se comparte entre sesiones (cache_resource): la memoria de búsquedas va con lock.
+    """
+
+    def __init__(self, claves, max_busquedas=32):
+        claves = np.asarray(claves, dtype=object)
+        self._texto = pd.Series(claves, dtype=object).astype(str).str.lower()
+        self.orden = np.argsort(claves.astype(str), kind="stable")
+        self.rango = np.empty(len(claves), dtype=np.int64)
+        self.rango[self.orden] = np.arange(len(claves))
+        self._memo = {}
+        self._max_busquedas = max_busquedas
+        self._lock = threading.Lock()
+
+    def mascara(self, termino):
+        termino = termino.strip().lower()
+        with self._lock:
+            mascara = self._memo.get(termino)
+        if mascara is None:
+            # La búsqueda corre fuera del lock; si dos sesiones buscan lo mismo, gana la última
+            mascara = self._texto.str.contains(termino, regex=False).to_numpy()
+            with self._lock:
+                while len(self._memo) >= self._max_busquedas:
+                    self._memo.pop(next(iter(self._memo)))
+                self._memo[termino] = mascara
+        return mascara
+
+
+def seleccionar_filas(total, mascara=None, orden=None):
+    """Índices de las filas que pasan la máscara, en el orden dado (permutación de 0..total-1)."""
+    if orden is None:
+        return np.flatnonzero(mascara) if mascara is not None else np.arange(total)
+    return orden if mascara is None else orden[mascara[orden]]
+
+
+def paginar(indices, pagina, tamano):
+    """Retorna (índices de la página, página ajustada, total de páginas)."""
+    total_paginas = max(1, -(-len(indices) // tamano))
+    pagina = min(max(1, int(pagina)), total_paginas)
+    return indices[(pagina - 1) * tamano: pagina * tamano], pagina, total_paginas
+
+
+def _aplanar(ubicaciones):
+    if isinstance(ubicaciones, list):
+        for u in ubicaciones:
+            yield from _aplanar(u)
+    elif ubicaciones is not None and not pd.isna(ubicaciones):
+        yield str(ubicaciones)
+
+
+def texto_ubicaciones(listas):
+    """Ubicaciones (listas, posiblemente anidadas) como texto legible, solo para las filas visibles."""
+    return [", ".join(_aplanar(u)) for u in listas]
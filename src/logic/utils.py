@@ -1,4 +1,5 @@
 import re
+import numpy as np
 import pandas as pd
 
 ubicacion_pattern = r'R\d{1,3}[A-Z]-[A-Z]-\d{1,3}$'
@@ -6,6 +7,9 @@ ubicacion_pattern_alt = r'R\d{1,3}[A-Z]-[A-Z]-[A-Z]$'
 ubicacion_pattern_alt2 = r'R\d{1,3}-[A-Z]-\d{1,3}$'
 ubicacion_pattern_alt3 = r'R\d{1,3}-[A-Z]-[A-Z]$'
 
+# Gramática única equivalente a los cuatro patrones anteriores (se compila una sola vez)
+ubicacion_regex = re.compile(r'R\d{1,3}[A-Z]?-[A-Z]-(?:\d{1,3}|[A-Z])$')
+
 def desconcatenar_producto_ref(clave_completa, ubicaciones_teoricas, stock_teorico_eri):
     """Extrae clave_teorica_eri y ubicación de un código ERU."""
     # 🧹 Limpieza de ubicaciones (evita float, NaN, vacíos)
@@ -41,3 +45,134 @@ def desconcatenar_producto_ref(clave_completa, ubicaciones_teoricas, stock_teori
                 return row['clave_teorica_eri'], ubicacion_extraida
 
     return None, None
+
+
+class DecodificadorEscaneo:
+    """
+    Índice precompilado para desconcatenar códigos ERU de un almacén.
+    - Se construye una vez a partir de stock_teorico_eri (y opcionalmente de las claves ERU teóricas).
+    - Devuelve exactamente lo mismo que `desconcatenar_producto_ref`, pero cada escaneo
+      solo hace búsquedas por hash sobre sufijos/prefijos del código, sin recorrer el catálogo.
+    """
+
+    def __init__(self, stock_teorico_eri, claves_eru=None, ubicaciones_teoricas=None):
+        if ubicaciones_teoricas is None:
+            ubicaciones_teoricas = stock_teorico_eri["UBICACION_NOMBRE"].explode().unique()
+
+        # 🧹 Índice inverso de ubicaciones (mismas reglas de limpieza que la función original)
+        self.ubicaciones = frozenset(
+            str(u).strip()
+            for u in ubicaciones_teoricas
+            if pd.notna(u) and str(u).strip() != ""
+        )
+        self._longitudes_ubicacion = sorted({len(u) for u in self.ubicaciones}, reverse=True)
+
+        # 🔑 Conjunto de claves y posición de la primera fila de cada una (orden de iterrows);
+        #    esa posición es también el id entero de la clave en los escaneos internados
+        self.claves_catalogo = stock_teorico_eri["clave_teorica_eri"].to_numpy()
+        claves = self.claves_catalogo.tolist()
+        self.claves = frozenset(claves)
+        self.ids_clave = {}
+        for pos, clave in enumerate(claves):
+            if isinstance(clave, str) and clave not in self.ids_clave:
+                self.ids_clave[clave] = pos
+        self._longitudes_clave = sorted({len(c) for c in self.ids_clave})
+
+        # Los candidatos del primer paso siempre llevan "_": si ninguna clave lo tiene, se omite
+        self._claves_con_guion = any("_" in c for c in self.ids_clave)
+
+        # ⚡ Códigos ERU teóricos: su resultado se memoriza (acotado al tamaño del catálogo)
+        self._eru_conocidos = frozenset(
+            str(c) for c in (claves_eru if claves_eru is not None else []) if pd.notna(c)
+        )
+        self._memo = {}
+
+    def decodificar(self, clave_completa):
+        """Extrae (clave_teorica_eri, ubicación) de un código ERU, o (None, None)."""
+        resultado = self._memo.get(clave_completa)
+        if resultado is not None:
+            return resultado
+
+        resultado = self._decodificar(clave_completa)
+        if clave_completa in self._eru_conocidos:
+            self._memo[clave_completa] = resultado
+        return resultado
+
+    def decodificar_lote(self, codigos):
+        """
+        Decodifica muchos códigos en una sola pasada (misma semántica que `decodificar`).
+        - Cada código distinto se resuelve una sola vez.
+        - Sin claves con "_", la búsqueda de prefijos se hace vectorizada por largo de clave.
+        """
+        serie = pd.Series(list(codigos), dtype=object)
+        unicos = pd.Series(pd.unique(serie), dtype=object)
+
+        if self._claves_con_guion or not self.ubicaciones:
+            resultados = [self.decodificar(c) for c in unicos]
+        else:
+            resultados = self._decodificar_prefijos_vectorizado(unicos)
+
+        por_codigo = dict(zip(unicos, resultados))
+        return [por_codigo[c] for c in serie]
+
+    def _decodificar_prefijos_vectorizado(self, unicos):
+        largos = unicos.str.len().to_numpy()
+        mejor_pos = np.full(len(unicos), np.inf)
+        claves = np.full(len(unicos), None, dtype=object)
+        ubicaciones = np.full(len(unicos), None, dtype=object)
+        claves_validas = pd.Index(list(self.ids_clave))
+
+        for n in self._longitudes_clave:
+            prefijos = unicos.str[:n]
+            candidatos = (largos >= n) & prefijos.isin(claves_validas).to_numpy()
+            if not candidatos.any():
+                continue
+            pos = prefijos[candidatos].map(self.ids_clave).to_numpy(dtype=float)
+            resto = unicos[candidatos].str[n:]
+            validos = resto.str.contains(ubicacion_regex).to_numpy(dtype=bool)
+            mejora = validos & (pos < mejor_pos[candidatos])
+            if not mejora.any():
+                continue
+            idx = np.flatnonzero(candidatos)[mejora]
+            mejor_pos[idx] = pos[mejora]
+            claves[idx] = prefijos.to_numpy()[idx]
+            ubicaciones[idx] = resto.to_numpy()[mejora]
+
+        return list(zip(claves.tolist(), ubicaciones.tolist()))
+
+    def _decodificar(self, clave_completa):
+        if not self.ubicaciones:
+            return None, None
+
+        largo = len(clave_completa)
+
+        # 🔍 Coincidencias exactas al final del código (de la ubicación más larga a la más corta)
+        if self._claves_con_guion:
+            for n in self._longitudes_ubicacion:
+                if n > largo:
+                    continue
+                ub_teorica = clave_completa[largo - n:]
+                if ub_teorica not in self.ubicaciones:
+                    continue
+                parte_producto_ref = clave_completa[:largo - n]
+                for i in range(len(parte_producto_ref)):
+                    clave_teorica = parte_producto_ref[:i] + "_" + parte_producto_ref[i:]
+                    if clave_teorica in self.claves:
+                        return clave_teorica, ub_teorica
+
+        # 🔎 Alternativa: prefijos que sean clave y resto con formato de ubicación válido
+        mejor = None
+        for n in self._longitudes_clave:
+            if n > largo:
+                break
+            prefijo = clave_completa[:n]
+            pos = self.ids_clave.get(prefijo)
+            if pos is None or (mejor is not None and pos >= mejor[0]):
+                continue
+            ubicacion_extraida = clave_completa[n:]
+            if ubicacion_regex.search(ubicacion_extraida):
+                mejor = (pos, prefijo, ubicacion_extraida)
+
+        if mejor:
+            return mejor[1], mejor[2]
+        return None, None
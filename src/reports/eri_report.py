@@ -1,71 +1,36 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
+from src.logic.conciliacion import ESTADOS_ERI
+from src.logic.escaneo_logic import obtener_conciliacion_eri, obtener_indice_busqueda
+from src.logic.exportacion import detalle_eri
+from src.ui.tabla_paginada import mostrar_tabla_paginada
+from src.ui.exportacion import mostrar_exportacion
+from src.reports.graficos import figura_eri
 
 def mostrar_reporte_eri(stock_teorico_eri):
     """Genera todo el bloque del reporte ERI: escaneos, métricas, gráfico y tabla."""
-    if st.session_state["escaneos_eri"]:
+    escaneos = st.session_state.get("escaneos")
+    if escaneos is not None and len(escaneos):
         st.subheader("📊 Escaneos ERI Acumulados")
-        st.write(f"Total de escaneos ERI: {len(st.session_state['escaneos_eri'])}")
+        st.write(f"Total de escaneos ERI: {len(escaneos)}")
 
-        # --- DataFrame de escaneos ERI ---
-        df_escaneos_eri = pd.DataFrame(st.session_state["escaneos_eri"], columns=["clave_escaneada_eri"])
-        stock_fisico_eri = (
-            df_escaneos_eri["clave_escaneada_eri"]
-            .value_counts()
-            .reset_index()
-        )
-        stock_fisico_eri.columns = ["clave_escaneada_eri", "stock_fisico"]
-        st.dataframe(stock_fisico_eri, use_container_width=True)
-
-        # --- Cruce ERI (teórico vs físico) ---
-        merged_eri = pd.merge(
-            stock_teorico_eri,
-            stock_fisico_eri,
-            left_on="clave_teorica_eri",
-            right_on="clave_escaneada_eri",
-            how="outer"
-        ).fillna(0)
-
-        # --- Cálculo de diferencias ---
-        merged_eri["diferencia"] = merged_eri["stock_fisico"] - merged_eri["stock_teorico"]
-
-        # --- Estado por ítem ---
-        merged_eri["estado"] = merged_eri["diferencia"].apply(
-            lambda x: "Completo" if x == 0 else ("Sobrante" if x > 0 else "Faltante")
-        )
+        # --- Estado acumulado ERI (se actualiza en cada escaneo) ---
+        conciliacion = obtener_conciliacion_eri(stock_teorico_eri)
+        st.dataframe(conciliacion.stock_fisico_df(), use_container_width=True)
 
         # --- Exactitud ERI ---
-        total_items_eri = len(merged_eri)
-        items_con_error_eri = len(merged_eri[merged_eri["diferencia"] != 0])
-        exactitud_eri = (1 - items_con_error_eri / total_items_eri) * 100 if total_items_eri > 0 else 0
+        items_con_error_eri = conciliacion.items_con_error
+        exactitud_eri = conciliacion.exactitud
 
         # --- Métricas ERI ---
         st.subheader("📈 Reporte ERI")
         col1, col2, col3 = st.columns(3)
         col1.metric("Exactitud ERI", f"{exactitud_eri:.2f}%")
-        col2.metric("Ítems Correctos ERI", len(merged_eri[merged_eri["estado"] == "Completo"]))
+        col2.metric("Ítems Correctos ERI", conciliacion.items_correctos)
         col3.metric("Ítems con Error ERI", items_con_error_eri)
 
-        # --- Gráfico ERI ---
-        fig_eri = px.pie(
-            merged_eri,
-            names="estado",
-            title="Distribución ERI",
-            color="estado",
-            color_discrete_map={
-                "Completo": "#22c55e",         # verde
-                "Faltante": "#ef4444",   # rojo
-                "Sobrante": "#f59e0b"    # naranja
-            }
-        )
-        fig_eri.update_layout(
-            template="plotly_white",
-            legend_title_text="Estado",
-            paper_bgcolor="white",
-            plot_bgcolor="white"
-        )
-
+        # --- Gráfico ERI (memoizado por conteos y almacén) ---
+        almacen = st.session_state.get("almacen_actual")
+        fig_eri = figura_eri(almacen, conciliacion.conteo_estados)
         st.plotly_chart(
             fig_eri,
             config={
@@ -74,45 +39,52 @@ def mostrar_reporte_eri(stock_teorico_eri):
                 "autosize": True,
                 "style": {"width": "100%"}
             },
-            key=f"fig_eri_panel_{st.session_state.get('almacen_actual','NA')}"
+            key=f"fig_eri_panel_{almacen or 'NA'}"
         )
 
-
-
-        # --- Tabla detallada ERI ---
-        tabla_detalle_eri = merged_eri.rename(columns={
-            "clave_teorica_eri": "clave_producto_referencia",
-            "stock_teorico": "stock_registro",
-            "stock_fisico": "stock_fisico_contado",
-            "diferencia": "diferencia_fisico_registro",
-            "estado": "estado_conteo",
-            "UBICACION_NOMBRE": "ubicaciones_teoricas"
-        })
-        st.dataframe(
-            tabla_detalle_eri[[
-                "clave_producto_referencia",
-                "stock_registro",
-                "stock_fisico_contado",
-                "diferencia_fisico_registro",
-                "estado_conteo",
-                "ubicaciones_teoricas"
-            ]],
-            width='stretch'
-        )
-
-        # --- Exportación CSV (opcional) ---
-        csv_eri = tabla_detalle_eri.to_csv(index=False).encode("utf-8")
-
-        # Guardar figura globalmente para usar en reporte general
-        st.session_state["fig_eri"] = fig_eri
-        st.session_state["fig_eri_almacen"] = st.session_state.get("almacen_actual")
-        st.session_state["metricas_eri"] = {
-            "exactitud": exactitud_eri,
-            "ok": len(merged_eri[merged_eri["estado"] == "Completo"]),
-            "error": items_con_error_eri
-        }
-
-        # Asegurar compatibilidad global
-        st.session_state["fig_eri"] = fig_eri
-        st.session_state["fig_eri_ready"] = True
-
+        # --- Tabla detallada ERI (paginada: solo se envía la página visible) ---
+        mostrar_tabla_detalle_eri(stock_teorico_eri, conciliacion)
+
+        # Conteos (no la figura) para el reporte general: el gráfico sale de la misma caché
+        st.session_state["conteo_eri"] = dict(conciliacion.conteo_estados)
+        st.session_state["metricas_eri"] = conciliacion.metricas()
+
+
+def mostrar_tabla_detalle_eri(stock_teorico_eri, conciliacion):
+    """Detalle teórico vs físico por ítem (filtros, búsqueda por clave, paginación y exportación)."""
+    resultado = conciliacion.resultado()
+    indice = obtener_indice_busqueda(stock_teorico_eri)
+    ubicaciones = stock_teorico_eri["UBICACION_NOMBRE"].to_numpy()
+    completo, faltante, sobrante = (ESTADOS_ERI.index(e) for e in ("Completo", "Faltante", "Sobrante"))
+
+    def armar_pagina(indices):
+        return detalle_eri(resultado, ubicaciones, indices)
+
+    mostrar_tabla_paginada(
+        "tabla_eri",
+        resultado.total_items,
+        armar_pagina,
+        filtros={
+            "Todos": None,
+            "Solo Faltante/Sobrante": lambda: resultado.estado != completo,
+            "Solo Faltante": lambda: resultado.estado == faltante,
+            "Solo Sobrante": lambda: resultado.estado == sobrante,
+            "Solo Completo": lambda: resultado.estado == completo,
+        },
+        ordenes={
+            "Catálogo": None,
+            "Clave": lambda: indice.orden,
+            "Mayor diferencia": conciliacion.orden_por_diferencia,
+        },
+        mascara_busqueda=indice.mascara,
+    )
+
+    # --- Exportación del detalle completo (se arma solo al pedirla) ---
+    almacen = st.session_state.get("almacen_actual")
+    mostrar_exportacion(
+        "exportacion_eri",
+        f"ERI_{almacen}",
+        (almacen, st.session_state.get("version_escaneos", 0), conciliacion.total_escaneos),
+        resultado.total_items,
+        armar_pagina,
+    )
@@ -0,0 +1,67 @@
+import streamlit as st
+import pandas as pd
+from src.logic.carga_diferida import diferido
+from src.logic.instrumentacion import medir, contar
+
+# plotly se importa recién al dibujar el primer gráfico
+px = diferido("plotly.express")
+
+COLORES_ERI = {
+    "Completo": "#22c55e",   # verde
+    "Faltante": "#ef4444",   # rojo
+    "Sobrante": "#f59e0b",   # naranja
+}
+
+COLORES_ERU = {
+    "Ubicación Correcta": "#22c55e",    # verde
+    "Ubicación Incorrecta": "#ef4444",  # rojo
+    "Código Escaneado Inválido": "#f59e0b",
+    "Producto/Referencia No Encontrado": "#f59e0b",
+}
+
+
+# ================================================================
+# 🥧 Gráficos de distribución (memoizados por conteos y almacén)
+# ================================================================
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _construir_pastel(titulo, almacen, conteos, colores):
+    """
+    Figura de torta para unos conteos dados.
+    - La clave es (título, almacén, conteos, colores): sin escaneos nuevos no se vuelve a construir.
+    - `max_entries` acota la memoria (se descartan las figuras menos usadas).
+    """
+    contar("cache.figuras.fallo")
+    with medir("reporte.construir_grafico"):
+        df_pie = pd.DataFrame(
+            [(estado, cantidad) for estado, cantidad in conteos if cantidad > 0],
+            columns=["estado", "cantidad"]
+        )
+        fig = px.pie(
+            df_pie,
+            names="estado",
+            values="cantidad",
+            title=titulo,
+            color="estado",
+            color_discrete_map=dict(colores)
+        )
+        fig.update_layout(
+            template="plotly_white",
+            legend_title_text="Estado",
+            paper_bgcolor="white",
+            plot_bgcolor="white"
+        )
+        return fig
+
+
+def figura_pastel(titulo, almacen, conteo_estados, colores):
+    """Figura (compartida, no modificar) para un dict {estado: cantidad}."""
+    contar("cache.figuras.consulta")
+    return _construir_pastel(titulo, almacen, tuple(conteo_estados.items()), tuple(colores.items()))
+
+
+def figura_eri(almacen, conteo_estados):
+    return figura_pastel("Distribución ERI", almacen, conteo_estados, COLORES_ERI)
+
+
+def figura_eru(almacen, conteo_estados):
+    return figura_pastel("Distribución ERU", almacen, conteo_estados, COLORES_ERU)
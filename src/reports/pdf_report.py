@@ -0,0 +1,143 @@
+from io import BytesIO
+from reportlab.lib.pagesizes import A4
+from reportlab.platypus import (
+    BaseDocTemplate, PageTemplate, Frame,
+    Paragraph, Spacer, Table, TableStyle, PageBreak
+)
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib import colors
+from reportlab.lib.units import inch
+from reportlab.graphics.shapes import Drawing, String
+from reportlab.graphics.charts.piecharts import Pie
+from datetime import datetime
+
+# Módulo cargado de forma diferida desde general_report.py (reportlab solo se importa al generar un PDF)
+
+
+# =====================================================
+# 📊 Función auxiliar: gráfico de pastel (vectorial, para PDF)
+# =====================================================
+def _porciones_pastel(datos_ok, datos_error):
+    """(valor, etiqueta, color) de cada porción."""
+    total = datos_ok + datos_error
+    if total == 0:
+        return ((1, "Sin datos", colors.HexColor("#4CAF50")),)
+    return tuple(
+        (valor, f"{etiqueta} ({valor / total * 100:.1f}%)", color)
+        for valor, etiqueta, color in (
+            (datos_ok, "Correctos", colors.HexColor("#4CAF50")),
+            (datos_error, "Errores", colors.HexColor("#E53935")),
+        )
+        if valor > 0
+    )
+
+
+def generar_grafico_pastel(titulo, datos_ok, datos_error):
+    """
+    Pastel Correctos/Errores dibujado con ReportLab (vectorial, sin rasterizar).
+    - Cada llamada crea su propio Drawing: drawOn lo modifica (canv) y puede haber
+      varios PDF armándose a la vez en el ejecutor.
+    """
+    ancho, alto = 5.5 * inch, 3.5 * inch
+    dibujo = Drawing(ancho, alto)
+    dibujo.add(String(ancho / 2, alto - 14, titulo, textAnchor="middle",
+                      fontName="Helvetica-Bold", fontSize=11))
+    porciones = _porciones_pastel(datos_ok, datos_error)
+
+    pastel = Pie()
+    lado = alto - 70
+    pastel.x = (ancho - lado) / 2
+    pastel.y = 25
+    pastel.width = pastel.height = lado
+    pastel.data = [valor for valor, _, _ in porciones]
+    pastel.labels = [etiqueta for _, etiqueta, _ in porciones]
+    pastel.startAngle = 90
+    pastel.direction = "anticlockwise"
+    pastel.sideLabels = True
+    pastel.slices.strokeColor = colors.white
+    pastel.slices.fontName = "Helvetica"
+    pastel.slices.fontSize = 9
+    for i, (_, _, color) in enumerate(porciones):
+        pastel.slices[i].fillColor = color
+    dibujo.add(pastel)
+    return dibujo
+
+
+# =====================================================
+# 🧱 Generación interna de PDF (no se muestra en front)
+# =====================================================
+def generar_pdf(almacen_actual, met_eri, met_eru, sugerencia_eri, sugerencia_eru):
+    buffer = BytesIO()
+    styles = getSampleStyleSheet()
+    styles.add(ParagraphStyle(name="TitleCenter", parent=styles["Title"], alignment=1, fontSize=18))
+    styles.add(ParagraphStyle(name="H2", parent=styles["Heading2"], fontSize=12, leading=14, spaceBefore=10))
+    styles.add(ParagraphStyle(name="Small", parent=styles["Normal"], fontSize=9))
+    styles.add(ParagraphStyle(name="Label", parent=styles["Normal"], fontSize=10, leading=14))
+
+    def _header_footer(c, doc):
+        c.saveState()
+        top_y = A4[1] - 36
+        c.setStrokeColor(colors.black)
+        c.line(36, top_y, A4[0] - 36, top_y)
+        c.setFont("Helvetica", 9)
+        c.drawString(36, top_y + 6, "Reporte General ERI & ERU")
+        c.drawRightString(A4[0] - 36, top_y + 6, f"Almacén: {almacen_actual}")
+        bottom_y = 30
+        c.line(36, bottom_y + 12, A4[0] - 36, bottom_y + 12)
+        c.setFont("Helvetica", 8)
+        c.drawString(36, bottom_y, f"Generado el {datetime.now().strftime('%d/%m/%Y - %H:%M:%S')}")
+        c.drawRightString(A4[0] - 36, bottom_y, f"Página {doc.page}")
+        c.restoreState()
+
+    doc = BaseDocTemplate(buffer, pagesize=A4)
+    frame = Frame(36, 48, A4[0] - 72, A4[1] - 108, id="normal")
+    doc.addPageTemplates(PageTemplate(id="main", frames=[frame], onPage=_header_footer))
+
+    elements = []
+    elements.append(Paragraph("Reporte ERI & ERU", styles["TitleCenter"]))
+    elements.append(Paragraph(f"Almacén: <b>{almacen_actual}</b>", styles["Small"]))
+    elements.append(Spacer(1, 12))
+
+    # Tabla de métricas
+    data = [["Métrica", "ERI", "ERU"]]
+    data.append(["Exactitud (%)", f"{met_eri.get('exactitud', 0):.2f}", f"{met_eru.get('exactitud', 0):.2f}"])
+    data.append(["Correctos", f"{met_eri.get('ok', 0)}", f"{met_eru.get('ok', 0)}"])
+    data.append(["Errores", f"{met_eri.get('error', 0)}", f"{met_eru.get('error', 0)}"])
+
+    tbl = Table(data, hAlign="LEFT", colWidths=[2.2 * inch, 1.2 * inch, 1.2 * inch])
+    tbl.setStyle(TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), colors.black),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+        ("GRID", (0, 1), (-1, -1), 0.25, colors.black),
+        ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.whitesmoke, colors.white]),
+    ]))
+    elements.append(Paragraph("1. Métricas generales", styles["H2"]))
+    elements.append(tbl)
+    elements.append(Spacer(1, 20))
+
+    # Gráfico ERI
+    elements.append(Paragraph("2. Gráfico ERI (Pastel)", styles["H2"]))
+    if met_eri:
+        elements.append(generar_grafico_pastel("Distribución ERI", met_eri.get("ok", 0), met_eri.get("error", 0)))
+    if sugerencia_eri:
+        elements.append(Paragraph("Observaciones ERI", styles["Label"]))
+        elements.append(Paragraph(sugerencia_eri.replace("\n", "<br/>"), styles["Small"]))
+    elements.append(PageBreak())
+
+    # Gráfico ERU
+    elements.append(Paragraph("3. Gráfico ERU (Pastel)", styles["H2"]))
+    if met_eru:
+        elements.append(generar_grafico_pastel("Distribución ERU", met_eru.get("ok", 0), met_eru.get("error", 0)))
+    if sugerencia_eru:
+        elements.append(Paragraph("Observaciones ERU", styles["Label"]))
+        elements.append(Paragraph(sugerencia_eru.replace("\n", "<br/>"), styles["Small"]))
+
+    elements.append(Spacer(1, 10))
+    elements.append(Paragraph(
+        "Este documento presenta un resumen ejecutivo de precisión y hallazgos relevantes para ERI y ERU.",
+        styles["Small"]
+    ))
+
+    doc.build(elements)
+    buffer.seek(0)
+    return buffer
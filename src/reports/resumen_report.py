@@ -0,0 +1,31 @@
+import streamlit as st
+from src.ui.layout import obtener_indice_almacenes
+from src.logic.escaneo_logic import escaneos_de_la_sesion
+from src.logic.resumen import resumen_empresa, escaneos_a_dataframe
+
+def mostrar_resumen_empresa(df_raw):
+    """Vista general: exactitud ERI/ERU de todos los almacenes en una sola tabla."""
+    if not st.toggle("🏢 Vista general de todos los almacenes", key="vista_general"):
+        return
+
+    indice = obtener_indice_almacenes(df_raw)
+    escaneos = escaneos_a_dataframe(escaneos_de_la_sesion(indice.almacenes))
+    resumen = resumen_empresa(indice, escaneos)
+
+    st.subheader("🏢 Resumen de Exactitud por Almacén")
+    st.dataframe(
+        resumen,
+        hide_index=True,
+        width='stretch',
+        column_config={
+            "ALMACEN_NOMBRE": "Almacén",
+            "items": "Ítems",
+            "stock_teorico": st.column_config.NumberColumn("Stock Teórico", format="%.2f"),
+            "stock_fisico": "Stock Físico",
+            "items_correctos": "Ítems Correctos",
+            "exactitud_eri": st.column_config.NumberColumn("Exactitud ERI", format="%.2f%%"),
+            "escaneos": "Escaneos",
+            "ubicaciones_correctas": "Ubicaciones Correctas",
+            "exactitud_eru": st.column_config.NumberColumn("Exactitud ERU", format="%.2f%%"),
+        }
+    )
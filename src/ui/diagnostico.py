@@ -0,0 +1,101 @@
+import time
+import importlib.util
+from functools import lru_cache
+
+import streamlit as st
+import pandas as pd
+from src.logic.instrumentacion import instrumentacion
+from src.logic.carga_diferida import tiempos_importacion
+
+
+def iniciar_rerun():
+    """Marca el inicio del rerun (para medir su duración total)."""
+    return time.perf_counter()
+
+
+def _cambiar_instrumentacion():
+    instrumentacion.activar(st.session_state["diagnostico_activo"])
+
+
+def _aciertos_de_cache(contadores):
+    """Aciertos/fallos por caché a partir de los contadores 'cache.<nombre>.consulta' y '.fallo'."""
+    filas = []
+    for nombre in sorted({c.split(".")[1] for c in contadores if c.startswith("cache.")}):
+        consultas = contadores.get(f"cache.{nombre}.consulta")
+        fallos = contadores.get(f"cache.{nombre}.fallo", 0)
+        aciertos = contadores.get(f"cache.{nombre}.acierto")
+        if aciertos is None and consultas is not None:
+            aciertos = max(consultas - fallos, 0)
+        filas.append({"caché": nombre, "aciertos": aciertos or 0, "fallos": fallos})
+    return pd.DataFrame(filas)
+
+
+@lru_cache(maxsize=None)
+def _kaleido_disponible():
+    """Se consulta una sola vez por proceso (antes se revisaba en cada rerun)."""
+    return importlib.util.find_spec("kaleido") is not None
+
+
+def mostrar_panel_diagnostico(inicio_rerun):
+    """Panel lateral con tiempos por etapa, aciertos de caché y exportación JSON/Prometheus."""
+    instrumentacion.registrar_tiempo("rerun", time.perf_counter() - inicio_rerun)
+
+    # Estado del motor de exportación de gráficos: visible siempre, con o sin instrumentación
+    st.sidebar.caption("Kaleido: " + ("✅ instalado" if _kaleido_disponible() else "❌ no instalado"))
+
+    with st.sidebar.expander("🩺 Diagnóstico de rendimiento"):
+        # La instrumentación es del proceso: el toggle refleja su estado actual en cada rerun
+        # (otra sesión pudo haberla cambiado)
+        st.session_state["diagnostico_activo"] = instrumentacion.activo
+        st.toggle(
+            "Instrumentación activa",
+            key="diagnostico_activo",
+            on_change=_cambiar_instrumentacion,
+            help="Compartida por todas las sesiones del servidor.",
+        )
+        if not instrumentacion.activo:
+            st.caption("Activa la instrumentación para medir cada etapa (sin costo mientras está apagada).")
+            return
+
+        datos = instrumentacion.como_dict()
+        if datos["tiempos"]:
+            tiempos = pd.DataFrame([
+                {
+                    "etapa": nombre,
+                    "llamadas": t["llamadas"],
+                    "promedio (ms)": t["promedio_s"] * 1000,
+                    "último (ms)": t["ultimo_s"] * 1000,
+                    "máx (ms)": t["max_s"] * 1000,
+                }
+                for nombre, t in datos["tiempos"].items()
+            ])
+            st.dataframe(tiempos, hide_index=True, width='stretch')
+        else:
+            st.caption("Sin mediciones todavía.")
+
+        cache = _aciertos_de_cache(datos["contadores"])
+        if not cache.empty:
+            st.dataframe(cache, hide_index=True, width='stretch')
+
+        otros = {k: v for k, v in datos["contadores"].items() if not k.startswith("cache.")}
+        if otros:
+            st.dataframe(
+                pd.DataFrame(list(otros.items()), columns=["contador", "valor"]),
+                hide_index=True, width='stretch'
+            )
+
+        col1, col2 = st.columns(2)
+        col1.download_button("JSON", instrumentacion.como_json(), "diagnostico.json", "application/json")
+        col2.download_button("Prometheus", instrumentacion.como_prometheus(), "diagnostico.prom", "text/plain")
+        if st.button("Reiniciar mediciones"):
+            instrumentacion.reiniciar()
+
+        if tiempos_importacion:
+            st.caption("Importaciones diferidas (primer uso)")
+            st.dataframe(
+                pd.DataFrame(
+                    [(m, s * 1000) for m, s in tiempos_importacion.items()],
+                    columns=["módulo", "tiempo (ms)"]
+                ),
+                hide_index=True, width='stretch'
+            )
@@ -0,0 +1,39 @@
+import streamlit as st
+from src.logic.exportacion import FORMATOS, formatos_disponibles, bloques, exportar
+from src.logic.instrumentacion import medir, contar
+
+
+def mostrar_exportacion(clave, nombre_base, version, total, armar):
+    """
+    Descarga del detalle completo en CSV / Parquet / Excel.
+    - El archivo se arma recién al hacer clic (descarga diferida), por bloques de filas.
+    - Se guarda la última exportación de la sesión (en un archivo temporal): con la misma
+      `version` y formato se reutiliza; al cambiar, se borra la anterior.
+    - `armar(indices)` debe leer una foto del estado (no vectores que cambian con escaneos nuevos).
+    """
+    col_formato, col_boton = st.columns([2, 1])
+    formato = col_formato.selectbox("Formato", formatos_disponibles(), key=f"{clave}_formato")
+    extension, mime = FORMATOS[formato]
+    ultima = st.session_state.setdefault(f"{clave}_ultima", {})
+    firma = (version, formato)
+
+    def generar():
+        # Corre fuera del script (al hacer clic): solo usa objetos capturados, no st.*
+        contar("cache.exportacion.consulta")
+        if ultima.get("firma") != firma:
+            contar("cache.exportacion.fallo")
+            with medir(f"exportacion.{clave}"):
+                archivo = exportar(bloques(total, armar), formato)
+            if "archivo" in ultima:
+                ultima["archivo"].borrar()
+            ultima.update(firma=firma, archivo=archivo)
+        return ultima["archivo"].leer()
+
+    col_boton.download_button(
+        f"📤 Exportar {formato}",
+        data=generar,
+        file_name=f"{nombre_base}.{extension}",
+        mime=mime,
+        on_click="ignore",
+        key=f"{clave}_descargar",
+    )
@@ -1,25 +1,59 @@
-import streamlit as st
+import hashlib
+
 import pandas as pd
+import streamlit as st
+from src.logic.almacenes import IndiceAlmacenes
+from src.logic.instrumentacion import medir, contar
+from src.logic.escaneo_logic import cerrar_diario
+
 
 def configurar_pagina():
     st.set_page_config(page_title="📊 ERI & ERU - Exactitud de Inventario", layout="wide")
     st.title("📊 Sistema ERI & ERU - Exactitud de Registro de Inventario y Ubicación")
 
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _construir_indice_almacenes(snapshot_id, _df_raw):
+    """Índice por almacén, una vez por archivo cargado (se comparte entre sesiones)."""
+    contar("cache.indice.fallo")
+    with medir("seleccion.construir_indice"):
+        return IndiceAlmacenes(_df_raw)
+
+
+def _huella_contenido(df_raw):
+    """Huella de encabezados y celdas (hash por fila de pandas, en orden)."""
+    huella = hashlib.blake2b(repr(list(df_raw.columns)).encode(), digest_size=16)
+    huella.update(pd.util.hash_pandas_object(df_raw, index=False).to_numpy().tobytes())
+    return f"contenido|{huella.hexdigest()}"
+
+
+def obtener_indice_almacenes(df_raw):
+    """
+    Devuelve el índice por almacén del inventario.
+    - Se identifica por `attrs["snapshot_id"]` (file_id + modifiedTime, lo pone get_drive_data).
+    - Sin él (ej. un DataFrame armado a mano), por una huella del contenido: id() se puede
+      reutilizar tras liberar el objeto y devolvería el índice de otro archivo.
+    """
+    snapshot_id = df_raw.attrs.get("snapshot_id")
+    if snapshot_id is None:
+        snapshot_id = _huella_contenido(df_raw)
+    contar("cache.indice.consulta")
+    return _construir_indice_almacenes(snapshot_id, df_raw)
+
+
 def seleccionar_almacen(df_raw):
-    # Normalizar nombres de columnas
-    df_raw.columns = df_raw.columns.str.strip().str.upper()
+    # Índice por almacén (columnas normalizadas, claves y stock teórico precalculados)
+    indice = obtener_indice_almacenes(df_raw)
 
-    required_cols = ["ALMACEN_NOMBRE", "PRODUCTO_CODIGO", "REFERENCIA1", "STOCK_REFERENCIAUBICACION", "UBICACION_NOMBRE"]
-    missing_cols = [col for col in required_cols if col not in df_raw.columns]
+    missing_cols = indice.faltantes
 
     if missing_cols:
-        st.error(f"❌ Faltan columnas: {missing_cols}. Las columnas disponibles son: {list(df_raw.columns)}")
+        st.error(f"❌ Faltan columnas: {missing_cols}. Las columnas disponibles son: {indice.columnas}")
         st.stop()
     else:
         st.success("✅ Todas las columnas requeridas están presentes.")
 
     # Seleccionar almacén
-    almacenes = sorted(df_raw["ALMACEN_NOMBRE"].dropna().unique())
+    almacenes = indice.almacenes
     
     almacen_seleccionado = st.selectbox("📍 Seleccionar Almacén", almacenes)
     # --- Detección y reinicio al cambiar de almacén ---
@@ -27,11 +61,19 @@ def seleccionar_almacen(df_raw):
 
     # Si el almacén cambió (y ya había uno previo), reiniciar estados una sola vez
     if almacen_anterior and almacen_anterior != almacen_seleccionado:
+        # Terminar el escritor del diario del almacén anterior
+        cerrar_diario(almacen_anterior)
+
         # Reiniciar variables de sesión
-        st.session_state["escaneos_eri"] = []
-        st.session_state["escaneos_eru"] = []
-        st.session_state.pop("fig_eri", None)
-        st.session_state.pop("fig_eru", None)
+        st.session_state.pop("escaneos", None)
+        st.session_state.pop("conciliacion_eri", None)
+        st.session_state.pop("conciliacion_eru", None)
+        st.session_state.pop("conteo_compartido", None)
+        st.session_state.pop("conteo_ultimo_id", None)
+        st.session_state.pop("conteo_eri", None)
+        st.session_state.pop("conteo_eru", None)
+        st.session_state.pop("pdf_futuro", None)
+        st.session_state.pop("pdf_pendiente", None)
         st.session_state["mensaje_escaneo"] = ""
 
         # Actualizar el almacén actual antes del rerun
@@ -47,22 +89,8 @@ def seleccionar_almacen(df_raw):
 
     # Guardar el almacén actual
     st.session_state["almacen_actual"] = almacen_seleccionado
-    # Filtrar por almacén
-    df_filtrado = df_raw[df_raw["ALMACEN_NOMBRE"] == almacen_seleccionado].copy()
-
-    # Crear claves únicas
-    df_filtrado["clave_teorica_eri"] = df_filtrado["PRODUCTO_CODIGO"].astype(str) + df_filtrado["REFERENCIA1"].astype(str)
-    df_filtrado["clave_teorica_eru"] = df_filtrado["clave_teorica_eri"] + df_filtrado["UBICACION_NOMBRE"].astype(str)
-
-    # Agrupar stock teórico
-    stock_teorico_eri = (
-        df_filtrado.groupby("clave_teorica_eri")["STOCK_REFERENCIAUBICACION"]
-        .sum().round(3).reset_index()
-        .rename(columns={"STOCK_REFERENCIAUBICACION": "stock_teorico"})
-    )
-
-    ubicaciones_por_eri = df_filtrado.groupby("clave_teorica_eri")["UBICACION_NOMBRE"].apply(lambda x: list(x.unique())).reset_index()
-    stock_teorico_eri = stock_teorico_eri.merge(ubicaciones_por_eri, on="clave_teorica_eri", how="left")
+    # Particiones precalculadas del almacén (no modificar: se comparten entre reruns)
+    df_filtrado, stock_teorico_eri = indice.obtener(almacen_seleccionado)
 
     st.info(f"📦 {len(stock_teorico_eri)} ítems teóricos en {almacen_seleccionado}")
     return almacen_seleccionado, df_filtrado, stock_teorico_eri
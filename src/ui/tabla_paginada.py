@@ -0,0 +1,67 @@
+import streamlit as st
+from src.logic.tabla_paginada import TAMANOS_PAGINA, seleccionar_filas, paginar
+
+
+def _volver_a_primera(clave):
+    st.session_state[f"{clave}_pagina"] = 1
+
+
+def _mover_pagina(clave, paso, total_paginas):
+    pagina = st.session_state.get(f"{clave}_pagina", 1) + paso
+    st.session_state[f"{clave}_pagina"] = min(max(1, pagina), total_paginas)
+
+
+def mostrar_tabla_paginada(clave, total, armar_pagina, filtros, ordenes, mascara_busqueda=None):
+    """
+    Tabla de detalle paginada del lado del servidor.
+    - `filtros` y `ordenes`: {etiqueta: función sin argumentos → máscara / permutación, o None}.
+    - `mascara_busqueda(texto)`: máscara booleana de las filas cuya clave contiene el texto.
+    - `armar_pagina(indices)`: DataFrame solo con las filas visibles (lo único que se envía al navegador).
+    """
+    col_busqueda, col_filtro, col_orden, col_tamano = st.columns([3, 3, 2, 1])
+    busqueda = ""
+    if mascara_busqueda is not None:
+        busqueda = col_busqueda.text_input(
+            "🔎 Buscar clave", key=f"{clave}_busqueda", on_change=_volver_a_primera, args=(clave,)
+        )
+    filtro = col_filtro.selectbox(
+        "Filtrar estado", list(filtros), key=f"{clave}_filtro", on_change=_volver_a_primera, args=(clave,)
+    )
+    orden = col_orden.selectbox(
+        "Ordenar por", list(ordenes), key=f"{clave}_orden", on_change=_volver_a_primera, args=(clave,)
+    )
+    tamano = col_tamano.selectbox(
+        "Filas", TAMANOS_PAGINA, index=1, key=f"{clave}_tamano", on_change=_volver_a_primera, args=(clave,)
+    )
+
+    # --- Filas visibles: máscaras combinadas + permutación precalculada ---
+    mascara = filtros[filtro]() if filtros[filtro] is not None else None
+    if busqueda.strip():
+        coincidencias = mascara_busqueda(busqueda)
+        mascara = coincidencias if mascara is None else mascara & coincidencias
+    permutacion = ordenes[orden]() if ordenes[orden] is not None else None
+    indices = seleccionar_filas(total, mascara, permutacion)
+
+    visibles, pagina, total_paginas = paginar(indices, st.session_state.get(f"{clave}_pagina", 1), tamano)
+    st.session_state[f"{clave}_pagina"] = pagina
+
+    if len(indices):
+        st.dataframe(armar_pagina(visibles), hide_index=True, width='stretch')
+    else:
+        st.info("No hay filas que coincidan con el filtro.")
+
+    # --- Navegación ---
+    col_anterior, col_info, col_siguiente = st.columns([1, 6, 1])
+    col_anterior.button(
+        "◀", key=f"{clave}_anterior", disabled=pagina <= 1,
+        on_click=_mover_pagina, args=(clave, -1, total_paginas)
+    )
+    desde = (pagina - 1) * tamano + 1 if len(visibles) else 0
+    hasta = (pagina - 1) * tamano + len(visibles)
+    col_info.caption(
+        f"Página {pagina} de {total_paginas} · filas {desde}–{hasta} de {len(indices)} (total {total})"
+    )
+    col_siguiente.button(
+        "▶", key=f"{clave}_siguiente", disabled=pagina >= total_paginas,
+        on_click=_mover_pagina, args=(clave, 1, total_paginas)
+    )
@@ -0,0 +1,85 @@
+import gc
+import weakref
+
+import pandas as pd
+
+from src.data.diario_escaneos import DiarioEscaneos, abrir_diario
+from src.logic.almacenes import IndiceAlmacenes
+from src.logic.procesamiento import (
+    construir_escaneos, construir_conciliacion_eri, revalidar_registros
+)
+from src.logic.utils import DecodificadorEscaneo
+
+
+def _catalogo(filas):
+    df = pd.DataFrame(filas, columns=[
+        "ALMACEN_NOMBRE", "PRODUCTO_CODIGO", "REFERENCIA1", "STOCK_REFERENCIAUBICACION", "UBICACION_NOMBRE"
+    ])
+    return IndiceAlmacenes(df).obtener("ALM1")[1]
+
+
+def test_diario_se_reproduce_tras_cambio_de_catalogo(tmp_path):
+    anterior = _catalogo([
+        ("ALM1", "P1", "R1", 2, "R1A-B-1"),
+        ("ALM1", "P2", "R2", 1, "R1A-B-2"),
+        ("ALM1", "P3", "R3", 1, "R1A-B-3"),
+    ])
+    # Nueva versión del inventario: P3 ya no existe, P2 cambia de fila y aparece P4
+    actual = _catalogo([
+        ("ALM1", "P4", "R4", 1, "R1A-B-4"),
+        ("ALM1", "P1", "R1", 2, "R1A-B-1"),
+        ("ALM1", "P2", "R2", 1, "R1A-B-2"),
+    ])
+
+    decodificador = DecodificadorEscaneo(anterior)
+    codigos = ["P1R1R1A-B-1", "P3R3R1A-B-3", "P2R2R1A-B-2", "P1R1R1A-B-1"]
+    diario = DiarioEscaneos(str(tmp_path / "sesion"), intervalo_flush=0.01)
+    diario.agregar([(codigo, *decodificador.decodificar(codigo)) for codigo in codigos])
+    diario.cerrar()
+
+    # La clave de P3 no está en el catálogo nuevo: antes esto era un KeyError en agregar()
+    registros = DiarioEscaneos(str(tmp_path / "sesion")).leer()
+    registros.append(("P1R1R1A-B-1", "clave-de-otra-version", "R1A-B-1"))
+    nuevo = DecodificadorEscaneo(actual)
+    validos, descartados = revalidar_registros(nuevo, registros)
+
+    assert descartados == ["P3R3R1A-B-3"]
+    assert [r[1] for r in validos] == ["P1R1", "P2R2", "P1R1", "P1R1"]
+
+    escaneos, _ = construir_escaneos(nuevo, [])
+    for codigo, clave, ubicacion in validos:
+        escaneos.agregar(codigo, clave, ubicacion)
+    conciliacion = construir_conciliacion_eri(actual, escaneos)
+    assert conciliacion.total_escaneos == 4
+    assert escaneos.codigos().tolist() == [r[0] for r in validos]
+
+
+def test_revalidar_no_toca_registros_del_catalogo_actual():
+    catalogo = _catalogo([("ALM1", "P1", "R1", 1, "R1A-B-1")])
+    registros = [("P1R1R1A-B-1", "P1R1", "R1A-B-1")]
+    assert revalidar_registros(DecodificadorEscaneo(catalogo), registros) == (registros, [])
+
+
+def test_un_solo_escritor_por_ruta_tras_descartar_el_diario(tmp_path):
+    ruta = str(tmp_path / "sesion")
+    registros = [(f"P{i}R{i}R1A-B-1", f"P{i}R{i}", "R1A-B-1") for i in range(5)]
+
+    # La caché descarta el diario con escaneos aún en cola: su hilo lo mantiene vivo
+    diario = abrir_diario(ruta, intervalo_flush=0.05, compactar_cada=2)
+    anterior = weakref.ref(diario)
+    diario.agregar(registros)
+    del diario
+    gc.collect()
+
+    reabierto = abrir_diario(ruta)
+    assert reabierto is anterior()
+    assert reabierto.leer() == registros
+
+    # Ya sin hilo ni referencias, se abre uno nuevo que retoma desde disco
+    hilo = reabierto._hilo
+    reabierto.cerrar()
+    hilo.join()
+    del reabierto, hilo
+    gc.collect()
+    assert anterior() is None
+    assert abrir_diario(ruta).leer() == registros
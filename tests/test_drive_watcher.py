@@ -0,0 +1,111 @@
+import os
+import shutil
+
+import pytest
+
+from src.data import drive_watcher
+from src.data.drive_watcher import MetadatosDrive, TransporteLocal, VigilanteDrive
+
+
+class _Reloj:
+    def __init__(self):
+        self.ahora = 1000.0
+
+    def __call__(self):
+        return self.ahora
+
+
+@pytest.fixture
+def reloj(monkeypatch):
+    reloj = _Reloj()
+    monkeypatch.setattr(drive_watcher.time, "monotonic", reloj)
+    return reloj
+
+
+def _crear(carpeta, nombre, mtime):
+    ruta = carpeta / nombre
+    ruta.write_text("ALMACEN_NOMBRE\n")
+    os.utime(ruta, (mtime, mtime))
+    return str(ruta)
+
+
+def test_transporte_local_lista_como_drive(tmp_path):
+    viejo = _crear(tmp_path, "inventario_1.csv", 1_700_000_000)
+    nuevo = _crear(tmp_path, "inventario_2.xlsx", 1_700_000_100)
+    _crear(tmp_path, "notas.txt", 1_700_000_200)
+
+    archivos = TransporteLocal(str(tmp_path)).listar_inventarios()
+
+    assert [a["id"] for a in archivos] == [nuevo, viejo]  # más reciente primero, sin el .txt
+    assert archivos[0]["modifiedTime"] == "2023-11-14T22:15:00Z"
+    assert archivos[1]["mimeType"] == "text/csv"
+
+
+def test_metadatos_respetan_el_ttl(tmp_path, reloj):
+    _crear(tmp_path, "inventario_1.csv", 1_700_000_000)
+    transporte = TransporteLocal(str(tmp_path))
+    metadatos = MetadatosDrive(transporte, "carpeta", ttl=60)
+
+    primera = metadatos.archivos()
+    reloj.ahora += 59
+    assert metadatos.archivos() is primera
+    assert transporte.llamadas == 1 and metadatos.version == 1
+
+    # Vencido el TTL se vuelve a listar; la versión sube solo si cambió algún archivo
+    reloj.ahora += 2
+    metadatos.archivos()
+    assert transporte.llamadas == 2 and metadatos.version == 1
+
+    _crear(tmp_path, "inventario_2.csv", 1_700_000_100)
+    reloj.ahora += 61
+    assert metadatos.archivos()[0]["name"] == "inventario_2.csv"
+    assert transporte.llamadas == 3 and metadatos.version == 2
+
+
+def test_vigilante_conserva_la_lista_si_falla_el_refresco(tmp_path, reloj):
+    carpeta = tmp_path / "drive"
+    carpeta.mkdir()
+    _crear(carpeta, "inventario_1.csv", 1_700_000_000)
+    metadatos = MetadatosDrive(TransporteLocal(str(carpeta)), "carpeta", ttl=60)
+    vigilante = VigilanteDrive(metadatos, intervalo=30)
+    conocida = metadatos.archivos()
+
+    shutil.rmtree(carpeta)  # sin acceso a la carpeta
+    vigilante.revisar()
+    assert vigilante.errores == 1
+
+    # Vigilado: los reruns leen la última lista conocida aunque esté obsoleta
+    metadatos.vigilado = True
+    assert metadatos.archivos() is conocida
+
+    # Sin vigilante, la lista obsoleta se refresca de forma síncrona (y el error se ve)
+    metadatos.vigilado = False
+    with pytest.raises(FileNotFoundError):
+        metadatos.archivos()
+
+    carpeta.mkdir()
+    _crear(carpeta, "inventario_2.csv", 1_700_000_100)
+    vigilante.revisar()
+    assert vigilante.errores == 1
+    assert [a["name"] for a in metadatos.archivos()] == ["inventario_2.csv"]
+
+
+def test_vigilante_en_segundo_plano(tmp_path):
+    _crear(tmp_path, "inventario_1.csv", 1_700_000_000)
+    metadatos = MetadatosDrive(TransporteLocal(str(tmp_path)), "carpeta", ttl=3600)
+    metadatos.archivos()
+
+    vigilante = VigilanteDrive(metadatos, intervalo=0.01)
+    vigilante.start()
+    try:
+        _crear(tmp_path, "inventario_2.csv", 1_700_000_100)
+        for _ in range(500):
+            if metadatos.version == 2:
+                break
+            vigilante.join(0.01)
+        assert metadatos.vigilado
+        assert metadatos.archivos()[0]["name"] == "inventario_2.csv"
+    finally:
+        vigilante.detener()
+        vigilante.join(1)
+    assert not vigilante.is_alive() and not metadatos.vigilado
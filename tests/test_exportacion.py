@@ -0,0 +1,49 @@
+import os
+
+import pandas as pd
+import pytest
+
+from src.logic.exportacion import bloques, exportar, formatos_disponibles
+
+DETALLE = pd.DataFrame({
+    "clave_producto_referencia": [f"P{i}|R{i % 3}" for i in range(25)],
+    "stock_registro": range(25),
+    "estado_conteo": ["Completo", "Faltante", "Sobrante", "Completo", "Faltante"] * 5,
+})
+
+LECTORES = {"CSV": pd.read_csv, "Parquet": pd.read_parquet, "Excel": pd.read_excel}
+
+
+@pytest.mark.parametrize("formato", formatos_disponibles())
+def test_exportar_por_bloques(formato):
+    armar = lambda indices: DETALLE.iloc[indices].reset_index(drop=True)
+    archivo = exportar(bloques(len(DETALLE), armar, tamano=10), formato)
+
+    pd.testing.assert_frame_equal(LECTORES[formato](archivo.ruta), DETALLE, check_dtype=False)
+    with open(archivo.ruta, "rb") as leido:
+        assert archivo.leer() == leido.read()
+    archivo.borrar()
+    assert not os.path.exists(archivo.ruta)
+
+
+@pytest.mark.parametrize("formato", formatos_disponibles())
+def test_exportar_sin_filas_conserva_encabezado(formato):
+    vacio = DETALLE.iloc[:0]
+    archivo = exportar(bloques(0, lambda indices: vacio.iloc[indices]), formato)
+
+    assert list(LECTORES[formato](archivo.ruta).columns) == list(DETALLE.columns)
+
+
+def test_archivo_temporal_se_borra_al_liberar_o_si_falla():
+    archivo = exportar(bloques(len(DETALLE), lambda indices: DETALLE.iloc[indices]), "CSV")
+    ruta = archivo.ruta
+    del archivo
+    assert not os.path.exists(ruta)
+
+    def fallar(indices):
+        raise RuntimeError("bloque inválido")
+
+    antes = set(os.listdir(os.path.dirname(ruta)))
+    with pytest.raises(RuntimeError):
+        exportar(bloques(len(DETALLE), fallar), "CSV")
+    assert set(os.listdir(os.path.dirname(ruta))) == antes
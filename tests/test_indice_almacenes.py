@@ -0,0 +1,23 @@
+import gc
+
+import pandas as pd
+
+from src.ui.layout import obtener_indice_almacenes
+
+COLUMNAS = ["ALMACEN_NOMBRE", "PRODUCTO_CODIGO", "REFERENCIA1", "STOCK_REFERENCIAUBICACION", "UBICACION_NOMBRE"]
+
+
+def _inventario(almacen):
+    return pd.DataFrame([(almacen, "P1", "R1", 1, "R1A-B-1")], columns=COLUMNAS)
+
+
+def test_sin_snapshot_id_no_reutiliza_el_indice_de_otro_archivo():
+    # Misma forma, otro contenido: aunque Python reutilice el id() del objeto liberado
+    assert obtener_indice_almacenes(_inventario("ALM1")).almacenes == ["ALM1"]
+    gc.collect()
+    assert obtener_indice_almacenes(_inventario("ALM2")).almacenes == ["ALM2"]
+
+
+def test_sin_snapshot_id_mismo_contenido_usa_la_cache():
+    primero = obtener_indice_almacenes(_inventario("ALM1"))
+    assert obtener_indice_almacenes(_inventario("ALM1")) is primero
@@ -0,0 +1,66 @@
+import pandas as pd
+from gspread.worksheet import Worksheet
+
+from src.data.lector_sheets import BackendSheetsFalso, leer_inventario_sheets, leer_sheets_completo
+from src.logic.almacenes import IndiceAlmacenes
+
+# Celdas tal como las muestra Sheets (valores con formato), con vacíos y códigos numéricos
+ENCABEZADO = ["ALMACEN_NOMBRE", "PRODUCTO_CODIGO", "REFERENCIA1", "STOCK_REFERENCIAUBICACION", "UBICACION_NOMBRE"]
+FILAS = [
+    ["ALM1", "P1", "", "2", "R1A-B-1"],          # referencia vacía
+    ["ALM1", "00123", "7", "1", "R1A-B-2"],      # códigos numéricos (texto con ceros a la izquierda)
+    ["ALM1", "1,234", "5.00", "1,000", "R1A-B-3"],
+    ["ALM1", "P2", "R2", "3", ""],               # ubicación vacía
+    ["ALM2", "P2", "-1", "1.5", "R2A-B-1"],
+]
+
+
+class _HojaFalsa:
+    """Worksheet mínima: get_all_records es el de gspread, sobre la misma grilla con formato."""
+    get_all_records = Worksheet.get_all_records
+
+    def __init__(self, grilla):
+        self._grilla = grilla
+
+    def get(self, value_render_option=None, pad_values=False):
+        return [list(fila) for fila in self._grilla]
+
+
+class _ClienteFalso:
+    def __init__(self, grilla):
+        self._hoja = _HojaFalsa(grilla)
+
+    def open_by_key(self, spreadsheet_id):
+        return self
+
+    def worksheet(self, titulo):
+        return self._hoja
+
+
+def _claves(df):
+    indice = IndiceAlmacenes(df)
+    return {
+        str(almacen): sorted(indice.obtener(almacen)[1]["clave_teorica_eri"].tolist())
+        for almacen in indice.almacenes
+    }
+
+
+def test_claves_iguales_a_la_lectura_original():
+    completo = leer_sheets_completo(_ClienteFalso([ENCABEZADO] + FILAS), "hoja")
+    backend = BackendSheetsFalso({"LISTADO": pd.DataFrame(FILAS, columns=ENCABEZADO)}, filas_extra=3)
+    rapido, hoja = leer_inventario_sheets(backend, "hoja", filas_por_lote=2)
+
+    assert hoja == "LISTADO"
+    assert _claves(rapido) == _claves(completo)
+    assert _claves(rapido) == {"ALM1": ["12345.0", "1237", "P1", "P2R2"], "ALM2": ["P2-1"]}
+
+
+def test_filas_vacias_y_stock_vacio():
+    filas = FILAS[:2] + [["", "", "", "", ""]] + [["ALM1", "P3", "R3", "", "R3A-B-1"]]
+    backend = BackendSheetsFalso({"LISTADO": pd.DataFrame(filas, columns=ENCABEZADO)})
+    df, _ = leer_inventario_sheets(backend, "hoja")
+
+    assert len(df) == 3  # la fila vacía no cuenta
+    assert df["STOCK_REFERENCIAUBICACION"].tolist()[:2] == [2.0, 1.0]
+    assert pd.isna(df["STOCK_REFERENCIAUBICACION"].iloc[2])
+    assert df["REFERENCIA1"].iloc[0] == ""